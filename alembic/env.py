@@ -22,6 +22,12 @@ from app.database import Base
 # Import the models so Alembic sees them
 from app.models.user import User
 from app.models.user_kyc import UserKyc
+from app.models.chain_checkpoint import ChainCheckpoint
+from app.models.idempotency_key import IdempotencyKey
+from app.models.state_tree_node import StateTreeNode
+from app.models.state_tree_leaf import StateTreeLeaf
+from app.models.state_tree_pending_head import StateTreePendingHead
+from app.models.archive_segment import ArchiveSegment
 
 # 4. Override the sqlalchemy.url with our DATABASE_URL
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
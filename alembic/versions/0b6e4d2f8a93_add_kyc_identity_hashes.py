@@ -0,0 +1,57 @@
+"""Add KYC identity hashes
+
+Revision ID: 0b6e4d2f8a93
+Revises: f3b19d7a2c64
+Create Date: 2026-10-18 14:52:09.771406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.identity import identity_hashes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4d2f8a93'
+down_revision: Union[str, None] = 'f3b19d7a2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users_kyc', sa.Column('nik_hash', sa.String(), nullable=True))
+    op.add_column('users_kyc', sa.Column('npwp_hash', sa.String(), nullable=True))
+
+    # Backfill with the HMAC key configured for this deployment
+    users_kyc = sa.table(
+        'users_kyc',
+        sa.column('id', sa.Integer()),
+        sa.column('nik', sa.String()),
+        sa.column('npwp', sa.String()),
+        sa.column('nik_hash', sa.String()),
+        sa.column('npwp_hash', sa.String()),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(users_kyc.c.id, users_kyc.c.nik, users_kyc.c.npwp)
+        .where(sa.or_(users_kyc.c.nik.is_not(None), users_kyc.c.npwp.is_not(None)))
+    ).all()
+    if rows:
+        conn.execute(
+            users_kyc.update()
+            .where(users_kyc.c.id == sa.bindparam('kyc_id'))
+            .values(nik_hash=sa.bindparam('nik_hash'), npwp_hash=sa.bindparam('npwp_hash')),
+            [{'kyc_id': row.id, **identity_hashes(row.nik, row.npwp)} for row in rows],
+        )
+
+    op.create_index(op.f('ix_users_kyc_nik_hash'), 'users_kyc', ['nik_hash'], unique=False)
+    op.create_index(op.f('ix_users_kyc_npwp_hash'), 'users_kyc', ['npwp_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_kyc_npwp_hash'), table_name='users_kyc')
+    op.drop_index(op.f('ix_users_kyc_nik_hash'), table_name='users_kyc')
+    op.drop_column('users_kyc', 'npwp_hash')
+    op.drop_column('users_kyc', 'nik_hash')
@@ -0,0 +1,44 @@
+"""Add archive segments
+
+Revision ID: 2e9a7c5b1f38
+Revises: 8c4f0e2b6d17
+Create Date: 2026-10-18 19:37:12.648302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e9a7c5b1f38'
+down_revision: Union[str, None] = '8c4f0e2b6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('archive_segments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_block_id', sa.Integer(), nullable=False),
+    sa.Column('last_block_id', sa.Integer(), nullable=False),
+    sa.Column('block_count', sa.Integer(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+    sa.Column('byte_length', sa.Integer(), nullable=False),
+    sa.Column('aggregate_hash', sa.String(), nullable=False),
+    sa.Column('snapshot_block_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('purged_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archive_segments_user_id_last_block_id', 'archive_segments', ['user_id', 'last_block_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_archive_segments_user_id_last_block_id', table_name='archive_segments')
+    op.drop_table('archive_segments')
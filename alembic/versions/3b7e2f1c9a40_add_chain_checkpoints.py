@@ -0,0 +1,33 @@
+"""Add chain checkpoints
+
+Revision ID: 3b7e2f1c9a40
+Revises: 9146d848c774
+Create Date: 2026-10-18 09:12:04.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2f1c9a40'
+down_revision: Union[str, None] = '9146d848c774'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chain_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('block_id', sa.Integer(), nullable=False),
+    sa.Column('block_hash', sa.String(), nullable=False),
+    sa.Column('verified_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('chain_checkpoints')
@@ -0,0 +1,49 @@
+"""Queue state tree heads
+
+Revision ID: 6f2b9d4c8a15
+Revises: 2e9a7c5b1f38
+Create Date: 2026-10-19 10:12:37.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2b9d4c8a15'
+down_revision: Union[str, None] = '2e9a7c5b1f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('state_tree_leaves',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('head_block_id', sa.Integer(), nullable=False),
+    sa.Column('head_block_hash', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('state_tree_pending_heads',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('head_block_id', sa.Integer(), nullable=False),
+    sa.Column('head_block_hash', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Until now appends updated the tree in their own commit, so it covers
+    # exactly the current heads
+    op.execute(
+        """
+        INSERT INTO state_tree_leaves (user_id, head_block_id, head_block_hash)
+        SELECT id, head_block_id, head_block_hash FROM users WHERE head_block_hash IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('state_tree_pending_heads')
+    op.drop_table('state_tree_leaves')
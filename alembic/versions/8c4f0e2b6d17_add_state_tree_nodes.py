@@ -0,0 +1,73 @@
+"""Add state tree nodes
+
+Revision ID: 8c4f0e2b6d17
+Revises: 5d1c8a7e3f60
+Create Date: 2026-10-18 18:03:44.209615
+
+"""
+from hashlib import sha256
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import STATE_TREE_DEPTH
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f0e2b6d17'
+down_revision: Union[str, None] = '5d1c8a7e3f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('state_tree_nodes',
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('hash', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('level', 'position')
+    )
+    # Tree over the heads that exist today; appends keep it current from here.
+    # Hashing is spelled out here (not imported) so this revision keeps building
+    # the same tree whatever app/core/state_tree.py later becomes.
+    users = sa.table(
+        'users',
+        sa.column('id', sa.Integer()),
+        sa.column('head_block_hash', sa.String()),
+    )
+    state_tree_nodes = sa.table(
+        'state_tree_nodes',
+        sa.column('level', sa.Integer()),
+        sa.column('position', sa.Integer()),
+        sa.column('hash', sa.String()),
+    )
+
+    def node_hash(left, right):
+        return sha256(f"node|{left}|{right}".encode()).hexdigest()
+
+    empty = ["0" * 64]
+    for _ in range(STATE_TREE_DEPTH):
+        empty.append(node_hash(empty[-1], empty[-1]))
+
+    conn = op.get_bind()
+    current = {
+        row.id: sha256(f"leaf|{row.id}|{row.head_block_hash}".encode()).hexdigest()
+        for row in conn.execute(sa.select(users.c.id, users.c.head_block_hash).where(users.c.head_block_hash.is_not(None)))
+    }
+    # Only non-empty nodes are stored, level by level up to the root
+    for level in range(STATE_TREE_DEPTH):
+        rows = [{'level': level, 'position': p, 'hash': h} for p, h in current.items()]
+        for start in range(0, len(rows), 10_000):
+            conn.execute(state_tree_nodes.insert(), rows[start:start + 10_000])
+        current = {
+            p: node_hash(current.get(2 * p, empty[level]), current.get(2 * p + 1, empty[level]))
+            for p in {q >> 1 for q in current}
+        }
+    conn.execute(state_tree_nodes.insert(), [
+        {'level': STATE_TREE_DEPTH, 'position': 0, 'hash': current.get(0, empty[STATE_TREE_DEPTH])}
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('state_tree_nodes')
@@ -0,0 +1,28 @@
+"""Index idempotency keys by creation time
+
+Revision ID: 9a3d5f7b1c24
+Revises: 6f2b9d4c8a15
+Create Date: 2026-10-19 14:03:51.226871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3d5f7b1c24'
+down_revision: Union[str, None] = '6f2b9d4c8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_idempotency_keys_created_at', 'idempotency_keys', ['created_at'], unique=False)
+    op.drop_index('ix_idempotency_keys_user_id_created_at', table_name='idempotency_keys')
+
+
+def downgrade() -> None:
+    op.create_index('ix_idempotency_keys_user_id_created_at', 'idempotency_keys', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_idempotency_keys_created_at', table_name='idempotency_keys')
@@ -0,0 +1,39 @@
+"""Add user chain head pointer
+
+Revision ID: a41c0d5e7b12
+Revises: 3b7e2f1c9a40
+Create Date: 2026-10-18 10:03:51.220417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c0d5e7b12'
+down_revision: Union[str, None] = '3b7e2f1c9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('head_block_id', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('head_block_hash', sa.String(), nullable=True))
+    # Backfill from the newest block of each existing chain
+    op.execute(
+        """
+        UPDATE users SET
+            head_block_id = (SELECT MAX(b.id) FROM blocks b WHERE b.user_id = users.id),
+            head_block_hash = (
+                SELECT b.block_hash FROM blocks b
+                WHERE b.id = (SELECT MAX(b2.id) FROM blocks b2 WHERE b2.user_id = users.id)
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'head_block_hash')
+    op.drop_column('users', 'head_block_id')
@@ -0,0 +1,26 @@
+"""Add block merkle root
+
+Revision ID: c2d8e61f4a07
+Revises: a41c0d5e7b12
+Create Date: 2026-10-18 11:26:40.915302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d8e61f4a07'
+down_revision: Union[str, None] = 'a41c0d5e7b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blocks', sa.Column('merkle_root', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('blocks', 'merkle_root')
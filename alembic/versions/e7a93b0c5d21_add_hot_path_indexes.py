@@ -0,0 +1,32 @@
+"""Add hot path indexes
+
+Revision ID: e7a93b0c5d21
+Revises: c2d8e61f4a07
+Create Date: 2026-10-18 12:40:17.604839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a93b0c5d21'
+down_revision: Union[str, None] = 'c2d8e61f4a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_blocks_user_id_id', 'blocks', ['user_id', 'id'], unique=False)
+    op.create_index('ix_transactions_user_id_id', 'transactions', ['user_id', 'id'], unique=False)
+    op.create_index('ix_transactions_block_id_id', 'transactions', ['block_id', 'id'], unique=False)
+    op.create_index(op.f('ix_users_kyc_user_id'), 'users_kyc', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_kyc_user_id'), table_name='users_kyc')
+    op.drop_index('ix_transactions_block_id_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_id', table_name='transactions')
+    op.drop_index('ix_blocks_user_id_id', table_name='blocks')
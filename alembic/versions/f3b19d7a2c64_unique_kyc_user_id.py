@@ -0,0 +1,31 @@
+"""Unique KYC row per user
+
+Revision ID: f3b19d7a2c64
+Revises: e7a93b0c5d21
+Create Date: 2026-10-18 14:05:51.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b19d7a2c64'
+down_revision: Union[str, None] = 'e7a93b0c5d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the newest KYC row per user so the unique index can be built
+    op.execute(
+        "DELETE FROM users_kyc WHERE id NOT IN (SELECT MAX(id) FROM users_kyc GROUP BY user_id)"
+    )
+    op.drop_index(op.f('ix_users_kyc_user_id'), table_name='users_kyc')
+    op.create_index(op.f('ix_users_kyc_user_id'), 'users_kyc', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_kyc_user_id'), table_name='users_kyc')
+    op.create_index(op.f('ix_users_kyc_user_id'), 'users_kyc', ['user_id'], unique=False)
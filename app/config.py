@@ -11,3 +11,96 @@ DB_NAME = os.getenv("DB_NAME", "nft_core_db")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Engine / connection pool tuning (shared by the sync and async engines)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# "sync" serves the API from threadpool handlers on psycopg2; "async" from
+# coroutine handlers on an AsyncSession (asyncpg)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Rows fetched per round trip when streaming a chain (validation, audits)
+CHAIN_SCAN_BATCH_SIZE = int(os.getenv("CHAIN_SCAN_BATCH_SIZE", "1000"))
+
+# Attempts to re-read the chain head when a concurrent append moved it first
+CHAIN_APPEND_RETRIES = int(os.getenv("CHAIN_APPEND_RETRIES", "5"))
+
+# Group commit: batch concurrent transaction writes into one database commit
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5"))
+
+# Most transactions accepted by one /transaction/batch call
+TRANSACTION_BATCH_MAX_SIZE = int(os.getenv("TRANSACTION_BATCH_MAX_SIZE", "1000"))
+
+# Most records accepted by one /kyc/batch-upsert call
+KYC_BATCH_MAX_SIZE = int(os.getenv("KYC_BATCH_MAX_SIZE", "5000"))
+
+# HMAC key for the indexed NIK/NPWP lookup hashes on users_kyc. Changing it
+# requires recomputing every stored hash.
+KYC_IDENTITY_HASH_KEY = os.getenv("KYC_IDENTITY_HASH_KEY", "dev-kyc-identity-key")
+
+# Largest page /blockchain/user-chain returns when paginating
+USER_CHAIN_MAX_PAGE_SIZE = int(os.getenv("USER_CHAIN_MAX_PAGE_SIZE", "1000"))
+
+# Password hashing: bcrypt cost, and the bounded pool it runs on. When the queue
+# is full auth endpoints answer 503 instead of piling up request threads.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+
+# Pre-generated signup key material (mnemonic + ECDSA keys + wallet address).
+# The background refill tops the pool up to KEY_POOL_SIZE once it drops below
+# KEY_POOL_LOW_WATER.
+KEY_POOL_SIZE = int(os.getenv("KEY_POOL_SIZE", "256"))
+KEY_POOL_LOW_WATER = int(os.getenv("KEY_POOL_LOW_WATER", "64"))
+
+# In-process email -> (user id, wallet address) cache. Entries are dropped when
+# the ORM changes a user; the TTL bounds staleness from writes made elsewhere.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "100000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+
+# Idempotency-Key replay for /transaction/create. Keys are honoured for the TTL;
+# the in-process cache answers recent repeats without a database round trip.
+IDEMPOTENCY_KEY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "100000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = int(os.getenv("IDEMPOTENCY_KEY_MAX_LENGTH", "255"))
+# Expired keys deleted per transaction by scripts/purge_idempotency_keys.py
+IDEMPOTENCY_PURGE_BATCH = int(os.getenv("IDEMPOTENCY_PURGE_BATCH", "5000"))
+
+# Live block feed (/blockchain/feed): events buffered per subscriber before it
+# is dropped as too slow, and the idle interval between SSE keepalive comments
+BLOCK_FEED_QUEUE_SIZE = int(os.getenv("BLOCK_FEED_QUEUE_SIZE", "1000"))
+BLOCK_FEED_KEEPALIVE_SECONDS = float(os.getenv("BLOCK_FEED_KEEPALIVE_SECONDS", "15"))
+
+# Height of the sparse Merkle tree over users' chain heads: user ids must stay
+# below 2**STATE_TREE_DEPTH. Changing it requires rebuild_state_tree().
+STATE_TREE_DEPTH = int(os.getenv("STATE_TREE_DEPTH", "32"))
+# Appends only queue their head; the background updater folds queued heads into
+# the tree this often, at most STATE_TREE_UPDATE_BATCH per transaction
+STATE_TREE_UPDATE_INTERVAL_MS = float(os.getenv("STATE_TREE_UPDATE_INTERVAL_MS", "250"))
+STATE_TREE_UPDATE_BATCH = int(os.getenv("STATE_TREE_UPDATE_BATCH", "5000"))
+
+# Cold-block archive (scripts/archive_chains.py): segment files live under
+# ARCHIVE_DIR, relative to the project root unless absolute, so the API and
+# the archive job find the same files whatever directory they start in.
+# Archived rows stay in blocks/transactions for the purge grace
+# period so in-flight chain reads never see a gap; keep it at least the
+# idempotency key TTL, as keys pointing at purged transactions are deleted.
+ARCHIVE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.getenv("ARCHIVE_DIR", "archive")
+)
+ARCHIVE_SEGMENT_BLOCKS = int(os.getenv("ARCHIVE_SEGMENT_BLOCKS", "10000"))
+# Blocks per separately compressed frame of a record; a keyset page decodes only the frames it reads
+ARCHIVE_FRAME_BLOCKS = int(os.getenv("ARCHIVE_FRAME_BLOCKS", "256"))
+ARCHIVE_PURGE_GRACE_SECONDS = float(os.getenv("ARCHIVE_PURGE_GRACE_SECONDS", "86400"))
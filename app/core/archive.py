@@ -0,0 +1,226 @@
+# app/core/archive.py
+"""
+Cold storage for old blocks.
+
+scripts/archive_chains.py appends a snapshot block on top of a chain's head
+and copies the blocks below it (with their transactions) into records of an
+append-only segment file under ARCHIVE_DIR. Each record is listed in
+archive_segments, and is a header, a compressed index of (first id, last id,
+offset, length) per frame, then zlib-compressed frames of ARCHIVE_FRAME_BLOCKS
+blocks each. Once the purge grace period has passed, the rows are
+deleted from blocks/transactions. The snapshot block's data carries the
+archived head hash and a running aggregate hash of every archived block,
+and its prev_hash links it to the last archived block, so validating across
+the boundary needs nothing new.
+
+Readers (iter_chain_rows) map the segment file, skip the frames at or below
+after_id using the index, decode frames only until the page is full, and
+continue with the live table after the last archived id.
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_right
+from contextlib import closing
+from datetime import datetime, timezone
+from hashlib import sha256
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import ARCHIVE_DIR, ARCHIVE_FRAME_BLOCKS
+from app.models.archive_segment import ArchiveSegment
+
+
+class ArchivedBlock(NamedTuple):
+    # Same fields, same order as blockchain_utils.CHAIN_COLUMNS
+    id: int
+    user_id: int
+    timestamp: datetime
+    prev_hash: str | None
+    data: str | None
+    merkle_root: str | None
+    block_hash: str
+
+
+class SegmentRef(NamedTuple):
+    path: str
+    byte_offset: int
+    byte_length: int
+    first_block_id: int
+    last_block_id: int
+
+
+def aggregate_hash(previous: str | None, block_hashes: Iterable[str]) -> str:
+    """
+    Fold block hashes (in chain order) into a running aggregate, continuing from
+    the previous segment's.
+    """
+    current = previous or ""
+    for block_hash in block_hashes:
+        current = sha256(f"{current}|{block_hash}".encode()).hexdigest()
+    return current
+
+
+def snapshot_block_data(archived_blocks: int, head_hash: str, aggregate: str) -> str:
+    return f"Snapshot: {archived_blocks} blocks through {head_hash}; Aggregate: {aggregate}"
+
+
+def block_record(block, transactions: list) -> dict:
+    return {
+        "id": block.id,
+        "user_id": block.user_id,
+        "timestamp": block.timestamp.isoformat(),
+        "prev_hash": block.prev_hash,
+        "data": block.data,
+        "merkle_root": block.merkle_root,
+        "block_hash": block.block_hash,
+        "transactions": [
+            {
+                "id": tx.id,
+                "tx_type": tx.tx_type,
+                "tx_details": tx.tx_details,
+                "timestamp": tx.timestamp.isoformat() if tx.timestamp else None,
+            }
+            for tx in transactions
+        ],
+    }
+
+
+# Record header: magic, then the length of the compressed frame index
+_MAGIC = b"ZSG1"
+_HEADER = struct.Struct(">4sI")
+
+
+class SegmentWriter:
+    """
+    Appends compressed records to one segment file. Bytes already written are
+    never rewritten; a record whose manifest row never committed is simply
+    unreferenced.
+    """
+
+    def __init__(self, archive_dir: str | None = None, name: str | None = None):
+        archive_dir = archive_dir or ARCHIVE_DIR
+        os.makedirs(archive_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self.name = name or f"segment-{stamp}-{os.getpid()}.zseg"
+        self._file = open(os.path.join(archive_dir, self.name), "ab")
+
+    def append(self, records: list[dict]) -> tuple[int, int]:
+        # Returns (byte offset, byte length) of the record
+        frames, index, position = [], [], 0
+        for start in range(0, len(records), ARCHIVE_FRAME_BLOCKS):
+            chunk = records[start:start + ARCHIVE_FRAME_BLOCKS]
+            frame = zlib.compress("\n".join(json.dumps(record) for record in chunk).encode())
+            index.append([chunk[0]["id"], chunk[-1]["id"], position, len(frame)])
+            frames.append(frame)
+            position += len(frame)
+        packed_index = zlib.compress(json.dumps(index).encode())
+        payload = _HEADER.pack(_MAGIC, len(packed_index)) + packed_index + b"".join(frames)
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(payload)
+        return offset, len(payload)
+
+    def sync(self) -> None:
+        # Durable before the manifest row pointing at it commits
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _decode_frame(frame) -> list[dict]:
+    # zlib's checksum turns a damaged frame into an error rather than bad rows
+    return [json.loads(line) for line in zlib.decompress(frame).decode().split("\n")]
+
+
+def read_records(path: str, byte_offset: int, byte_length: int, after_id: int | None = None) -> Iterator[dict]:
+    """
+    Records of one segment record in id order, starting after after_id.
+    Frames are decoded as the iterator is consumed, so stopping early leaves
+    the rest of the record untouched, on disk as well as in zlib.
+    """
+    with open(os.path.join(ARCHIVE_DIR, path), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, index_length = _HEADER.unpack_from(mapped, byte_offset)
+            if magic != _MAGIC:
+                # Written before records were framed: one zlib stream
+                yield from _decode_frame(mapped[byte_offset:byte_offset + byte_length])
+                return
+            start = byte_offset + _HEADER.size
+            index = json.loads(zlib.decompress(mapped[start:start + index_length]))
+            base = start + index_length
+            first = 0 if after_id is None else bisect_right([entry[1] for entry in index], after_id)
+            for _, _, frame_offset, frame_length in index[first:]:
+                frame = mapped[base + frame_offset:base + frame_offset + frame_length]
+                for record in _decode_frame(frame):
+                    if after_id is None or record["id"] > after_id:
+                        yield record
+
+
+def segment_blocks(segment: SegmentRef, after_id: int | None = None, limit: int | None = None) -> list[ArchivedBlock]:
+    # Decodes only the frames the first `limit` blocks after after_id sit in
+    with closing(read_records(segment.path, segment.byte_offset, segment.byte_length, after_id)) as records:
+        return [
+            ArchivedBlock(
+                record["id"],
+                record["user_id"],
+                datetime.fromisoformat(record["timestamp"]),
+                record["prev_hash"],
+                record["data"],
+                record["merkle_root"],
+                record["block_hash"],
+            )
+            for record in islice(records, limit)
+        ]
+
+
+_SEGMENT_COLUMNS = (
+    ArchiveSegment.path,
+    ArchiveSegment.byte_offset,
+    ArchiveSegment.byte_length,
+    ArchiveSegment.first_block_id,
+    ArchiveSegment.last_block_id,
+)
+
+
+def _segments_query(user_id: int, after_id: int | None):
+    stmt = select(*_SEGMENT_COLUMNS).where(ArchiveSegment.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(ArchiveSegment.last_block_id > after_id)
+    return stmt.order_by(ArchiveSegment.last_block_id.asc())
+
+
+def archived_segments(db: Session, user_id: int, after_id: int | None = None) -> list[SegmentRef]:
+    return [SegmentRef(*row) for row in db.execute(_segments_query(user_id, after_id))]
+
+
+async def archived_segments_async(db: AsyncSession, user_id: int, after_id: int | None = None) -> list[SegmentRef]:
+    return [SegmentRef(*row) for row in await db.execute(_segments_query(user_id, after_id))]
+
+
+def _block_hash_in(segments: list[SegmentRef], block_id: int) -> str | None:
+    for segment in segments:
+        if segment.first_block_id <= block_id:
+            for block in segment_blocks(segment, block_id - 1, limit=1):
+                return block.block_hash if block.id == block_id else None
+    return None
+
+
+def archived_block_hash(db: Session, user_id: int, block_id: int) -> str | None:
+    # The segment holding block_id is the first one ending at or after it
+    return _block_hash_in(archived_segments(db, user_id, block_id - 1)[:1], block_id)
+
+
+async def archived_block_hash_async(db: AsyncSession, user_id: int, block_id: int) -> str | None:
+    segments = (await archived_segments_async(db, user_id, block_id - 1))[:1]
+    return await asyncio.to_thread(_block_hash_in, segments, block_id)
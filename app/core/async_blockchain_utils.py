@@ -0,0 +1,202 @@
+# app/core/async_blockchain_utils.py
+"""
+AsyncSession versions of the blockchain_utils helpers, for DB_MODE=async.
+Hashing, Merkle and link-checking logic is shared with the sync module; only
+the database round trips differ.
+"""
+
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, cast
+
+from sqlalchemy import Row, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import CHAIN_APPEND_RETRIES, CHAIN_SCAN_BATCH_SIZE
+from app.core.archive import archived_block_hash_async, archived_segments_async, segment_blocks
+from app.core.block_feed import queue_block
+from app.core.state_tree import queue_head
+from app.core.blockchain_utils import (
+    ChainConflictError,
+    ChainScan,
+    ChainScanner,
+    append_backoff,
+    chain_head_update,
+    checkpoint_advances,
+    checkpoint_anchor_query,
+    live_chain_query,
+    new_block,
+    new_genesis_block,
+    stage_checkpoint
+)
+from app.core.metrics import timed
+from app.models.block import Block
+from app.models.chain_checkpoint import ChainCheckpoint
+from app.models.user import User
+
+
+async def get_last_block_for_user(db: AsyncSession, user_id: int) -> Block | None:
+    result = await db.execute(
+        select(Block).where(Block.user_id == user_id).order_by(Block.id.desc()).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_chain_head(db: AsyncSession, user: User) -> tuple[int | None, str | None]:
+    if user.head_block_hash is not None:
+        return user.head_block_id, user.head_block_hash
+    last_block = await get_last_block_for_user(db, cast(int, user.id))
+    if last_block is None:
+        return None, None
+    return cast(int, last_block.id), str(last_block.block_hash)
+
+
+async def iter_chain_rows(
+    db: AsyncSession,
+    user_id: int,
+    after_id: int | None = None,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+    limit: int | None = None,
+) -> AsyncIterator[Row]:
+    for segment in await archived_segments_async(db, user_id, after_id):
+        # Decompressing a segment is CPU work; keep it off the event loop
+        for block in await asyncio.to_thread(segment_blocks, segment, after_id, limit):
+            if limit == 0:
+                return
+            yield block
+            after_id = block.id
+            limit = None if limit is None else limit - 1
+    if limit == 0:
+        return
+
+    result = await db.stream(live_chain_query(user_id, after_id, batch_size, limit))
+    try:
+        async for row in result:
+            yield row
+    finally:
+        await result.close()
+
+
+async def create_block(
+    db: AsyncSession,
+    user_id: int,
+    prev_hash: str,
+    data: str,
+    commit: bool = True,
+    merkle_root: str | None = None,
+) -> Block:
+    block = new_block(user_id, prev_hash, data, merkle_root)
+    db.add(block)
+    await db.flush()
+    result = await db.execute(chain_head_update(user_id, prev_hash, block))
+    if result.rowcount != 1:
+        await db.rollback()
+        raise ChainConflictError(f"Chain head of user {user_id} moved past {prev_hash}")
+    queue_block(db, block)
+    queue_head(db, user_id, block.id, block.block_hash)
+    if commit:
+        await db.commit()
+    return block
+
+
+async def append_block(
+    db: AsyncSession,
+    user: User,
+    data: str,
+    commit: bool = True,
+    retries: int = CHAIN_APPEND_RETRIES,
+    merkle_root: str | None = None,
+) -> Block:
+    user_id = cast(int, user.id)
+    for attempt in range(retries + 1):
+        _, head_hash = await get_chain_head(db, user)
+        try:
+            return await create_block(
+                db, user_id, head_hash or "GENESIS", data, commit=commit, merkle_root=merkle_root
+            )
+        except ChainConflictError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(append_backoff(attempt))
+            # Attributes cannot lazy-load under asyncio, so reload the head explicitly
+            await db.refresh(user)
+
+
+async def create_genesis_block(db: AsyncSession, user: User, commit: bool = True) -> Block:
+    if user.id is None:
+        await db.flush()
+    genesis_block = new_genesis_block(cast(int, user.id))
+    db.add(genesis_block)
+    await db.flush()
+    user.head_block_id = genesis_block.id
+    user.head_block_hash = genesis_block.block_hash
+    queue_block(db, genesis_block)
+    queue_head(db, cast(int, user.id), genesis_block.id, genesis_block.block_hash)
+    if commit:
+        await db.commit()
+    return genesis_block
+
+
+async def scan_chain(blocks: AsyncIterator, prev_hash: str | None = None) -> ChainScan:
+    scanner = ChainScanner(prev_hash)
+    async for block in blocks:
+        if not scanner.add(block):
+            break
+    return scanner.result()
+
+
+async def _advance_checkpoint(db: AsyncSession, user_id: int, block_id: int, block_hash: str) -> None:
+    stage_checkpoint(db, await db.get(ChainCheckpoint, user_id), user_id, block_id, block_hash)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+
+@timed("validate_user_chain")
+async def validate_user_chain(
+    db: AsyncSession,
+    user_id: int,
+    full: bool = False,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+) -> bool:
+    after_id = None
+    prev_hash = None
+
+    checkpoint = None if full else await db.get(ChainCheckpoint, user_id)
+    if checkpoint:
+        anchor_hash = await db.scalar(checkpoint_anchor_query(user_id, checkpoint))
+        if anchor_hash is None:
+            anchor_hash = await archived_block_hash_async(db, user_id, checkpoint.block_id)
+        if anchor_hash != checkpoint.block_hash:
+            return False
+        after_id = checkpoint.block_id
+        prev_hash = checkpoint.block_hash
+
+    async with aclosing(iter_chain_rows(db, user_id, after_id, batch_size)) as rows:
+        scan = await scan_chain(rows, prev_hash)
+    if not scan.valid:
+        return False
+
+    if checkpoint_advances(scan, checkpoint):
+        await _advance_checkpoint(db, user_id, scan.last_id, scan.last_hash)
+    return True
+
+
+async def validate_new_transaction(
+    db: AsyncSession,
+    user_id: int,
+    block_id: int | None = None,
+    user: User | None = None,
+) -> bool:
+    if user is None:
+        user = await db.get(User, user_id)
+    if not user:
+        return False
+
+    head_id, _ = await get_chain_head(db, user)
+    if block_id and head_id and (head_id != block_id):
+        return False
+
+    return True
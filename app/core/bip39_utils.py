@@ -2,10 +2,12 @@
 
 from mnemonic import Mnemonic
 
+# Loading the wordlist is the slow part; do it once per process
+_mnemo = Mnemonic("english")
+
 def generate_bip39_mnemonic() -> str:
     """
     Generates a 12-word BIP39 mnemonic (English).
     """
-    mnemo = Mnemonic("english")
-    words = mnemo.generate(strength=128)  # 128 bits => 12 words
+    words = _mnemo.generate(strength=128)  # 128 bits => 12 words
     return words
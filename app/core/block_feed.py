@@ -0,0 +1,259 @@
+# app/core/block_feed.py
+"""
+Live feed of committed blocks (with their transactions), served as
+Server-Sent Events from /blockchain/feed and /blockchain/feed/{email}.
+
+create_block / create_genesis_block and the transaction writers queue events
+on the session (session.info); they are published only once that session
+commits, and dropped on rollback. block_feed fans them out to subscribers
+through bounded per-subscriber asyncio queues. A subscriber whose queue is
+full is dropped rather than allowed to hold up the writers or buffer without
+limit; it gets a final "dropped" event and resumes by reconnecting with
+Last-Event-ID, which backfills the gap from the database.
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import BLOCK_FEED_KEEPALIVE_SECONDS, BLOCK_FEED_QUEUE_SIZE, CHAIN_SCAN_BATCH_SIZE
+from app.core.metrics import REGISTRY, Counter
+from app.models.block import Block
+from app.models.transaction import Transaction
+
+FEED_DROPPED = REGISTRY.register(Counter(
+    "block_feed_dropped_subscribers_total", "Feed subscribers dropped for falling behind."
+))
+
+_PENDING_KEY = "block_feed_pending"
+
+_BLOCK_COLUMNS = (
+    Block.id, Block.user_id, Block.block_hash, Block.prev_hash, Block.timestamp, Block.data, Block.merkle_root
+)
+
+
+def block_event(block, transactions: list[dict] | None = None) -> dict:
+    """
+    JSON-ready event for a Block (or a row of the same columns); the block
+    fields match BlockSchema.
+    """
+    return {
+        "id": block.id,
+        "user_id": block.user_id,
+        "block_hash": block.block_hash,
+        "prev_hash": block.prev_hash or None,
+        "data": block.data or None,
+        "timestamp": block.timestamp.isoformat(),
+        "merkle_root": block.merkle_root,
+        "transactions": transactions if transactions is not None else [],
+    }
+
+
+class Subscription:
+    """
+    One feed consumer, bound to the event loop it subscribed from. A None in
+    the queue means the hub dropped it.
+    """
+
+    def __init__(self, user_id: int | None, queue_size: int):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def wants(self, block: dict) -> bool:
+        return self.user_id is None or block["user_id"] == self.user_id
+
+
+class BlockFeedHub:
+    def __init__(self, queue_size: int = BLOCK_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, user_id: int | None = None) -> Subscription:
+        # Must be called on the event loop that will consume the subscription
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, events: list[dict]) -> None:
+        """
+        Hand committed block events to every interested subscriber. Safe to call
+        from any thread; delivery happens on each subscriber's own loop.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        by_loop: dict[asyncio.AbstractEventLoop, list[Subscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, group, events)
+            except RuntimeError:
+                # Loop already closed; its subscribers are gone with it
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, subscriptions: list[Subscription], events: list[dict]) -> None:
+        for subscription in subscriptions:
+            if subscription.dropped:
+                continue
+            for block in events:
+                if not subscription.wants(block):
+                    continue
+                try:
+                    subscription.queue.put_nowait(block)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+                    break
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        FEED_DROPPED.inc()
+        # Make room for the end-of-stream marker; the client backfills on reconnect
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+block_feed = BlockFeedHub()
+
+REGISTRY.add_gauges(lambda: {"block_feed_subscribers": ("Open block feed subscriptions.", len(block_feed))})
+
+
+def queue_block(db: Session | AsyncSession, block: Block) -> None:
+    """
+    Publish block (already flushed) when db commits. Values are copied now, as
+    commit expires the object.
+    """
+    db.info.setdefault(_PENDING_KEY, {})[block.id] = block_event(block)
+
+
+def queue_transactions(db: Session | AsyncSession, block_id: int, transactions: Iterable[dict]) -> None:
+    # Attach {id, tx_type, tx_details} rows to a block queued in this session
+    pending = db.info.get(_PENDING_KEY, {}).get(block_id)
+    if pending is not None:
+        pending["transactions"].extend(transactions)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        block_feed.publish(sorted(pending.values(), key=lambda block: block["id"]))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _events_query(user_id: int | None, after_id: int, limit: int):
+    stmt = select(*_BLOCK_COLUMNS).where(Block.id > after_id)
+    if user_id is not None:
+        stmt = stmt.where(Block.user_id == user_id)
+    return stmt.order_by(Block.id.asc()).limit(limit)
+
+
+def _transactions_query(block_ids: list[int]):
+    return (
+        select(Transaction.id, Transaction.block_id, Transaction.tx_type, Transaction.tx_details)
+        .where(Transaction.block_id.in_(block_ids))
+        .order_by(Transaction.id.asc())
+    )
+
+
+def _with_transactions(block_rows, tx_rows) -> list[dict]:
+    events = {row.id: block_event(row) for row in block_rows}
+    for tx in tx_rows:
+        events[tx.block_id]["transactions"].append(
+            {"id": tx.id, "tx_type": tx.tx_type, "tx_details": tx.tx_details}
+        )
+    return list(events.values())
+
+
+def fetch_block_events(
+    db: Session, user_id: int | None, after_id: int, limit: int = CHAIN_SCAN_BATCH_SIZE
+) -> list[dict]:
+    """
+    Committed blocks after after_id (one user's, or everyone's) in id order, as
+    feed events; backfills a resuming subscriber.
+    """
+    block_rows = db.execute(_events_query(user_id, after_id, limit)).all()
+    if not block_rows:
+        return []
+    tx_rows = db.execute(_transactions_query([row.id for row in block_rows])).all()
+    return _with_transactions(block_rows, tx_rows)
+
+
+async def fetch_block_events_async(
+    db: AsyncSession, user_id: int | None, after_id: int, limit: int = CHAIN_SCAN_BATCH_SIZE
+) -> list[dict]:
+    block_rows = (await db.execute(_events_query(user_id, after_id, limit))).all()
+    if not block_rows:
+        return []
+    tx_rows = (await db.execute(_transactions_query([row.id for row in block_rows]))).all()
+    return _with_transactions(block_rows, tx_rows)
+
+
+def sse_message(block: dict) -> str:
+    return f"id: {block['id']}\nevent: block\ndata: {json.dumps(block)}\n\n"
+
+
+async def sse_events(
+    user_id: int | None,
+    after_id: int | None,
+    fetch_after: Callable[[int], Awaitable[list[dict]]],
+    hub: BlockFeedHub = block_feed,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+    keepalive: float = BLOCK_FEED_KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    SSE body: blocks after after_id from fetch_after (if resuming), then live
+    blocks until the client disconnects or is dropped.
+    """
+    # Subscribe before the backfill so nothing committed in between is missed
+    subscription = hub.subscribe(user_id)
+    try:
+        # Live events can repeat what the backfill already sent. Only as many
+        # as fit in the queue were published meanwhile, so remembering that
+        # many backfilled ids is enough to skip them.
+        backfilled: deque[int] = deque(maxlen=hub.queue_size)
+        while after_id is not None:
+            events = await fetch_after(after_id)
+            for block in events:
+                backfilled.append(block["id"])
+                yield sse_message(block)
+            after_id = events[-1]["id"] if len(events) == batch_size else None
+        seen = set(backfilled)
+
+        while True:
+            try:
+                block = await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from timing the stream out
+                yield ": keepalive\n\n"
+                continue
+            if block is None:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            if block["id"] not in seen:
+                yield sse_message(block)
+    finally:
+        hub.unsubscribe(subscription)
@@ -1,8 +1,35 @@
+import random
+import time
+from typing import Iterable, Iterator, NamedTuple, cast
+
+from sqlalchemy import Row, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from hashlib import sha256
 from datetime import datetime, timezone
 
+from app.config import CHAIN_APPEND_RETRIES, CHAIN_SCAN_BATCH_SIZE
+from app.core.archive import archived_block_hash, archived_segments, segment_blocks
+from app.core.block_feed import queue_block
+from app.core.group_commit import in_group_batch
+from app.core.state_tree import queue_head
+from app.core.metrics import timed
 from app.models.block import Block
+from app.models.chain_checkpoint import ChainCheckpoint
+from app.models.user import User
+
+
+class ChainConflictError(Exception):
+    """The chain head moved between reading it and appending to it."""
+
+
+class ChainScan(NamedTuple):
+    valid: bool
+    blocks_checked: int
+    last_id: int | None
+    last_hash: str | None
+    bad_block_id: int | None = None
 
 
 def get_last_block_for_user(db: Session, user_id: int) -> Block | None:
@@ -14,63 +41,399 @@ def get_last_block_for_user(db: Session, user_id: int) -> Block | None:
     )
 
 
+def get_chain_head(db: Session, user: User) -> tuple[int | None, str | None]:
+    """
+    Head block (id, hash) from the pointer on the user row, so callers that already
+    hold the user need no extra query. Rows from before the pointer existed fall back
+    to the blocks table.
+    """
+    if user.head_block_hash is not None:
+        return user.head_block_id, user.head_block_hash
+    last_block = get_last_block_for_user(db, cast(int, user.id))
+    if last_block is None:
+        return None, None
+    return cast(int, last_block.id), str(last_block.block_hash)
+
+
+# Only what scan_chain needs, so streaming never builds ORM objects
+CHAIN_COLUMNS = (
+    Block.id, Block.user_id, Block.timestamp, Block.prev_hash, Block.data, Block.merkle_root, Block.block_hash
+)
+
+
+def iter_chain_rows(
+    db: Session,
+    user_id: int,
+    after_id: int | None = None,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+    limit: int | None = None,
+) -> Iterator[Row]:
+    """
+    Stream a user's blocks in id order as column tuples, batch_size rows per fetch
+    (server-side cursor where the driver supports it), so memory stays flat.
+    after_id/limit give keyset pages: pass the last id seen to get the next page.
+    Archived blocks come first, one segment at a time, then the live table.
+    """
+    for segment in archived_segments(db, user_id, after_id):
+        for block in segment_blocks(segment, after_id, limit):
+            if limit == 0:
+                return
+            yield block
+            after_id = block.id
+            limit = None if limit is None else limit - 1
+    if limit == 0:
+        return
+
+    yield from db.execute(live_chain_query(user_id, after_id, batch_size, limit))
+
+
+def live_chain_query(user_id: int, after_id: int | None, batch_size: int, limit: int | None = None):
+    # The live-table part of iter_chain_rows, in both modes
+    stmt = select(*CHAIN_COLUMNS).where(Block.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Block.id > after_id)
+    stmt = stmt.order_by(Block.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt.execution_options(yield_per=batch_size)
+
+
 def compute_block_hash(raw_string: str) -> str:
     return sha256(raw_string.encode("utf-8")).hexdigest()
 
 
-def create_block(db: Session, user_id: int, prev_hash: str, data: str) -> Block:
-    timestamp_str = datetime.now(timezone.utc).isoformat()
-    new_block_hash = compute_block_hash(f"{user_id}{timestamp_str}{prev_hash}{data}")
+def block_raw_string(
+    user_id: int,
+    timestamp: datetime,
+    prev_hash: str | None,
+    data: str | None,
+    merkle_root: str | None = None,
+) -> str:
+    # Blocks without transactions (and older blocks) hash exactly as before
+    raw = f"{user_id}{timestamp.isoformat()}{prev_hash}{data}"
+    return raw if merkle_root is None else f"{raw}{merkle_root}"
+
+
+def transaction_leaf_hash(user_id: int, tx_type: str, tx_details: str | None) -> str:
+    return compute_block_hash(f"leaf:{user_id}:{tx_type}:{tx_details or ''}")
+
+
+def _merkle_parent(left: str, right: str) -> str:
+    return compute_block_hash(f"node:{left}{right}")
+
 
-    new_block = Block(
+def _merkle_levels(leaves: list[str]) -> list[list[str]]:
+    # An odd node out is promoted unchanged rather than paired with itself
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_merkle_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(leaves: list[str]) -> str | None:
+    if not leaves:
+        return None
+    return _merkle_levels(leaves)[-1][0]
+
+
+def merkle_proof(leaves: list[str], index: int) -> list[dict]:
+    """
+    Sibling hashes from leaf to root; "position" tells which side the sibling is on.
+    """
+    proof = []
+    for level in _merkle_levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"hash": level[sibling], "position": "left" if sibling < index else "right"})
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf_hash: str, proof: list[dict], root: str) -> bool:
+    current = leaf_hash
+    for step in proof:
+        if step["position"] == "left":
+            current = _merkle_parent(step["hash"], current)
+        else:
+            current = _merkle_parent(current, step["hash"])
+    return current == root
+
+
+def _utc_now() -> datetime:
+    # Stored as naive UTC so the value read back hashes to the same string
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def chain_head_update(user_id: int, prev_hash: str, block: Block):
+    # Compare-and-swap: only move the head if it is still the block we chained onto.
+    # The row lock taken by the UPDATE makes a concurrent append wait, then miss.
+    return (
+        update(User)
+        .where(
+            User.id == user_id,
+            or_(User.head_block_hash == prev_hash, User.head_block_hash.is_(None))
+        )
+        .values(head_block_id=block.id, head_block_hash=block.block_hash)
+    )
+
+
+def _move_chain_head(db: Session, user_id: int, prev_hash: str, block: Block) -> None:
+    result = db.execute(chain_head_update(user_id, prev_hash, block))
+    if result.rowcount != 1:
+        raise ChainConflictError(f"Chain head of user {user_id} moved past {prev_hash}")
+
+
+def new_block(user_id: int, prev_hash: str, data: str, merkle_root: str | None = None) -> Block:
+    timestamp = _utc_now()
+    return Block(
         user_id=user_id,
-        block_hash=new_block_hash,
+        block_hash=compute_block_hash(block_raw_string(user_id, timestamp, prev_hash, data, merkle_root)),
         prev_hash=prev_hash,
-        data=data
+        timestamp=timestamp,
+        data=data,
+        merkle_root=merkle_root
     )
-    db.add(new_block)
-    db.commit()
-    db.refresh(new_block)
-    return new_block
 
 
-def validate_user_chain(db: Session, user_id: int) -> bool:
-    blocks = (
-        db.query(Block)
-        .filter(Block.user_id == user_id)
-        .order_by(Block.id.asc())
-        .all()
+def genesis_block_hash(user_id: int, timestamp: datetime) -> str:
+    return compute_block_hash(f"{user_id}{timestamp.isoformat()}GENESIS")
+
+
+def new_genesis_block(user_id: int) -> Block:
+    timestamp = _utc_now()
+    return Block(
+        user_id=user_id,
+        block_hash=genesis_block_hash(user_id, timestamp),
+        prev_hash="GENESIS",
+        timestamp=timestamp,
+        data="User genesis block"
     )
-    if not blocks:
-        return True
 
-    for i in range(1, len(blocks)):
-        prev_block = blocks[i - 1]
-        current_block = blocks[i]
-        if current_block.prev_hash != prev_block.block_hash:
+
+def create_block(
+    db: Session,
+    user_id: int,
+    prev_hash: str,
+    data: str,
+    commit: bool = True,
+    merkle_root: str | None = None,
+) -> Block:
+    """
+    Append a block and move the user's chain head to it.
+    prev_hash must be the current head; otherwise the session is rolled back (left
+    to the committer inside a group commit batch) and ChainConflictError is raised
+    (see append_block for the retrying version).
+    With commit=False the block is only flushed (id assigned) so the caller can
+    write related rows and commit everything at once.
+    """
+    block = new_block(user_id, prev_hash, data, merkle_root)
+    db.add(block)
+    db.flush()
+    try:
+        _move_chain_head(db, user_id, prev_hash, block)
+    except ChainConflictError:
+        # A group commit batch rolls back (and re-runs) all of its items itself
+        if not in_group_batch(db):
+            db.rollback()
+        raise
+    queue_block(db, block)
+    queue_head(db, user_id, block.id, block.block_hash)
+    if commit:
+        db.commit()
+        db.refresh(block)
+    return block
+
+
+def append_block(
+    db: Session,
+    user: User,
+    data: str,
+    commit: bool = True,
+    retries: int = CHAIN_APPEND_RETRIES,
+    merkle_root: str | None = None,
+) -> Block:
+    """
+    Append to the user's current head, re-reading the head and retrying when a
+    concurrent writer got there first. Call it before adding other rows to the
+    session: a conflict rolls the session back.
+    """
+    for attempt in range(retries + 1):
+        _, head_hash = get_chain_head(db, user)
+        try:
+            return create_block(
+                db, cast(int, user.id), head_hash or "GENESIS", data, commit=commit, merkle_root=merkle_root
+            )
+        except ChainConflictError:
+            # Rollback expired the user, so the next head read hits the database.
+            # Inside a group commit batch nothing was rolled back: let the batch fail
+            if attempt == retries or in_group_batch(db):
+                raise
+            time.sleep(append_backoff(attempt))
+
+
+def append_backoff(attempt: int) -> float:
+    return random.uniform(0, 0.002 * (attempt + 1))
+
+
+def create_genesis_block(db: Session, user: User, commit: bool = True) -> Block:
+    """
+    Create the first block of a freshly added user's chain and point the head at it.
+    """
+    if user.id is None:
+        db.flush()
+    genesis_block = new_genesis_block(cast(int, user.id))
+    db.add(genesis_block)
+    db.flush()
+    user.head_block_id = genesis_block.id
+    user.head_block_hash = genesis_block.block_hash
+    queue_block(db, genesis_block)
+    queue_head(db, cast(int, user.id), genesis_block.id, genesis_block.block_hash)
+    if commit:
+        db.commit()
+    return genesis_block
+
+
+def block_follows(block, prev_hash: str) -> bool:
+    """
+    True if block links to prev_hash and its stored hash matches its contents.
+    """
+    if block.prev_hash != prev_hash:
+        return False
+    # Re-check hash
+    raw_str = block_raw_string(block.user_id, block.timestamp, block.prev_hash, block.data, block.merkle_root)
+    return compute_block_hash(raw_str) == block.block_hash
+
+
+class ChainScanner:
+    """
+    The link check of scan_chain, one block at a time, so the sync and async
+    scans differ only in how they iterate.
+    """
+
+    def __init__(self, prev_hash: str | None = None):
+        self.checked = 0
+        self.last_id: int | None = None
+        self.last_hash = prev_hash
+        self.bad_block_id: int | None = None
+
+    def add(self, block) -> bool:
+        # False at the first bad block; stop feeding there
+        if self.last_hash is not None and not block_follows(block, self.last_hash):
+            self.bad_block_id = block.id
             return False
-        # Re-check hash
-        raw_str = f"{current_block.user_id}{current_block.timestamp.isoformat()}{current_block.prev_hash}{current_block.data}"
-        if compute_block_hash(raw_str) != current_block.block_hash:
+        self.checked += 1
+        self.last_id, self.last_hash = block.id, block.block_hash
+        return True
+
+    def result(self) -> ChainScan:
+        return ChainScan(self.bad_block_id is None, self.checked, self.last_id, self.last_hash, self.bad_block_id)
+
+
+def scan_chain(blocks: Iterable, prev_hash: str | None = None) -> ChainScan:
+    """
+    Walk blocks in id order, checking prev-hash links and re-hashing each block.
+    With no prev_hash the first block is taken as the chain anchor (genesis).
+    Stops at the first bad block.
+    """
+    scanner = ChainScanner(prev_hash)
+    for block in blocks:
+        if not scanner.add(block):
+            break
+    return scanner.result()
+
+
+def checkpoint_anchor_query(user_id: int, checkpoint: ChainCheckpoint):
+    # The checkpointed block must still be there, unchanged
+    return select(Block.block_hash).where(Block.id == checkpoint.block_id, Block.user_id == user_id)
+
+
+def checkpoint_advances(scan: ChainScan, checkpoint: ChainCheckpoint | None) -> bool:
+    return scan.last_id is not None and (checkpoint is None or scan.last_id != checkpoint.block_id)
+
+
+def stage_checkpoint(
+    db: Session | AsyncSession,
+    checkpoint: ChainCheckpoint | None,
+    user_id: int,
+    block_id: int,
+    block_hash: str,
+) -> None:
+    # Moves (or creates) the user's checkpoint; the caller commits
+    if checkpoint is None:
+        checkpoint = ChainCheckpoint(user_id=user_id)
+        db.add(checkpoint)
+    checkpoint.block_id = block_id
+    checkpoint.block_hash = block_hash
+    checkpoint.verified_at = datetime.now(timezone.utc)
+
+
+def _advance_checkpoint(db: Session, user_id: int, block_id: int, block_hash: str) -> None:
+    stage_checkpoint(db, db.get(ChainCheckpoint, user_id), user_id, block_id, block_hash)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent validation created the checkpoint first; it is just as good
+        db.rollback()
+
+
+@timed("validate_user_chain")
+def validate_user_chain(
+    db: Session,
+    user_id: int,
+    full: bool = False,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+) -> bool:
+    """
+    Validate a user's chain, re-hashing only the blocks after the verified checkpoint.
+    full=True ignores the checkpoint and re-verifies every block (audits).
+    Blocks are streamed in batches, so memory does not grow with chain length.
+    On success the checkpoint is moved forward to the chain head.
+    """
+    after_id = None
+    prev_hash = None
+
+    checkpoint = None if full else db.get(ChainCheckpoint, user_id)
+    if checkpoint:
+        anchor_hash = db.scalar(checkpoint_anchor_query(user_id, checkpoint))
+        if anchor_hash is None:
+            anchor_hash = archived_block_hash(db, user_id, checkpoint.block_id)
+        if anchor_hash != checkpoint.block_hash:
             return False
+        after_id = checkpoint.block_id
+        prev_hash = checkpoint.block_hash
+
+    scan = scan_chain(iter_chain_rows(db, user_id, after_id, batch_size), prev_hash)
+    if not scan.valid:
+        return False
 
+    if checkpoint_advances(scan, checkpoint):
+        _advance_checkpoint(db, user_id, scan.last_id, scan.last_hash)
     return True
 
 
-def validate_new_transaction(db: Session, user_id: int, block_id: int | None = None) -> bool:
+def validate_new_transaction(
+    db: Session,
+    user_id: int,
+    block_id: int | None = None,
+    user: User | None = None,
+) -> bool:
     """
     A placeholder for transaction validation logic:
-    1. Confirm user exists.
+    1. Confirm user exists (pass user if already loaded to skip the lookup).
     2. Confirm block_id (if provided) is the last block for this user.
     3. Additional checks can be inserted (balances, signatures, etc.).
     """
-    from app.models.user import User
-    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return False
 
-    last_block = get_last_block_for_user(db, user_id)
-    if block_id and last_block and (last_block.id != block_id):
+    head_id, _ = get_chain_head(db, user)
+    if block_id and head_id and (head_id != block_id):
         return False
 
     return True
@@ -3,6 +3,9 @@
 import ecdsa
 import hashlib
 
+from app.core.metrics import timed
+
+@timed("generate_key_pair")
 def generate_key_pair():
     """
     Generate a private/public key pair using ECDSA (secp256k1).
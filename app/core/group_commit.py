@@ -0,0 +1,147 @@
+# app/core/group_commit.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_MAX_DELAY_MS
+from app.database import SessionLocal
+
+T = TypeVar("T")
+
+_STOP = object()
+
+_BATCH_KEY = "group_commit_batch"
+
+
+def in_group_batch(db: Session) -> bool:
+    """
+    True on the session a batch shares between callers. Work running there must
+    not roll the session back (that would drop the other callers' writes) and
+    should raise instead; the committer then re-runs every item on its own.
+    """
+    return db.info.get(_BATCH_KEY, False)
+
+
+class GroupCommitter:
+    """
+    Runs write callbacks from many request threads on one background session and
+    commits them together, so N appends cost one commit (one fsync) instead of N.
+
+    A batch closes when it holds max_batch items or max_delay seconds after its
+    first item arrived. submit() returns only after the batch commit succeeded.
+    If the batch fails, every item is re-run on its own so one bad write (or a
+    chain head conflict) only fails its own caller. Callbacks must therefore be
+    safe to run again on a fresh session, and must raise rather than roll back
+    the shared session (see in_group_batch).
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+        max_delay: float = GROUP_COMMIT_MAX_DELAY_MS / 1000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def submit(self, work: Callable[[Session], T]) -> T:
+        future: Future = Future()
+        self.start()
+        self._queue.put((work, future))
+        return future.result()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        pending = [(work, future) for work, future in batch if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+        if len(pending) == 1:
+            self._flush_one(*pending[0])
+            return
+
+        db = self.session_factory()
+        db.info[_BATCH_KEY] = True
+        try:
+            results = [work(db) for work, _ in pending]
+            db.commit()
+        except Exception:
+            db.rollback()
+            for work, future in pending:
+                self._flush_one(work, future)
+            return
+        finally:
+            db.close()
+
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+
+    def _flush_one(self, work: Callable[[Session], T], future: Future) -> None:
+        db = self.session_factory()
+        try:
+            result = work(db)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+        finally:
+            db.close()
+
+
+_group_committer: GroupCommitter | None = None
+
+
+def get_group_committer() -> GroupCommitter:
+    global _group_committer
+    if _group_committer is None:
+        _group_committer = GroupCommitter(SessionLocal)
+    return _group_committer
+
+
+def stop_group_committer() -> None:
+    if _group_committer is not None:
+        _group_committer.stop()
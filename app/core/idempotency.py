@@ -0,0 +1,147 @@
+# app/core/idempotency.py
+"""
+Idempotency-Key bookkeeping for transaction submission.
+
+The first request with a key stores (user, key) -> transaction id in
+idempotency_keys inside the same database transaction as its block, so a
+key exists exactly when its transaction does. Repeats within the TTL get the
+stored outcome back without touching the chain; a retry racing the original
+hits the unique constraint, rolls back its own block and replays instead.
+Recent outcomes are also kept in an in-process LRU. Expired rows are deleted
+in batches by scripts/purge_idempotency_keys.py; one a client reuses before
+that is dropped on the spot.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL_SECONDS, IDEMPOTENCY_PURGE_BATCH
+from app.core.cache import LRUCache
+from app.models.idempotency_key import IdempotencyKey
+
+
+class StoredOutcome(NamedTuple):
+    transaction_id: int
+    request_hash: str
+
+
+idempotency_cache: LRUCache[tuple[int, str], StoredOutcome] = LRUCache(
+    IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL_SECONDS
+)
+
+
+def request_hash(tx_type: str, tx_details: str | None) -> str:
+    return hashlib.sha256(json.dumps([tx_type, tx_details]).encode()).hexdigest()
+
+
+def _utc_now() -> datetime:
+    # Naive UTC, like the stored created_at
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _outcome_query(user_id: int, key: str):
+    return select(IdempotencyKey.transaction_id, IdempotencyKey.request_hash, IdempotencyKey.created_at).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at > _utc_now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS),
+    )
+
+
+def _from_row(user_id: int, key: str, row) -> StoredOutcome | None:
+    if row is None:
+        return None
+    outcome = StoredOutcome(row.transaction_id, row.request_hash)
+    # Cached only for what is left of the key's TTL
+    remaining = IDEMPOTENCY_KEY_TTL_SECONDS - (_utc_now() - row.created_at).total_seconds()
+    idempotency_cache.set((user_id, key), outcome, ttl=remaining)
+    return outcome
+
+
+def remember_outcome(user_id: int, key: str, outcome: StoredOutcome) -> None:
+    # Call after the commit that stored the key
+    idempotency_cache.set((user_id, key), outcome)
+
+
+def find_outcome(db: Session, user_id: int, key: str) -> StoredOutcome | None:
+    outcome = idempotency_cache.get((user_id, key))
+    if outcome is None:
+        outcome = _from_row(user_id, key, db.execute(_outcome_query(user_id, key)).first())
+    return outcome
+
+
+async def find_outcome_async(db: AsyncSession, user_id: int, key: str) -> StoredOutcome | None:
+    outcome = idempotency_cache.get((user_id, key))
+    if outcome is None:
+        outcome = _from_row(user_id, key, (await db.execute(_outcome_query(user_id, key))).first())
+    return outcome
+
+
+def _new_key_row(user_id: int, key: str, req_hash: str, transaction_id: int) -> IdempotencyKey:
+    return IdempotencyKey(user_id=user_id, key=key, request_hash=req_hash, transaction_id=transaction_id)
+
+
+def store_key(db: Session, user_id: int, key: str, req_hash: str, transaction_id: int) -> None:
+    """
+    Record the key in the caller's transaction; raises IntegrityError on flush
+    when another request already stored it, or when an expired row for the key
+    has not been purged yet (see drop_expired_key).
+    """
+    db.add(_new_key_row(user_id, key, req_hash, transaction_id))
+    db.flush()
+
+
+async def store_key_async(db: AsyncSession, user_id: int, key: str, req_hash: str, transaction_id: int) -> None:
+    db.add(_new_key_row(user_id, key, req_hash, transaction_id))
+    await db.flush()
+
+
+def _expired_cutoff() -> datetime:
+    return _utc_now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+
+
+def _expired_key(user_id: int, key: str):
+    return delete(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at <= _expired_cutoff(),
+    )
+
+
+def drop_expired_key(db: Session, user_id: int, key: str) -> bool:
+    """
+    Delete the key's row if it has expired but is still waiting for the purge,
+    so the key can be stored again; returns whether there was one. No commit.
+    """
+    return db.execute(_expired_key(user_id, key)).rowcount > 0
+
+
+async def drop_expired_key_async(db: AsyncSession, user_id: int, key: str) -> bool:
+    return (await db.execute(_expired_key(user_id, key))).rowcount > 0
+
+
+def purge_expired_keys(db: Session, batch_size: int = IDEMPOTENCY_PURGE_BATCH) -> int:
+    """
+    Delete every expired key, oldest first through the created_at index,
+    batch_size rows per transaction; returns the number deleted.
+    """
+    cutoff = _expired_cutoff()
+    total = 0
+    while True:
+        ids = db.scalars(
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.created_at <= cutoff)
+            .order_by(IdempotencyKey.created_at)
+            .limit(batch_size)
+        ).all()
+        if ids:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
@@ -0,0 +1,80 @@
+# app/core/identity.py
+"""
+Indexed lookups for identity numbers (NIK/NPWP) on users_kyc.
+
+The raw numbers are free-form ("09.254.294.3-407.000" and "092542943407000"
+are the same NPWP), so every row also stores an HMAC of the normalized value.
+Duplicate checks compare those hashes through an index instead of scanning
+and normalizing every row.
+"""
+
+import hashlib
+import hmac
+import re
+
+from sqlalchemy import Select, func, select
+
+from app.config import KYC_IDENTITY_HASH_KEY
+from app.models.user_kyc import UserKyc
+
+# Identity fields that get a lookup hash, and the column holding it
+IDENTITY_COLUMNS = {"nik": UserKyc.nik_hash, "npwp": UserKyc.npwp_hash}
+
+_SEPARATORS = re.compile(r"[^0-9A-Za-z]")
+
+
+def normalize_identity(value: str | None) -> str | None:
+    if value is None:
+        return None
+    normalized = _SEPARATORS.sub("", value).upper()
+    return normalized or None
+
+
+def identity_hash(value: str | None) -> str | None:
+    normalized = normalize_identity(value)
+    if normalized is None:
+        return None
+    return hmac.new(KYC_IDENTITY_HASH_KEY.encode("utf-8"), normalized.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def identity_hashes(nik: str | None, npwp: str | None) -> dict[str, str | None]:
+    return {"nik_hash": identity_hash(nik), "npwp_hash": identity_hash(npwp)}
+
+
+def identity_matches(field: str, value: str | None, exclude_user_id: int | None = None) -> Select | None:
+    """
+    user_ids whose KYC has the same normalized NIK or NPWP as value; None if value is blank.
+    """
+    digest = identity_hash(value)
+    if digest is None:
+        return None
+    stmt = select(UserKyc.user_id).where(IDENTITY_COLUMNS[field] == digest)
+    if exclude_user_id is not None:
+        stmt = stmt.where(UserKyc.user_id != exclude_user_id)
+    return stmt.order_by(UserKyc.user_id)
+
+
+def duplicate_identities(field: str) -> Select:
+    """
+    (hash, user_id) for every row whose NIK or NPWP hash is shared by another
+    row, ordered by hash so callers can group consecutive rows.
+    """
+    column = IDENTITY_COLUMNS[field]
+    shared = (
+        select(column)
+        .where(column.is_not(None))
+        .group_by(column)
+        .having(func.count() > 1)
+    )
+    return select(column, UserKyc.user_id).where(column.in_(shared)).order_by(column, UserKyc.user_id)
+
+
+def group_duplicates(rows) -> list[list[int]]:
+    groups: list[list[int]] = []
+    last_hash = None
+    for digest, user_id in rows:
+        if digest != last_hash:
+            groups.append([])
+            last_hash = digest
+        groups[-1].append(user_id)
+    return groups
@@ -0,0 +1,87 @@
+# app/core/key_pool.py
+
+import threading
+from collections import deque
+from typing import NamedTuple
+
+from app.config import KEY_POOL_LOW_WATER, KEY_POOL_SIZE
+from app.core.bip39_utils import generate_bip39_mnemonic
+from app.core.crypto_utils import generate_key_pair, derive_wallet_address
+
+
+class KeyMaterial(NamedTuple):
+    mnemonic: str
+    private_key_hex: str
+    public_key_hex: str
+    wallet_address: str
+
+
+def generate_key_material() -> KeyMaterial:
+    mnemonic = generate_bip39_mnemonic()
+    private_key_hex, public_key_hex = generate_key_pair()
+    return KeyMaterial(mnemonic, private_key_hex, public_key_hex, derive_wallet_address(public_key_hex))
+
+
+class KeyMaterialPool:
+    """
+    Ready-made signup key material, refilled by a background thread so the
+    secp256k1 keygen and mnemonic work happen off the request path.
+    Each item is handed out exactly once; if the pool runs dry, pop() falls
+    back to generating inline.
+    """
+
+    def __init__(self, size: int = KEY_POOL_SIZE, low_water: int = KEY_POOL_LOW_WATER):
+        self.size = size
+        self.low_water = low_water
+        self._items: deque[KeyMaterial] = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="key-pool-refill", daemon=True)
+            self._thread.start()
+        self._refill.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stopping.set()
+        self._refill.set()
+        if thread is not None:
+            thread.join()
+
+    def try_pop(self) -> KeyMaterial | None:
+        """
+        Take one item without ever generating inline; None if the pool is empty.
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            item = None
+        if len(self._items) < self.low_water:
+            self._refill.set()
+        return item
+
+    def pop(self) -> KeyMaterial:
+        return self.try_pop() or generate_key_material()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._refill.wait()
+            self._refill.clear()
+            while len(self._items) < self.size and not self._stopping.is_set():
+                self._items.append(generate_key_material())
+
+
+key_pool = KeyMaterialPool()
@@ -1,11 +1,88 @@
 # app/core/security.py
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import BCRYPT_ROUNDS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+from app.core.metrics import timed
+
+# Hashes made with a different cost than BCRYPT_ROUNDS report needs_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
+@timed("hash_password")
 def hash_password(plain_password: str) -> str:
     return pwd_context.hash(plain_password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+@timed("verify_password")
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify, and if the hash was made with outdated settings return a fresh one to store.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """The password hashing queue is full; the caller should answer 503."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own bounded thread pool (bcrypt releases the GIL), so a
+    login burst can only occupy `workers` cores and `max_pending` queue slots.
+    Anything beyond that is refused immediately with PasswordHasherBusy.
+    The pool is created on first use, so it comes back after shutdown() (a
+    second app lifespan in the same process).
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, plain_password: str) -> str:
+        return self._submit(hash_password, plain_password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return self._submit(verify_and_update_password, plain_password, hashed_password).result()
+
+    async def hash_async(self, plain_password: str) -> str:
+        return await asyncio.wrap_future(self._submit(hash_password, plain_password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await asyncio.wrap_future(
+            self._submit(verify_and_update_password, plain_password, hashed_password)
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
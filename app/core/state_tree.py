@@ -0,0 +1,387 @@
+# app/core/state_tree.py
+"""
+Ledger-wide state root: a sparse Merkle tree keyed by user id whose leaves
+commit to each user's chain head hash.
+
+Appends never touch the tree. create_block and create_genesis_block queue the
+new head on the session, and it is inserted into state_tree_pending_heads as
+part of that session's commit, so writers keep scaling with the per-user
+compare-and-swap. The state tree updater (a background thread started with
+the app, or apply_pending_heads from a script) folds the pending heads into
+the tree in batches: it locks the root row, keeps each user's newest head,
+reads the paths' siblings in one query and upserts the paths in one statement.
+state_tree_leaves records the head each leaf covers: the root trails the
+committed heads by about one updater interval, and a proof names the head it
+proves. Only non-empty nodes are stored (state_tree_nodes); an absent node has
+the precomputed hash of an empty subtree of its height.
+"""
+
+import threading
+from hashlib import sha256
+from typing import NamedTuple
+
+from sqlalchemy import and_, delete, event, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import STATE_TREE_DEPTH, STATE_TREE_UPDATE_BATCH, STATE_TREE_UPDATE_INTERVAL_MS
+from app.core.metrics import REGISTRY, Counter, timed
+from app.database import SessionLocal
+from app.models.state_tree_leaf import StateTreeLeaf
+from app.models.state_tree_node import StateTreeNode
+from app.models.state_tree_pending_head import StateTreePendingHead
+from app.models.user import User
+
+EMPTY_LEAF = "0" * 64
+
+_PENDING_KEY = "state_tree_heads"
+
+# Largest number of (level, position) pairs looked up per query
+_FETCH_CHUNK = 500
+
+
+def leaf_hash(user_id: int, head_block_hash: str) -> str:
+    return sha256(f"leaf|{user_id}|{head_block_hash}".encode()).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    return sha256(f"node|{left}|{right}".encode()).hexdigest()
+
+
+def _empty_hashes(depth: int) -> list[str]:
+    hashes = [EMPTY_LEAF]
+    for _ in range(depth):
+        hashes.append(node_hash(hashes[-1], hashes[-1]))
+    return hashes
+
+
+# EMPTY_HASHES[level] is the hash of an empty subtree whose root sits at level
+EMPTY_HASHES = _empty_hashes(STATE_TREE_DEPTH)
+
+ROOT_KEY = (STATE_TREE_DEPTH, 0)
+
+UPDATE_FAILURES = REGISTRY.register(Counter(
+    "state_tree_update_failures_total", "State tree updater runs that failed and were retried."
+))
+
+
+@event.listens_for(StateTreeNode.__table__, "after_create")
+def _insert_empty_root(target, connection, **kw) -> None:
+    # The updater locks the root row, so it has to exist from the start
+    connection.execute(target.insert().values(level=ROOT_KEY[0], position=ROOT_KEY[1], hash=EMPTY_HASHES[-1]))
+
+
+class StateProof(NamedTuple):
+    user_id: int
+    # The head the tree currently covers, which may trail users.head_block_*
+    head_block_id: int | None
+    head_block_hash: str | None
+    leaf_hash: str
+    # Sibling hashes from the leaf level up to just below the root
+    siblings: list[str]
+    root: str
+
+
+def _node_key_filter(keys):
+    return or_(*(and_(StateTreeNode.level == level, StateTreeNode.position == position) for level, position in keys))
+
+
+def _fetch_nodes(db: Session | Connection, keys: set[tuple[int, int]]) -> dict[tuple[int, int], str]:
+    stored = {}
+    ordered = sorted(keys)
+    for start in range(0, len(ordered), _FETCH_CHUNK):
+        rows = db.execute(
+            select(StateTreeNode.level, StateTreeNode.position, StateTreeNode.hash)
+            .where(_node_key_filter(ordered[start:start + _FETCH_CHUNK]))
+        )
+        stored.update(((row.level, row.position), row.hash) for row in rows)
+    return stored
+
+
+def _dialect_name(db: Session | Connection) -> str:
+    return db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+
+
+def _upsert(dialect_name: str, model, index_elements: list, columns: list[str]):
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(model)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(model)
+    else:
+        raise ValueError(f"State tree upsert is not supported on {dialect_name}")
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in columns}
+    )
+
+
+def _node_upsert(dialect_name: str):
+    return _upsert(dialect_name, StateTreeNode, [StateTreeNode.level, StateTreeNode.position], ["hash"])
+
+
+def _leaf_upsert(dialect_name: str):
+    return _upsert(dialect_name, StateTreeLeaf, [StateTreeLeaf.user_id], ["head_block_id", "head_block_hash"])
+
+
+def _lock_root(db: Session | Connection) -> None:
+    # Serializes updaters (a no-op on SQLite, which allows one writer anyway)
+    db.execute(
+        select(StateTreeNode.hash)
+        .where(StateTreeNode.level == ROOT_KEY[0], StateTreeNode.position == ROOT_KEY[1])
+        .with_for_update()
+    )
+
+
+def _check_user_ids(user_ids) -> None:
+    for user_id in user_ids:
+        if not 0 <= user_id < 2 ** STATE_TREE_DEPTH:
+            raise ValueError(f"User id {user_id} does not fit a state tree of depth {STATE_TREE_DEPTH}")
+
+
+@timed("update_state_tree")
+def update_state_tree(db: Session | Connection, heads: dict[int, str]) -> str:
+    """
+    Point the leaves of heads ({user id: head block hash}) at their new hashes
+    and recompute every affected path, inside the caller's transaction; returns
+    the new root. Leaves only; apply_heads also keeps state_tree_leaves in step.
+    """
+    if not heads:
+        return state_root(db)
+    _check_user_ids(heads)
+    _lock_root(db)
+
+    siblings = set()
+    positions = set(heads)
+    for level in range(STATE_TREE_DEPTH):
+        siblings.update((level, p ^ 1) for p in positions if p ^ 1 not in positions)
+        positions = {p >> 1 for p in positions}
+    stored = _fetch_nodes(db, siblings)
+
+    current = {user_id: leaf_hash(user_id, head_hash) for user_id, head_hash in heads.items()}
+    rows = []
+    for level in range(STATE_TREE_DEPTH):
+        rows.extend({"level": level, "position": p, "hash": h} for p, h in current.items())
+
+        def child(position: int) -> str:
+            if position in current:
+                return current[position]
+            return stored.get((level, position), EMPTY_HASHES[level])
+
+        current = {p: node_hash(child(2 * p), child(2 * p + 1)) for p in {q >> 1 for q in current}}
+    root = current[0]
+    rows.append({"level": ROOT_KEY[0], "position": ROOT_KEY[1], "hash": root})
+
+    db.execute(_node_upsert(_dialect_name(db)), rows)
+    return root
+
+
+def apply_heads(db: Session | Connection, heads: dict[int, tuple[int, str]]) -> str:
+    """
+    Move leaves to heads ({user id: (head block id, head block hash)}) inside the
+    caller's transaction; returns the new root. A head older than the one a
+    leaf already covers is ignored, so applying out of order cannot go back.
+    """
+    if not heads:
+        return state_root(db)
+    _lock_root(db)
+    covered = dict(db.execute(
+        select(StateTreeLeaf.user_id, StateTreeLeaf.head_block_id).where(StateTreeLeaf.user_id.in_(list(heads)))
+    ).all())
+    newer = {
+        user_id: head for user_id, head in heads.items()
+        if user_id not in covered or head[0] > covered[user_id]
+    }
+    if not newer:
+        return state_root(db)
+    root = update_state_tree(db, {user_id: head_hash for user_id, (_, head_hash) in newer.items()})
+    db.execute(_leaf_upsert(_dialect_name(db)), [
+        {"user_id": user_id, "head_block_id": head_id, "head_block_hash": head_hash}
+        for user_id, (head_id, head_hash) in newer.items()
+    ])
+    return root
+
+
+@timed("apply_pending_heads")
+def apply_pending_heads(db: Session | Connection, batch_size: int = STATE_TREE_UPDATE_BATCH) -> int:
+    """
+    Fold up to batch_size pending heads into the tree, oldest first, inside the
+    caller's transaction; returns how many pending rows were consumed.
+    """
+    # Lock before reading, so two updaters never apply (and delete) the same rows
+    _lock_root(db)
+    rows = db.execute(
+        select(
+            StateTreePendingHead.id,
+            StateTreePendingHead.user_id,
+            StateTreePendingHead.head_block_id,
+            StateTreePendingHead.head_block_hash,
+        )
+        .order_by(StateTreePendingHead.id.asc())
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+    heads: dict[int, tuple[int, str]] = {}
+    for row in rows:
+        if row.user_id not in heads or row.head_block_id > heads[row.user_id][0]:
+            heads[row.user_id] = (row.head_block_id, row.head_block_hash)
+    apply_heads(db, heads)
+    db.execute(delete(StateTreePendingHead).where(StateTreePendingHead.id.in_([row.id for row in rows])))
+    return len(rows)
+
+
+def pending_head_count(db: Session | Connection) -> int:
+    return db.scalar(select(func.count()).select_from(StateTreePendingHead))
+
+
+def queue_head(db, user_id: int, head_block_id: int, head_block_hash: str) -> None:
+    # db is a Session or AsyncSession; recorded by _record_queued_heads at commit
+    db.info.setdefault(_PENDING_KEY, {})[user_id] = (head_block_id, head_block_hash)
+
+
+@event.listens_for(Session, "before_commit")
+def _record_queued_heads(session: Session) -> None:
+    heads = session.info.pop(_PENDING_KEY, None)
+    if heads:
+        session.execute(insert(StateTreePendingHead), [
+            {"user_id": user_id, "head_block_id": head_id, "head_block_hash": head_hash}
+            for user_id, (head_id, head_hash) in heads.items()
+        ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_queued_heads(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class StateTreeUpdater:
+    """
+    Background thread that drains state_tree_pending_heads every interval, one
+    batch per transaction. Several app processes may each run one; the root
+    lock makes them take turns. A failed run is counted and retried next time.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        interval: float = STATE_TREE_UPDATE_INTERVAL_MS / 1000,
+        batch_size: int = STATE_TREE_UPDATE_BATCH,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="state-tree-updater", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stopping.set()
+        if thread is not None:
+            thread.join()
+
+    def run_once(self) -> int:
+        """
+        Apply everything pending right now; returns the number of rows consumed.
+        """
+        total = 0
+        with self.session_factory() as db:
+            while True:
+                applied = apply_pending_heads(db, self.batch_size)
+                db.commit()
+                total += applied
+                if applied < self.batch_size:
+                    return total
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                UPDATE_FAILURES.inc()
+
+
+state_tree_updater = StateTreeUpdater(SessionLocal)
+
+
+def state_root(db: Session | Connection) -> str:
+    root = db.scalar(
+        select(StateTreeNode.hash).where(StateTreeNode.level == ROOT_KEY[0], StateTreeNode.position == ROOT_KEY[1])
+    )
+    return root or EMPTY_HASHES[STATE_TREE_DEPTH]
+
+
+def state_proof(db: Session | Connection, user_id: int, attempts: int = 3) -> StateProof:
+    """
+    Inclusion proof of the head the tree covers for user_id under the current
+    root. A user the tree does not cover yet gets a proof of an empty leaf.
+    """
+    _check_user_ids([user_id])
+    keys = {(level, (user_id >> level) ^ 1) for level in range(STATE_TREE_DEPTH)} | {(0, user_id), ROOT_KEY}
+    for _ in range(attempts):
+        # Nodes come from one statement and the covered head from another, so an
+        # update landing in between shows up as a leaf mismatch and is re-read
+        nodes = _fetch_nodes(db, keys)
+        covered = db.execute(
+            select(StateTreeLeaf.head_block_id, StateTreeLeaf.head_block_hash).where(StateTreeLeaf.user_id == user_id)
+        ).first()
+        head_id, head_hash = covered if covered is not None else (None, None)
+        leaf = leaf_hash(user_id, head_hash) if head_hash is not None else EMPTY_LEAF
+        if nodes.get((0, user_id), EMPTY_LEAF) == leaf:
+            break
+    else:
+        raise RuntimeError(f"State tree leaf of user {user_id} kept changing while reading its proof")
+
+    siblings = [
+        nodes.get((level, (user_id >> level) ^ 1), EMPTY_HASHES[level]) for level in range(STATE_TREE_DEPTH)
+    ]
+    return StateProof(user_id, head_id, head_hash, leaf, siblings, nodes.get(ROOT_KEY, EMPTY_HASHES[STATE_TREE_DEPTH]))
+
+
+def verify_state_proof(user_id: int, head_block_hash: str | None, siblings: list[str], root: str) -> bool:
+    if len(siblings) != STATE_TREE_DEPTH:
+        return False
+    current = leaf_hash(user_id, head_block_hash) if head_block_hash is not None else EMPTY_LEAF
+    for level, sibling in enumerate(siblings):
+        if (user_id >> level) & 1:
+            current = node_hash(sibling, current)
+        else:
+            current = node_hash(current, sibling)
+    return current == root
+
+
+def rebuild_state_tree(db: Session | Connection, batch_size: int = 10_000) -> str:
+    """
+    Recompute the whole tree from users.head_block_*, in the caller's
+    transaction. For migrations and recovery; the updater keeps it current.
+    """
+    # Heads committed from here on are queued again and applied on top
+    db.execute(delete(StateTreePendingHead))
+    db.execute(delete(StateTreeLeaf))
+    db.execute(delete(StateTreeNode))
+    db.execute(_node_upsert(_dialect_name(db)), [
+        {"level": ROOT_KEY[0], "position": ROOT_KEY[1], "hash": EMPTY_HASHES[STATE_TREE_DEPTH]}
+    ])
+    root = EMPTY_HASHES[STATE_TREE_DEPTH]
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(User.id, User.head_block_id, User.head_block_hash)
+            .where(User.id > last_id, User.head_block_hash.is_not(None))
+            .order_by(User.id.asc())
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return root
+        root = apply_heads(db, {row.id: (row.head_block_id, row.head_block_hash) for row in rows})
+        last_id = rows[-1].id
@@ -0,0 +1,100 @@
+# app/core/user_cache.py
+"""
+Email -> (user id, wallet address) resolution shared by the routers.
+
+Hot endpoints only need the id behind an email, which practically never
+changes, so hits skip the users lookup entirely. Misses are not cached (a
+signup must never be hidden), and ORM inserts/updates/deletes of a User drop
+its entries.
+"""
+
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+from app.core.cache import LRUCache
+from app.models.user import User
+
+
+class UserRef(NamedTuple):
+    id: int
+    wallet_address: str | None
+
+
+user_cache: LRUCache[str, UserRef] = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+_REF_COLUMNS = (User.email, User.id, User.wallet_address)
+
+
+def remember_user(email: str, user_id: int, wallet_address: str | None) -> None:
+    # Call after the commit that made the user visible
+    user_cache.set(email, UserRef(user_id, wallet_address))
+
+
+def resolve_user(db: Session, email: str) -> UserRef | None:
+    ref = user_cache.get(email)
+    if ref is None:
+        row = db.execute(select(*_REF_COLUMNS).where(User.email == email)).first()
+        if row is not None:
+            ref = UserRef(row.id, row.wallet_address)
+            user_cache.set(email, ref)
+    return ref
+
+
+async def resolve_user_async(db: AsyncSession, email: str) -> UserRef | None:
+    ref = user_cache.get(email)
+    if ref is None:
+        row = (await db.execute(select(*_REF_COLUMNS).where(User.email == email))).first()
+        if row is not None:
+            ref = UserRef(row.id, row.wallet_address)
+            user_cache.set(email, ref)
+    return ref
+
+
+def _split_cached(emails: Iterable[str]) -> tuple[dict[str, UserRef], list[str]]:
+    found, missing = {}, []
+    for email in emails:
+        ref = user_cache.get(email)
+        if ref is None:
+            missing.append(email)
+        else:
+            found[email] = ref
+    return found, missing
+
+
+def _remember_rows(found: dict[str, UserRef], rows) -> dict[str, UserRef]:
+    for row in rows:
+        found[row.email] = UserRef(row.id, row.wallet_address)
+        user_cache.set(row.email, found[row.email])
+    return found
+
+
+def resolve_users(db: Session, emails: Iterable[str]) -> dict[str, UserRef]:
+    """
+    Batch form of resolve_user: cache hits, then one query for the rest. Unknown emails are absent.
+    """
+    found, missing = _split_cached(emails)
+    if missing:
+        found = _remember_rows(found, db.execute(select(*_REF_COLUMNS).where(User.email.in_(missing))))
+    return found
+
+
+async def resolve_users_async(db: AsyncSession, emails: Iterable[str]) -> dict[str, UserRef]:
+    found, missing = _split_cached(emails)
+    if missing:
+        found = _remember_rows(found, await db.execute(select(*_REF_COLUMNS).where(User.email.in_(missing))))
+    return found
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    # Drop the current email and, after a rename, the old one too
+    history = inspect(target).attrs.email.history
+    for email in (target.email, *history.deleted):
+        if email is not None:
+            user_cache.pop(email)
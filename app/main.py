@@ -1,9 +1,54 @@
 # app/main.py
 
-from fastapi import FastAPI
-from app.routers import auth, kyc, transaction, blockchain
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
+from app.config import DB_MODE
+from app.core.group_commit import stop_group_committer
+from app.core.key_pool import key_pool
+from app.core.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.core.state_tree import state_tree_updater
+from app.database import engine, get_async_engine, pool_status
+
+if DB_MODE == "async":
+    # Same paths and schemas, served by coroutines on an AsyncSession
+    from app.routers import (
+        async_auth as auth,
+        async_kyc as kyc,
+        async_transaction as transaction,
+        async_blockchain as blockchain
+    )
+else:
+    from app.routers import auth, kyc, transaction, blockchain
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start filling signup key material before the first request needs it
+    key_pool.start()
+    state_tree_updater.start()
+    yield
+    key_pool.stop()
+    # Drain any pending group-commit batch before the process exits
+    stop_group_committer()
+    state_tree_updater.stop()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="NFT Core API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    # Shed auth load fast instead of queueing behind bcrypt
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
-app = FastAPI(title="NFT Core API")
 
 app.include_router(auth.router)
 app.include_router(kyc.router)
@@ -14,3 +59,27 @@ app.include_router(blockchain.router)  # Now your /blockchain endpoints are live
 @app.get("/")
 def root():
     return {"message": "Hello, Bro! Welcome to NFT Core API."}
+
+
+@app.get("/health/db-pool")
+def db_pool_health():
+    # Checked-out connections, wait time and overflow of the pool serving requests
+    return pool_status(get_async_engine() if DB_MODE == "async" else engine)
+
+
+def _pool_gauges() -> dict[str, tuple[str, float]]:
+    status = db_pool_health()
+    return {
+        f"db_pool_{key}": (f"Connection pool {key.replace('_', ' ')}.", value)
+        for key, value in status.items()
+        if isinstance(value, (int, float))
+    }
+
+
+REGISTRY.add_gauges(_pool_gauges)
+
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus scrape target: request latency, per-request SQL, hot function timings, pool stats
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
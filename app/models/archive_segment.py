@@ -0,0 +1,36 @@
+# app/models/archive_segment.py
+
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class ArchiveSegment(Base):
+    __tablename__ = "archive_segments"
+    __table_args__ = (
+        # Segments of a chain from a position on: WHERE user_id = ? AND last_block_id > ?
+        Index("ix_archive_segments_user_id_last_block_id", "user_id", "last_block_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Contiguous run of the user's blocks stored in this segment
+    first_block_id = Column(Integer, nullable=False)
+    last_block_id = Column(Integer, nullable=False)
+    block_count = Column(Integer, nullable=False)
+    transaction_count = Column(Integer, nullable=False)
+    # zlib record inside an append-only file under ARCHIVE_DIR
+    path = Column(String, nullable=False)
+    byte_offset = Column(BigInteger, nullable=False)
+    byte_length = Column(Integer, nullable=False)
+    # Running aggregate over every archived block hash of the chain up to last_block_id
+    aggregate_hash = Column(String, nullable=False)
+    # Snapshot block appended when this segment was archived
+    snapshot_block_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    # Set once the archived rows are deleted from blocks/transactions
+    purged_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ArchiveSegment user_id={self.user_id}, blocks={self.first_block_id}..{self.last_block_id}>"
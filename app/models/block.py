@@ -1,6 +1,6 @@
 # app/models/block.py
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -9,6 +9,10 @@ from app.models.user import User  # optional if we want direct references
 
 class Block(Base):
     __tablename__ = "blocks"
+    __table_args__ = (
+        # Chain walks and head lookups: WHERE user_id = ? ORDER BY id
+        Index("ix_blocks_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -20,6 +24,8 @@ class Block(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     # Optional data for storing additional info
     data = Column(Text, nullable=True)
+    # Merkle root over this block's Transaction rows (covered by block_hash)
+    merkle_root = Column(String, nullable=True)
 
     # Relationship back to user if you want it:
     user = relationship("User", backref="blocks")
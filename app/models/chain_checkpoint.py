@@ -0,0 +1,20 @@
+# app/models/chain_checkpoint.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class ChainCheckpoint(Base):
+    __tablename__ = "chain_checkpoints"
+
+    # One checkpoint per user chain
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Last block already re-hashed and linked successfully
+    block_id = Column(Integer, nullable=False)
+    block_hash = Column(String, nullable=False)
+    verified_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<ChainCheckpoint user_id={self.user_id}, block_id={self.block_id}>"
@@ -0,0 +1,27 @@
+# app/models/idempotency_key.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # One stored outcome per client key; a racing duplicate fails here
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+        # Global expiry purge: WHERE created_at <= ? ORDER BY created_at
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String, nullable=False)
+    # sha256 of the request body, so a reused key with a different payload is refused
+    request_hash = Column(String, nullable=False)
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+
+    def __repr__(self):
+        return f"<IdempotencyKey user_id={self.user_id}, key={self.key}, transaction_id={self.transaction_id}>"
@@ -0,0 +1,19 @@
+# app/models/state_tree_leaf.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from app.database import Base
+
+
+class StateTreeLeaf(Base):
+    __tablename__ = "state_tree_leaves"
+
+    # The chain head each state tree leaf currently commits to; it can trail
+    # users.head_block_* until the updater applies the pending heads.
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    head_block_id = Column(Integer, nullable=False)
+    head_block_hash = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<StateTreeLeaf user_id={self.user_id}, head_block_id={self.head_block_id}>"
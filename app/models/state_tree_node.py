@@ -0,0 +1,19 @@
+# app/models/state_tree_node.py
+
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class StateTreeNode(Base):
+    __tablename__ = "state_tree_nodes"
+
+    # Non-empty nodes of the sparse Merkle tree over chain heads (app/core/state_tree.py).
+    # Leaves are level 0 at position = user id; the root is (STATE_TREE_DEPTH, 0).
+
+    level = Column(Integer, primary_key=True)
+    position = Column(Integer, primary_key=True)
+    hash = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<StateTreeNode level={self.level}, position={self.position}>"
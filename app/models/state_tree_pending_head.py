@@ -0,0 +1,20 @@
+# app/models/state_tree_pending_head.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from app.database import Base
+
+
+class StateTreePendingHead(Base):
+    __tablename__ = "state_tree_pending_heads"
+
+    # Chain heads committed but not yet folded into the state tree; appends only
+    # insert here and the state tree updater drains the table in id order.
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    head_block_id = Column(Integer, nullable=False)
+    head_block_hash = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<StateTreePendingHead user_id={self.user_id}, head_block_id={self.head_block_id}>"
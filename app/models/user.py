@@ -18,5 +18,9 @@ class User(Base):
     public_key_hex = Column(String, nullable=True)
     wallet_address = Column(String, nullable=True)
 
+    # Denormalized chain head, moved by every block append
+    head_block_id = Column(Integer, nullable=True)
+    head_block_hash = Column(String, nullable=True)
+
     def __repr__(self):
         return f"<User id={self.id}, email={self.email}>"
@@ -7,10 +7,14 @@ class UserKyc(Base):
     __tablename__ = "users_kyc"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # One KYC row per user; also the conflict target of the batch upsert
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True, index=True)
     phone = Column(String, nullable=True)
     nik = Column(String, nullable=True)      # NIK number
     npwp = Column(String, nullable=True)     # NPWP number
+    # Keyed hashes of the normalized NIK/NPWP (app.core.identity), for duplicate lookups
+    nik_hash = Column(String, nullable=True, index=True)
+    npwp_hash = Column(String, nullable=True, index=True)
     sex = Column(String, nullable=True)
     marital_status = Column(String, nullable=True)
     birth_info = Column(String, nullable=True)  # Could store 'place, date' in one or two columns
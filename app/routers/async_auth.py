@@ -0,0 +1,83 @@
+# app/routers/async_auth.py
+"""
+Coroutine versions of the /auth endpoints for DB_MODE=async.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.async_blockchain_utils import create_genesis_block
+from app.core.key_pool import generate_key_material, key_pool
+from app.core.security import password_hasher
+from app.core.user_cache import remember_user, resolve_user_async
+from app.database import get_async_db
+from app.models.user import User
+from app.routers.auth import SignInRequest, SignInResponse, SignUpRequest, SignUpResponse
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/signup", response_model=SignUpResponse)
+async def sign_up(req: SignUpRequest, db: AsyncSession = Depends(get_async_db)):
+    if await resolve_user_async(db, req.email) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email is already registered."
+        )
+
+    # bcrypt and ECDSA are CPU-bound; keep them off the event loop
+    hashed_pw = await password_hasher.hash_async(req.password)
+    keys = key_pool.try_pop() or await run_in_threadpool(generate_key_material)
+
+    new_user = User(
+        email=req.email,
+        password_hash=hashed_pw,
+        bip39_mnemonic=keys.mnemonic,
+        private_key_hex=keys.private_key_hex,
+        public_key_hex=keys.public_key_hex,
+        wallet_address=keys.wallet_address
+    )
+    db.add(new_user)
+    await create_genesis_block(db, new_user, commit=False)
+    await db.commit()
+    remember_user(req.email, new_user.id, keys.wallet_address)
+
+    return SignUpResponse(email=req.email, bip39_mnemonic=keys.mnemonic)
+
+
+@router.post("/signin", response_model=SignInResponse)
+async def sign_in(req: SignInRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == req.email))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found."
+        )
+
+    verified, new_hash = await password_hasher.verify_async(req.password, str(user.password_hash))
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect password."
+        )
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+    remember_user(req.email, user.id, user.wallet_address)
+
+    return SignInResponse(message="Sign-in successful", email=req.email)
+
+
+@router.post("/recover-password")
+async def recover_password(email: str, mnemonic_words: list[str], db: AsyncSession = Depends(get_async_db)):
+    stored_mnemonic = await db.scalar(select(User.bip39_mnemonic).where(User.email == email))
+    if stored_mnemonic is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    stored_words = stored_mnemonic.split()
+    if not all(word in stored_words for word in mnemonic_words):
+        raise HTTPException(status_code=401, detail="Mnemonic words mismatch")
+
+    return {"message": "Mnemonic validated. Proceed with password reset."}
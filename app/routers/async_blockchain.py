@@ -0,0 +1,131 @@
+# app/routers/async_blockchain.py
+"""
+Coroutine versions of the /blockchain endpoints for DB_MODE=async.
+"""
+
+from contextlib import aclosing
+from typing import List, Literal, cast
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import USER_CHAIN_MAX_PAGE_SIZE
+from app.core.async_blockchain_utils import iter_chain_rows, validate_user_chain
+from app.core.block_feed import fetch_block_events_async, sse_events
+from app.core.state_tree import state_proof
+from app.core.user_cache import resolve_user_async
+from app.database import get_async_db
+from app.models.block import Block
+from app.models.transaction import Transaction
+from app.routers.blockchain import (
+    BlockSchema,
+    StateProofSchema,
+    StateRootSchema,
+    TransactionProofSchema,
+    block_schema,
+    build_transaction_proof,
+    feed_response,
+    state_root_schema,
+    transaction_leaves_query
+)
+
+router = APIRouter(prefix="/blockchain", tags=["Blockchain"])
+
+
+async def _user_id(db: AsyncSession, email: str) -> int:
+    user = await resolve_user_async(db, email)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user.id
+
+
+@router.get("/validate-chain/{email}")
+async def validate_chain(email: str, full: bool = False, db: AsyncSession = Depends(get_async_db)):
+    is_valid = await validate_user_chain(db, await _user_id(db, email), full=full)
+    return {"user": email, "chain_valid": is_valid}
+
+
+@router.get("/user-chain/{email}", response_model=List[BlockSchema])
+async def get_user_chain(
+    email: str,
+    response: Response,
+    after_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=USER_CHAIN_MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    user_id = await _user_id(db, email)
+
+    if format == "ndjson":
+        # The request session is closed before the body streams, so use our own
+        bind = db.bind
+
+        async def stream_blocks():
+            async with AsyncSession(bind=bind) as stream_db:
+                async with aclosing(iter_chain_rows(stream_db, user_id, after_id, limit=limit)) as rows:
+                    async for row in rows:
+                        yield block_schema(row).model_dump_json() + "\n"
+
+        return StreamingResponse(stream_blocks(), media_type="application/x-ndjson")
+
+    result = [block_schema(row) async for row in iter_chain_rows(db, user_id, after_id, limit=limit)]
+    if limit is not None and len(result) == limit:
+        response.headers["X-Next-Cursor"] = str(result[-1].id)
+    return result
+
+
+def _async_feed(db: AsyncSession, user_id: int | None, after_id: int | None):
+    bind = db.bind
+
+    async def fetch(after: int) -> list[dict]:
+        async with AsyncSession(bind=bind) as feed_db:
+            return await fetch_block_events_async(feed_db, user_id, after)
+
+    return feed_response(sse_events(user_id, after_id, fetch))
+
+
+@router.get("/feed")
+async def block_feed(
+    after_id: int | None = None,
+    last_event_id: int | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return _async_feed(db, None, last_event_id if last_event_id is not None else after_id)
+
+
+@router.get("/feed/{email}")
+async def user_block_feed(
+    email: str,
+    after_id: int | None = None,
+    last_event_id: int | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    user_id = await _user_id(db, email)
+    return _async_feed(db, user_id, last_event_id if last_event_id is not None else after_id)
+
+
+@router.get("/state-root", response_model=StateRootSchema)
+async def get_state_root(db: AsyncSession = Depends(get_async_db)):
+    # The tree code is shared with sync mode and runs on the session's sync facade
+    return await db.run_sync(state_root_schema)
+
+
+@router.get("/state-proof/{email}", response_model=StateProofSchema)
+async def get_state_proof(email: str, db: AsyncSession = Depends(get_async_db)):
+    user_id = await _user_id(db, email)
+    return StateProofSchema(**(await db.run_sync(state_proof, user_id))._asdict())
+
+
+@router.get("/tx-proof/{transaction_id}", response_model=TransactionProofSchema)
+async def get_transaction_proof(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    tx = await db.get(Transaction, transaction_id)
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+
+    block = await db.get(Block, tx.block_id)
+    if not block or not block.merkle_root:
+        raise HTTPException(status_code=404, detail="Block has no Merkle root")
+
+    rows = (await db.execute(transaction_leaves_query(cast(int, block.id)))).all()
+    return build_transaction_proof(block, list(rows), transaction_id)
@@ -0,0 +1,86 @@
+# app/routers/async_kyc.py
+"""
+Coroutine versions of the /kyc endpoints for DB_MODE=async.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.identity import IDENTITY_COLUMNS, duplicate_identities, group_duplicates, identity_matches
+from app.core.user_cache import resolve_user_async, resolve_users_async
+from app.database import get_async_db
+from app.models.user_kyc import UserKyc
+from app.routers.kyc import (
+    DuplicateIdentityReport,
+    IdentityMatchRequest,
+    IdentityMatchResponse,
+    KycBatchResponse,
+    KycRequest,
+    KycResponse,
+    apply_kyc,
+    check_kyc_batch,
+    kyc_batch_response,
+    kyc_response,
+    kyc_rows,
+    kyc_upsert,
+    latest_by_email
+)
+
+router = APIRouter(prefix="/kyc", tags=["KYC"])
+
+
+@router.post("/update", response_model=KycResponse)
+async def update_kyc(req: KycRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await resolve_user_async(db, req.email)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    kyc = await db.scalar(select(UserKyc).where(UserKyc.user_id == user.id))
+    created = kyc is None
+    if created:
+        kyc = UserKyc(user_id=user.id)
+        db.add(kyc)
+    apply_kyc(kyc, req)
+    await db.commit()
+
+    return kyc_response("KYC created successfully" if created else "KYC updated successfully", kyc)
+
+
+@router.post("/batch-upsert", response_model=KycBatchResponse)
+async def batch_upsert_kyc(reqs: List[KycRequest], db: AsyncSession = Depends(get_async_db)):
+    check_kyc_batch(reqs)
+    by_email = latest_by_email(reqs)
+
+    users = await resolve_users_async(db, by_email)
+    user_ids = {email: user.id for email, user in users.items()}
+    rows = kyc_rows(by_email, user_ids)
+    if rows:
+        await db.execute(kyc_upsert(db.bind.dialect.name), rows)
+        await db.commit()
+
+    return kyc_batch_response(by_email, user_ids)
+
+
+@router.post("/identity-matches", response_model=IdentityMatchResponse)
+async def find_identity_matches(req: IdentityMatchRequest, db: AsyncSession = Depends(get_async_db)):
+    exclude_user_id = None
+    if req.email is not None:
+        user = await resolve_user_async(db, req.email)
+        exclude_user_id = user.id if user else None
+
+    matches: dict[str, List[int]] = {}
+    for field in IDENTITY_COLUMNS:
+        stmt = identity_matches(field, getattr(req, field), exclude_user_id)
+        matches[field] = list(await db.scalars(stmt)) if stmt is not None else []
+    return IdentityMatchResponse(**matches)
+
+
+@router.get("/duplicates", response_model=DuplicateIdentityReport)
+async def duplicate_identity_report(db: AsyncSession = Depends(get_async_db)):
+    report = {}
+    for field in IDENTITY_COLUMNS:
+        report[field] = group_duplicates(await db.execute(duplicate_identities(field)))
+    return DuplicateIdentityReport(**report)
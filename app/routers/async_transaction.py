@@ -0,0 +1,199 @@
+# app/routers/async_transaction.py
+"""
+Coroutine versions of the /transaction endpoints for DB_MODE=async.
+"""
+
+from typing import Awaitable, Callable, List, TypeVar, cast
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import GROUP_COMMIT_ENABLED
+from app.core.async_blockchain_utils import append_block, get_chain_head, validate_new_transaction
+from app.core.blockchain_utils import ChainConflictError, merkle_root, transaction_leaf_hash
+from app.core.block_feed import queue_transactions
+from app.core.group_commit import get_group_committer
+from app.core.idempotency import (
+    StoredOutcome,
+    drop_expired_key_async,
+    find_outcome_async,
+    remember_outcome,
+    request_hash,
+    store_key_async
+)
+from app.core.user_cache import resolve_user_async
+from app.database import get_async_db
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.routers import transaction as sync_transaction
+from app.routers.transaction import (
+    CREATED_MESSAGE,
+    TransactionBatchResponse,
+    TransactionRequest,
+    TransactionResponse,
+    batch_block_data,
+    check_batch,
+    check_idempotency_key,
+    feed_transactions,
+    replay_response,
+    transaction_block_data,
+    transaction_rows
+)
+
+router = APIRouter(prefix="/transaction", tags=["Transaction"])
+
+T = TypeVar("T")
+
+
+async def record_transaction(
+    db: AsyncSession, user_id: int, tx_type: str, tx_details: str | None, idempotency_key: str | None = None
+) -> int:
+    user = await db.get(User, user_id)
+    root = merkle_root([transaction_leaf_hash(user_id, tx_type, tx_details)])
+    new_block = await append_block(
+        db, user, transaction_block_data(tx_type, tx_details), commit=False, merkle_root=root
+    )
+
+    new_tx = Transaction(
+        block_id=cast(int, new_block.id),
+        user_id=user_id,
+        tx_type=tx_type,
+        tx_details=tx_details
+    )
+    db.add(new_tx)
+    await db.flush()
+    queue_transactions(db, cast(int, new_block.id), [{"id": new_tx.id, "tx_type": tx_type, "tx_details": tx_details}])
+    if idempotency_key is not None:
+        await store_key_async(db, user_id, idempotency_key, request_hash(tx_type, tx_details), cast(int, new_tx.id))
+    return cast(int, new_tx.id)
+
+
+async def record_transaction_batch(
+    db: AsyncSession, user_id: int, items: List[TransactionRequest]
+) -> tuple[int, List[int]]:
+    user = await db.get(User, user_id)
+    root = merkle_root([transaction_leaf_hash(user_id, item.tx_type, item.tx_details) for item in items])
+    new_block = await append_block(db, user, batch_block_data(items), commit=False, merkle_root=root)
+    block_id = cast(int, new_block.id)
+
+    result = await db.scalars(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        transaction_rows(block_id, user_id, items),
+    )
+    transaction_ids = list(result.all())
+    queue_transactions(db, block_id, feed_transactions(transaction_ids, items))
+    return block_id, transaction_ids
+
+
+async def _run_write(
+    db: AsyncSession,
+    work: Callable[[AsyncSession], Awaitable[T]],
+    group_work: Callable,
+) -> T:
+    try:
+        if GROUP_COMMIT_ENABLED:
+            # The group committer batches on its own sync session
+            return await run_in_threadpool(get_group_committer().submit, group_work)
+        result = await work(db)
+        await db.commit()
+        return result
+    except ChainConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Chain head is busy, please retry"
+        )
+
+
+async def _load_user(db: AsyncSession, email: str) -> User:
+    user_ref = await resolve_user_async(db, email)
+    user = await db.get(User, user_ref.id) if user_ref else None
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+async def _validate_append(db: AsyncSession, user: User) -> None:
+    head_id, _ = await get_chain_head(db, user)
+    if not await validate_new_transaction(db, cast(int, user.id), head_id, user=user):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Transaction validation failed"
+        )
+
+
+async def _load_validated_user(db: AsyncSession, email: str) -> int:
+    user = await _load_user(db, email)
+    await _validate_append(db, user)
+    return cast(int, user.id)
+
+
+@router.post("/create", response_model=TransactionResponse)
+async def create_transaction(
+    req: TransactionRequest,
+    idempotency_key: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    user = await _load_user(db, req.email)
+    user_id_int = cast(int, user.id)
+
+    # A repeated key gets the original answer without touching the chain
+    if idempotency_key is not None:
+        check_idempotency_key(idempotency_key)
+        req_hash = request_hash(req.tx_type, req.tx_details)
+        outcome = await find_outcome_async(db, user_id_int, idempotency_key)
+        if outcome is not None:
+            return replay_response(outcome, req_hash)
+    await _validate_append(db, user)
+
+    def write() -> Awaitable[int]:
+        return _run_write(
+            db,
+            lambda write_db: record_transaction(
+                write_db, user_id_int, req.tx_type, req.tx_details, idempotency_key
+            ),
+            lambda write_db: sync_transaction.record_transaction(
+                write_db, user_id_int, req.tx_type, req.tx_details, idempotency_key
+            ),
+        )
+
+    try:
+        transaction_id = await write()
+    except IntegrityError:
+        await db.rollback()
+        if idempotency_key is None:
+            raise
+        outcome = await find_outcome_async(db, user_id_int, idempotency_key)
+        if outcome is not None:
+            return replay_response(outcome, req_hash)
+        if not await drop_expired_key_async(db, user_id_int, idempotency_key):
+            raise
+        await db.commit()
+        transaction_id = await write()
+
+    if idempotency_key is not None:
+        remember_outcome(user_id_int, idempotency_key, StoredOutcome(transaction_id, req_hash))
+    return TransactionResponse(
+        message=CREATED_MESSAGE,
+        transaction_id=transaction_id
+    )
+
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+async def create_transaction_batch(reqs: List[TransactionRequest], db: AsyncSession = Depends(get_async_db)):
+    check_batch(reqs)
+    user_id_int = await _load_validated_user(db, reqs[0].email)
+
+    block_id, transaction_ids = await _run_write(
+        db,
+        lambda write_db: record_transaction_batch(write_db, user_id_int, reqs),
+        lambda write_db: sync_transaction.record_transaction_batch(write_db, user_id_int, reqs),
+    )
+
+    return TransactionBatchResponse(
+        message=f"{len(transaction_ids)} transactions created successfully",
+        block_id=block_id,
+        transaction_ids=transaction_ids
+    )
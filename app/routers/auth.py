@@ -1,27 +1,17 @@
-from datetime import datetime, timezone
-from hashlib import sha256
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.core.bip39_utils import generate_bip39_mnemonic
-from app.core.crypto_utils import generate_key_pair, derive_wallet_address
-from app.core.security import hash_password, verify_password
-from app.database import SessionLocal
-from app.models.block import Block
+from app.core.blockchain_utils import create_genesis_block
+from app.core.key_pool import key_pool
+from app.core.security import password_hasher
+from app.core.user_cache import remember_user, resolve_user
+from app.database import get_db
 from app.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # Pydantic schemas
 class SignUpRequest(BaseModel):
@@ -46,52 +36,36 @@ class SignInResponse(BaseModel):
 
 @router.post("/signup", response_model=SignUpResponse)
 def sign_up(req: SignUpRequest, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == req.email).first()
-    if existing_user:
+    if resolve_user(db, req.email) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is already registered."
         )
 
-    # BIP39 + password hashing
-    mnemonic = generate_bip39_mnemonic()
-    hashed_pw = hash_password(req.password)
-
-    # Generate ECDSA key pair + wallet
-    priv_key, pub_key = generate_key_pair()
-    wallet_addr = derive_wallet_address(pub_key)
+    # Password hashing; BIP39 + ECDSA key pair + wallet come pre-generated
+    hashed_pw = password_hasher.hash(req.password)
+    keys = key_pool.pop()
 
     # Create user
     new_user = User(
         email=req.email,
         password_hash=hashed_pw,
-        bip39_mnemonic=mnemonic,
-        private_key_hex=priv_key,
-        public_key_hex=pub_key,
-        wallet_address=wallet_addr
+        bip39_mnemonic=keys.mnemonic,
+        private_key_hex=keys.private_key_hex,
+        public_key_hex=keys.public_key_hex,
+        wallet_address=keys.wallet_address
     )
     db.add(new_user)
+
+    # Create genesis block; user, block and chain head commit together
+    create_genesis_block(db, new_user, commit=False)
+    user_id = new_user.id
     db.commit()
-    db.refresh(new_user)
-
-    # Create genesis block
-    timestamp_str = datetime.now(timezone.utc).isoformat()
-    raw_string = f"{new_user.id}{timestamp_str}GENESIS"
-    raw_hash = sha256(raw_string.encode("utf-8")).hexdigest()
-
-    genesis_block = Block(
-        user_id=new_user.id,
-        block_hash=raw_hash,
-        prev_hash="GENESIS",
-        data="User genesis block"
-    )
-    db.add(genesis_block)
-    db.commit()
-    db.refresh(genesis_block)
+    remember_user(req.email, user_id, keys.wallet_address)
 
     return SignUpResponse(
-        email=str(new_user.email),
-        bip39_mnemonic=str(new_user.bip39_mnemonic)
+        email=req.email,
+        bip39_mnemonic=keys.mnemonic
     )
 
 
@@ -105,11 +79,18 @@ def sign_in(req: SignInRequest, db: Session = Depends(get_db)):
         )
 
     # Cast user.password_hash to str to avoid type checker warning
-    if not verify_password(req.password, str(user.password_hash)):
+    verified, new_hash = password_hasher.verify(req.password, str(user.password_hash))
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password."
         )
+    if new_hash:
+        # Stored hash predates the current cost factor; upgrade it transparently
+        user.password_hash = new_hash
+        db.commit()
+    # Requests after sign-in resolve this email without a query
+    remember_user(req.email, user.id, user.wallet_address)
 
     # Cast to str to satisfy type checker
     return SignInResponse(message="Sign-in successful", email=str(user.email))
@@ -1,33 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, Literal
 from pydantic import BaseModel
 from typing import cast
 
-from app.database import SessionLocal
-from app.models.user import User
+from app.config import STATE_TREE_DEPTH, USER_CHAIN_MAX_PAGE_SIZE
+from app.database import get_db
 from app.models.block import Block
-from app.core.blockchain_utils import validate_user_chain
+from app.models.transaction import Transaction
+from app.core.blockchain_utils import (
+    iter_chain_rows,
+    merkle_proof,
+    transaction_leaf_hash,
+    validate_user_chain
+)
+from app.core.block_feed import fetch_block_events, sse_events
+from app.core.state_tree import pending_head_count, state_proof, state_root
+from app.core.user_cache import resolve_user
 
 router = APIRouter(prefix="/blockchain", tags=["Blockchain"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.get("/validate-chain/{email}")
-def validate_chain(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+def validate_chain(email: str, full: bool = False, db: Session = Depends(get_db)):
+    user = resolve_user(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Use cast if needed, though user.id is typically an int:
-    is_valid = validate_user_chain(db, cast(int, user.id))
+    # full=true re-verifies the whole chain instead of resuming from the checkpoint
+    is_valid = validate_user_chain(db, user.id, full=full)
     return {"user": email, "chain_valid": is_valid}
 
 
@@ -37,28 +42,188 @@ class BlockSchema(BaseModel):
     prev_hash: str | None
     data: str | None
     timestamp: str
+    merkle_root: str | None = None
+
+
+def block_schema(row: Row) -> BlockSchema:
+    return BlockSchema(
+        id=row.id,
+        block_hash=row.block_hash,
+        prev_hash=row.prev_hash or None,
+        data=row.data or None,
+        timestamp=row.timestamp.isoformat(),
+        merkle_root=row.merkle_root
+    )
 
 
 @router.get("/user-chain/{email}", response_model=List[BlockSchema])
-def get_user_chain(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+def get_user_chain(
+    email: str,
+    response: Response,
+    after_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=USER_CHAIN_MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    Blocks in id order. Page with limit + after_id (keyset on Block.id); a full page
+    carries X-Next-Cursor with the after_id for the next one. format=ndjson streams
+    one block per line straight off the cursor instead of building one JSON array.
+    """
+    user = resolve_user(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    user_id = user.id
 
-    blocks = (
-        db.query(Block)
-        .filter(Block.user_id == user.id)
-        .order_by(Block.id.asc())
-        .all()
-    )
+    if format == "ndjson":
+        # The request session is closed before the body streams, so use our own
+        bind = db.get_bind()
+
+        def stream_blocks():
+            with Session(bind=bind) as stream_db:
+                for row in iter_chain_rows(stream_db, user_id, after_id, limit=limit):
+                    yield block_schema(row).model_dump_json() + "\n"
 
-    result = []
-    for b in blocks:
-        result.append(BlockSchema(
-            id=cast(int, b.id),
-            block_hash=str(b.block_hash),
-            prev_hash=str(b.prev_hash) if b.prev_hash else None,
-            data=str(b.data) if b.data else None,
-            timestamp=b.timestamp.isoformat()
-        ))
+        return StreamingResponse(stream_blocks(), media_type="application/x-ndjson")
+
+    result = [block_schema(row) for row in iter_chain_rows(db, user_id, after_id, limit=limit)]
+    if limit is not None and len(result) == limit:
+        response.headers["X-Next-Cursor"] = str(result[-1].id)
     return result
+
+
+def feed_response(events: AsyncIterator[str]) -> StreamingResponse:
+    # no-transform/X-Accel-Buffering keep proxies from holding events back
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sync_feed(db: Session, user_id: int | None, after_id: int | None) -> StreamingResponse:
+    # The request session is closed before the body streams, so backfill on our own
+    bind = db.get_bind()
+
+    def fetch(after: int) -> list[dict]:
+        with Session(bind=bind) as feed_db:
+            return fetch_block_events(feed_db, user_id, after)
+
+    return feed_response(sse_events(user_id, after_id, lambda after: run_in_threadpool(fetch, after)))
+
+
+@router.get("/feed")
+def block_feed(
+    after_id: int | None = None,
+    last_event_id: int | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-Sent Events stream of every committed block with its transactions.
+    Resume with after_id, or let EventSource send Last-Event-ID on reconnect;
+    blocks committed since are replayed before the live ones.
+    """
+    return _sync_feed(db, None, last_event_id if last_event_id is not None else after_id)
+
+
+@router.get("/feed/{email}")
+def user_block_feed(
+    email: str,
+    after_id: int | None = None,
+    last_event_id: int | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    user = resolve_user(db, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _sync_feed(db, user.id, last_event_id if last_event_id is not None else after_id)
+
+
+class StateRootSchema(BaseModel):
+    root: str
+    depth: int
+    # Committed heads the root does not cover yet
+    pending_heads: int
+
+
+class StateProofSchema(BaseModel):
+    user_id: int
+    # The head this proof covers; it can trail the chain by one updater interval
+    head_block_id: int | None
+    head_block_hash: str | None
+    leaf_hash: str
+    # Leaf level first; fold them in with verify_state_proof
+    siblings: List[str]
+    root: str
+
+
+def state_root_schema(db: Session) -> StateRootSchema:
+    return StateRootSchema(root=state_root(db), depth=STATE_TREE_DEPTH, pending_heads=pending_head_count(db))
+
+
+@router.get("/state-root", response_model=StateRootSchema)
+def get_state_root(db: Session = Depends(get_db)):
+    """
+    Root of the sparse Merkle tree over every user's chain head. Equal roots on
+    two databases with no pending heads mean equal heads everywhere.
+    """
+    return state_root_schema(db)
+
+
+@router.get("/state-proof/{email}", response_model=StateProofSchema)
+def get_state_proof(email: str, db: Session = Depends(get_db)):
+    user = resolve_user(db, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return StateProofSchema(**state_proof(db, user.id)._asdict())
+
+
+class MerkleProofStep(BaseModel):
+    hash: str
+    position: str
+
+
+class TransactionProofSchema(BaseModel):
+    transaction_id: int
+    block_id: int
+    block_hash: str
+    merkle_root: str
+    leaf_hash: str
+    proof: List[MerkleProofStep]
+
+
+def transaction_leaves_query(block_id: int):
+    # Leaves are the block's transactions in id order
+    return (
+        select(Transaction.id, Transaction.user_id, Transaction.tx_type, Transaction.tx_details)
+        .where(Transaction.block_id == block_id)
+        .order_by(Transaction.id.asc())
+    )
+
+
+def build_transaction_proof(block: Block, rows: List[Row], transaction_id: int) -> TransactionProofSchema:
+    leaves = [transaction_leaf_hash(r.user_id, r.tx_type, r.tx_details) for r in rows]
+    index = next(i for i, r in enumerate(rows) if r.id == transaction_id)
+
+    return TransactionProofSchema(
+        transaction_id=transaction_id,
+        block_id=cast(int, block.id),
+        block_hash=str(block.block_hash),
+        merkle_root=str(block.merkle_root),
+        leaf_hash=leaves[index],
+        proof=[MerkleProofStep(**step) for step in merkle_proof(leaves, index)]
+    )
+
+
+@router.get("/tx-proof/{transaction_id}", response_model=TransactionProofSchema)
+def get_transaction_proof(transaction_id: int, db: Session = Depends(get_db)):
+    tx = db.get(Transaction, transaction_id)
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+
+    block = db.get(Block, tx.block_id)
+    if not block or not block.merkle_root:
+        raise HTTPException(status_code=404, detail="Block has no Merkle root")
+
+    rows = db.execute(transaction_leaves_query(cast(int, block.id))).all()
+    return build_transaction_proof(block, list(rows), transaction_id)
@@ -1,21 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import cast
+from typing import List, cast
 
-from app.database import SessionLocal
-from app.models.user import User
+from app.config import KYC_BATCH_MAX_SIZE
+from app.core.identity import IDENTITY_COLUMNS, duplicate_identities, group_duplicates, identity_hashes, identity_matches
+from app.core.user_cache import resolve_user, resolve_users
+from app.database import get_db
 from app.models.user_kyc import UserKyc
 
 router = APIRouter(prefix="/kyc", tags=["KYC"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class KycRequest(BaseModel):
     email: str
     phone: str | None = None
@@ -41,9 +37,109 @@ class KycResponse(BaseModel):
     favorite_pet_name: str | None
     city_of_growth: str | None
 
+class KycBatchResponse(BaseModel):
+    message: str
+    upserted: int
+    not_found: List[str]
+
+class IdentityMatchRequest(BaseModel):
+    nik: str | None = None
+    npwp: str | None = None
+    # Leave this user's own KYC row out of the matches
+    email: str | None = None
+
+class IdentityMatchResponse(BaseModel):
+    nik: List[int]
+    npwp: List[int]
+
+class DuplicateIdentityReport(BaseModel):
+    # Each group is the user_ids sharing one NIK (or NPWP)
+    nik: List[List[int]]
+    npwp: List[List[int]]
+
+# Every KycRequest field except the lookup key is a UserKyc column
+KYC_FIELDS = tuple(name for name in KycRequest.model_fields if name != "email")
+# Columns an upsert overwrites: the fields plus their derived lookup hashes
+KYC_COLUMNS = KYC_FIELDS + ("nik_hash", "npwp_hash")
+
+def kyc_response(message: str, kyc: UserKyc) -> KycResponse:
+    return KycResponse(
+        message=message,
+        user_id=cast(int, kyc.user_id),
+        phone=str(kyc.phone) if kyc.phone else None,
+        nik=str(kyc.nik) if kyc.nik else None,
+        npwp=str(kyc.npwp) if kyc.npwp else None,
+        sex=str(kyc.sex) if kyc.sex else None,
+        marital_status=str(kyc.marital_status) if kyc.marital_status else None,
+        birth_info=str(kyc.birth_info) if kyc.birth_info else None,
+        mother_maiden_name=str(kyc.mother_maiden_name) if kyc.mother_maiden_name else None,
+        favorite_pet_name=str(kyc.favorite_pet_name) if kyc.favorite_pet_name else None,
+        city_of_growth=str(kyc.city_of_growth) if kyc.city_of_growth else None
+    )
+
+def apply_kyc(kyc: UserKyc, req: KycRequest) -> None:
+    kyc.phone = req.phone
+    kyc.nik = req.nik
+    kyc.npwp = req.npwp
+    kyc.sex = req.sex
+    kyc.marital_status = req.marital_status
+    kyc.birth_info = req.birth_info
+    kyc.mother_maiden_name = req.mother_maiden_name
+    kyc.favorite_pet_name = req.favorite_pet_name
+    kyc.city_of_growth = req.city_of_growth
+    for name, value in identity_hashes(req.nik, req.npwp).items():
+        setattr(kyc, name, value)
+
+def check_kyc_batch(reqs: List[KycRequest]) -> None:
+    if not reqs:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Batch is empty")
+    if len(reqs) > KYC_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {KYC_BATCH_MAX_SIZE} records"
+        )
+
+def latest_by_email(reqs: List[KycRequest]) -> dict[str, KycRequest]:
+    # ON CONFLICT cannot touch the same row twice in one statement; the last record wins
+    return {req.email: req for req in reqs}
+
+def kyc_upsert(dialect_name: str):
+    """
+    INSERT ... ON CONFLICT (user_id) DO UPDATE for UserKyc, in the dialect's own form.
+    Execute it with a list of row dicts (user_id + KYC_COLUMNS, see kyc_rows).
+    """
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(UserKyc)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(UserKyc)
+    else:
+        raise ValueError(f"KYC upsert is not supported on {dialect_name}")
+    return stmt.on_conflict_do_update(
+        index_elements=[UserKyc.user_id],
+        set_={name: stmt.excluded[name] for name in KYC_COLUMNS}
+    )
+
+def kyc_rows(by_email: dict[str, KycRequest], user_ids: dict[str, int]) -> list[dict]:
+    return [
+        {
+            "user_id": user_ids[email],
+            **req.model_dump(include=set(KYC_FIELDS)),
+            **identity_hashes(req.nik, req.npwp)
+        }
+        for email, req in by_email.items()
+        if email in user_ids
+    ]
+
+def kyc_batch_response(by_email: dict[str, KycRequest], user_ids: dict[str, int]) -> KycBatchResponse:
+    return KycBatchResponse(
+        message="KYC batch upserted successfully",
+        upserted=len(user_ids),
+        not_found=[email for email in by_email if email not in user_ids]
+    )
+
 @router.post("/update", response_model=KycResponse)
 def update_kyc(req: KycRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == req.email).first()
+    user = resolve_user(db, req.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -51,60 +147,51 @@ def update_kyc(req: KycRequest, db: Session = Depends(get_db)):
 
     if not existing_kyc:
         # Create new
-        new_kyc = UserKyc(
-            # Use cast(int, ...) to hush the linter about InstrumentedAttribute
-            user_id=cast(int, user.id),
-            phone=req.phone,
-            nik=req.nik,
-            npwp=req.npwp,
-            sex=req.sex,
-            marital_status=req.marital_status,
-            birth_info=req.birth_info,
-            mother_maiden_name=req.mother_maiden_name,
-            favorite_pet_name=req.favorite_pet_name,
-            city_of_growth=req.city_of_growth
-        )
+        new_kyc = UserKyc(user_id=user.id)
+        apply_kyc(new_kyc, req)
         db.add(new_kyc)
         db.commit()
         db.refresh(new_kyc)
 
-        return KycResponse(
-            message="KYC created successfully",
-            user_id=cast(int, new_kyc.user_id),
-            phone=str(new_kyc.phone) if new_kyc.phone else None,
-            nik=str(new_kyc.nik) if new_kyc.nik else None,
-            npwp=str(new_kyc.npwp) if new_kyc.npwp else None,
-            sex=str(new_kyc.sex) if new_kyc.sex else None,
-            marital_status=str(new_kyc.marital_status) if new_kyc.marital_status else None,
-            birth_info=str(new_kyc.birth_info) if new_kyc.birth_info else None,
-            mother_maiden_name=str(new_kyc.mother_maiden_name) if new_kyc.mother_maiden_name else None,
-            favorite_pet_name=str(new_kyc.favorite_pet_name) if new_kyc.favorite_pet_name else None,
-            city_of_growth=str(new_kyc.city_of_growth) if new_kyc.city_of_growth else None
-        )
+        return kyc_response("KYC created successfully", new_kyc)
     else:
         # Update existing
-        existing_kyc.phone = req.phone
-        existing_kyc.nik = req.nik
-        existing_kyc.npwp = req.npwp
-        existing_kyc.sex = req.sex
-        existing_kyc.marital_status = req.marital_status
-        existing_kyc.birth_info = req.birth_info
-        existing_kyc.mother_maiden_name = req.mother_maiden_name
-        existing_kyc.favorite_pet_name = req.favorite_pet_name
-        existing_kyc.city_of_growth = req.city_of_growth
+        apply_kyc(existing_kyc, req)
         db.commit()
         db.refresh(existing_kyc)
 
-        return KycResponse(
-            message="KYC updated successfully",
-            user_id=cast(int, existing_kyc.user_id),
-            phone=str(existing_kyc.phone) if existing_kyc.phone else None,
-            nik=str(existing_kyc.nik) if existing_kyc.nik else None,
-            npwp=str(existing_kyc.npwp) if existing_kyc.npwp else None,
-            sex=str(existing_kyc.sex) if existing_kyc.sex else None,
-            marital_status=str(existing_kyc.marital_status) if existing_kyc.marital_status else None,
-            birth_info=str(existing_kyc.birth_info) if existing_kyc.birth_info else None,
-            mother_maiden_name=str(existing_kyc.mother_maiden_name) if existing_kyc.mother_maiden_name else None,
-            favorite_pet_name=str(existing_kyc.favorite_pet_name) if existing_kyc.favorite_pet_name else None,
-            city_of_growth=str(existing_kyc.city_of_growth) if existing_kyc.city_of_growth else None
-        )
+        return kyc_response("KYC updated successfully", existing_kyc)
+
+@router.post("/batch-upsert", response_model=KycBatchResponse)
+def batch_upsert_kyc(reqs: List[KycRequest], db: Session = Depends(get_db)):
+    check_kyc_batch(reqs)
+    by_email = latest_by_email(reqs)
+
+    # Cached emails plus one query for the rest; unknown ones are reported, not fatal
+    user_ids = {email: user.id for email, user in resolve_users(db, by_email).items()}
+    rows = kyc_rows(by_email, user_ids)
+    if rows:
+        db.execute(kyc_upsert(db.get_bind().dialect.name), rows)
+        db.commit()
+
+    return kyc_batch_response(by_email, user_ids)
+
+@router.post("/identity-matches", response_model=IdentityMatchResponse)
+def find_identity_matches(req: IdentityMatchRequest, db: Session = Depends(get_db)):
+    exclude_user_id = None
+    if req.email is not None:
+        user = resolve_user(db, req.email)
+        exclude_user_id = user.id if user else None
+
+    matches: dict[str, List[int]] = {}
+    for field in IDENTITY_COLUMNS:
+        stmt = identity_matches(field, getattr(req, field), exclude_user_id)
+        matches[field] = list(db.scalars(stmt)) if stmt is not None else []
+    return IdentityMatchResponse(**matches)
+
+@router.get("/duplicates", response_model=DuplicateIdentityReport)
+def duplicate_identity_report(db: Session = Depends(get_db)):
+    return DuplicateIdentityReport(**{
+        field: group_duplicates(db.execute(duplicate_identities(field)))
+        for field in IDENTITY_COLUMNS
+    })
@@ -1,28 +1,38 @@
-from typing import cast
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Callable, List, TypeVar, cast
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.database import SessionLocal
+from app.config import GROUP_COMMIT_ENABLED, IDEMPOTENCY_KEY_MAX_LENGTH, TRANSACTION_BATCH_MAX_SIZE
+from app.database import get_db
 from app.models.user import User
-from app.models.block import Block
 from app.models.transaction import Transaction
+from app.core.block_feed import queue_transactions
+from app.core.group_commit import get_group_committer
+from app.core.idempotency import (
+    StoredOutcome,
+    drop_expired_key,
+    find_outcome,
+    remember_outcome,
+    request_hash,
+    store_key
+)
+from app.core.user_cache import resolve_user
 from app.core.blockchain_utils import (
-    get_last_block_for_user,
-    create_block,
+    ChainConflictError,
+    get_chain_head,
+    append_block,
+    compute_block_hash,
+    merkle_root,
+    transaction_leaf_hash,
     validate_new_transaction
 )
 
 router = APIRouter(prefix="/transaction", tags=["Transaction"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 class TransactionRequest(BaseModel):
     email: str
@@ -35,37 +45,219 @@ class TransactionResponse(BaseModel):
     transaction_id: int
 
 
-@router.post("/create", response_model=TransactionResponse)
-def create_transaction(req: TransactionRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == req.email).first()
+class TransactionBatchResponse(BaseModel):
+    message: str
+    block_id: int
+    transaction_ids: List[int]
+
+
+T = TypeVar("T")
+
+CREATED_MESSAGE = "Transaction created successfully"
+
+
+def transaction_block_data(tx_type: str, tx_details: str | None) -> str:
+    return f"Transaction Type: {tx_type}; Details: {tx_details or ''}"
+
+
+def batch_block_data(items: List[TransactionRequest]) -> str:
+    digest = compute_block_hash("\n".join(f"{item.tx_type}:{item.tx_details or ''}" for item in items))
+    return f"Transaction Batch: {len(items)} transactions; Digest: {digest}"
+
+
+def transaction_rows(block_id: int, user_id: int, items: List[TransactionRequest]) -> List[dict]:
+    return [
+        {"block_id": block_id, "user_id": user_id, "tx_type": item.tx_type, "tx_details": item.tx_details}
+        for item in items
+    ]
+
+
+def feed_transactions(transaction_ids: List[int], items: List[TransactionRequest]) -> List[dict]:
+    return [
+        {"id": tx_id, "tx_type": item.tx_type, "tx_details": item.tx_details}
+        for tx_id, item in zip(transaction_ids, items)
+    ]
+
+
+def check_batch(reqs: List[TransactionRequest]) -> None:
+    if not reqs:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Batch is empty")
+    if len(reqs) > TRANSACTION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {TRANSACTION_BATCH_MAX_SIZE} transactions"
+        )
+    if any(item.email != reqs[0].email for item in reqs):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="All transactions in a batch must belong to the same user"
+        )
+
+
+def check_idempotency_key(key: str) -> None:
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+
+
+def replay_response(outcome: StoredOutcome, req_hash: str) -> TransactionResponse:
+    if outcome.request_hash != req_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different transaction"
+        )
+    return TransactionResponse(message=CREATED_MESSAGE, transaction_id=outcome.transaction_id)
+
+
+def record_transaction(
+    db: Session, user_id: int, tx_type: str, tx_details: str | None, idempotency_key: str | None = None
+) -> int:
+    """
+    Append the block and its Transaction row without committing; returns the new
+    transaction id. Safe to re-run on a fresh session (group commit relies on it).
+    With an idempotency key, the key row is written in the same transaction.
+    """
+    user = db.get(User, user_id)
+    block_data = transaction_block_data(tx_type, tx_details)
+    root = merkle_root([transaction_leaf_hash(user_id, tx_type, tx_details)])
+    new_block = append_block(db, user, block_data, commit=False, merkle_root=root)
+
+    new_tx = Transaction(
+        block_id=cast(int, new_block.id),
+        user_id=user_id,
+        tx_type=tx_type,
+        tx_details=tx_details
+    )
+    db.add(new_tx)
+    db.flush()
+    queue_transactions(db, cast(int, new_block.id), [{"id": new_tx.id, "tx_type": tx_type, "tx_details": tx_details}])
+    if idempotency_key is not None:
+        store_key(db, user_id, idempotency_key, request_hash(tx_type, tx_details), cast(int, new_tx.id))
+    return cast(int, new_tx.id)
+
+
+def record_transaction_batch(db: Session, user_id: int, items: List[TransactionRequest]) -> tuple[int, List[int]]:
+    """
+    Seal all items into a single block and insert their Transaction rows in one
+    statement; returns (block id, transaction ids in request order). No commit.
+    """
+    user = db.get(User, user_id)
+    block_data = batch_block_data(items)
+    root = merkle_root([transaction_leaf_hash(user_id, item.tx_type, item.tx_details) for item in items])
+    new_block = append_block(db, user, block_data, commit=False, merkle_root=root)
+    block_id = cast(int, new_block.id)
+
+    transaction_ids = db.scalars(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        transaction_rows(block_id, user_id, items),
+    ).all()
+    queue_transactions(db, block_id, feed_transactions(transaction_ids, items))
+    return block_id, list(transaction_ids)
+
+
+def _run_write(db: Session, work: Callable[[Session], T]) -> T:
+    try:
+        if GROUP_COMMIT_ENABLED:
+            # Answered once the shared batch commit is durable
+            return get_group_committer().submit(work)
+        result = work(db)
+        # Block, transactions and head pointer land in one commit
+        db.commit()
+        return result
+    except ChainConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Chain head is busy, please retry"
+        )
+
+
+def _load_user(db: Session, email: str) -> User:
+    # Cached email -> id, then a primary-key load; the row carries the chain head and
+    # stays in the session's identity map for the direct write path
+    user_ref = resolve_user(db, email)
+    user = db.get(User, user_ref.id) if user_ref else None
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    return user
 
+
+@router.post("/create", response_model=TransactionResponse)
+def create_transaction(
+    req: TransactionRequest,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    user = _load_user(db, req.email)
     user_id_int = cast(int, user.id)
-    last_block = get_last_block_for_user(db, user_id_int)
+
+    # A repeated key gets the original answer without touching the chain
+    if idempotency_key is not None:
+        check_idempotency_key(idempotency_key)
+        req_hash = request_hash(req.tx_type, req.tx_details)
+        outcome = find_outcome(db, user_id_int, idempotency_key)
+        if outcome is not None:
+            return replay_response(outcome, req_hash)
+    # The head comes off the user row we already have
+    head_id, _ = get_chain_head(db, user)
 
     # Validate
-    if not validate_new_transaction(db, user_id_int, last_block.id if last_block else None):
+    if not validate_new_transaction(db, user_id_int, head_id, user=user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Transaction validation failed"
         )
 
-    prev_hash = last_block.block_hash if last_block else "GENESIS"
-    block_data = f"Transaction Type: {req.tx_type}; Details: {req.tx_details or ''}"
-    new_block = create_block(db, user_id_int, prev_hash, block_data)
+    def write(write_db: Session) -> int:
+        return record_transaction(write_db, user_id_int, req.tx_type, req.tx_details, idempotency_key)
 
-    new_tx = Transaction(
-        block_id=cast(int, new_block.id),
-        user_id=user_id_int,
-        tx_type=req.tx_type,
-        tx_details=req.tx_details
-    )
-    db.add(new_tx)
-    db.commit()
-    db.refresh(new_tx)
+    try:
+        transaction_id = _run_write(db, write)
+    except IntegrityError:
+        # A concurrent request with the same key committed first; ours rolled back
+        db.rollback()
+        if idempotency_key is None:
+            raise
+        outcome = find_outcome(db, user_id_int, idempotency_key)
+        if outcome is not None:
+            return replay_response(outcome, req_hash)
+        # Or the key's expired row is still waiting for the purge
+        if not drop_expired_key(db, user_id_int, idempotency_key):
+            raise
+        db.commit()
+        transaction_id = _run_write(db, write)
 
+    if idempotency_key is not None:
+        remember_outcome(user_id_int, idempotency_key, StoredOutcome(transaction_id, req_hash))
     return TransactionResponse(
-        message="Transaction created successfully",
-        transaction_id=new_tx.id
+        message=CREATED_MESSAGE,
+        transaction_id=transaction_id
+    )
+
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+def create_transaction_batch(reqs: List[TransactionRequest], db: Session = Depends(get_db)):
+    check_batch(reqs)
+    email = reqs[0].email
+
+    user = _load_user(db, email)
+    user_id_int = cast(int, user.id)
+    head_id, _ = get_chain_head(db, user)
+
+    # Validate once for the whole batch
+    if not validate_new_transaction(db, user_id_int, head_id, user=user):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Transaction validation failed"
+        )
+
+    block_id, transaction_ids = _run_write(
+        db, lambda write_db: record_transaction_batch(write_db, user_id_int, reqs)
+    )
+
+    return TransactionBatchResponse(
+        message=f"{len(transaction_ids)} transactions created successfully",
+        block_id=block_id,
+        transaction_ids=transaction_ids
     )
@@ -0,0 +1,236 @@
+# scripts/archive_chains.py
+"""
+Cold-block archival.
+
+For every chain with at least --min-blocks blocks not yet archived, appends
+a snapshot block at the head recording the archived head hash and the running
+aggregate hash, then copies those blocks and their transactions into a
+compressed segment file. Manifest rows and the snapshot commit together, one
+user per transaction. A user whose head moved fails the snapshot's
+compare-and-swap before anything is written, and is picked up next time.
+
+Archived rows are deleted from blocks/transactions by a later run, once
+ARCHIVE_PURGE_GRACE_SECONDS have passed, so chain reads that started before
+the manifest commit never see a gap.
+
+    python -m scripts.archive_chains --min-blocks 1000
+    python -m scripts.archive_chains --purge-only
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlalchemy import create_engine, delete, func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import ARCHIVE_PURGE_GRACE_SECONDS, ARCHIVE_SEGMENT_BLOCKS, DATABASE_URL
+from app.core.archive import SegmentWriter, aggregate_hash, block_record, snapshot_block_data
+from app.core.blockchain_utils import CHAIN_COLUMNS, ChainConflictError, create_block
+from app.models.archive_segment import ArchiveSegment
+from app.models.block import Block
+from app.models.idempotency_key import IdempotencyKey
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+class ArchiveSummary(NamedTuple):
+    users: int
+    blocks: int
+    transactions: int
+    skipped: int
+    purged_segments: int
+    elapsed: float
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def candidate_users(db: Session, min_blocks: int) -> list[int]:
+    # Live row counts still include archived rows awaiting purge;
+    # archive_user_chain re-checks against the manifest
+    return list(db.scalars(
+        select(Block.user_id).group_by(Block.user_id).having(func.count() >= min_blocks).order_by(Block.user_id)
+    ))
+
+
+def archive_user_chain(
+    db: Session,
+    writer: SegmentWriter,
+    user_id: int,
+    min_blocks: int,
+    segment_blocks: int = ARCHIVE_SEGMENT_BLOCKS,
+) -> tuple[int, int] | None:
+    """
+    Archive one chain up to its head and append the snapshot; returns
+    (blocks, transactions) archived, or None if there was nothing to do or the
+    head moved.
+    """
+    head_id, head_hash = db.execute(select(User.head_block_id, User.head_block_hash).where(User.id == user_id)).one()
+    if head_hash is None:
+        return None
+    previous = db.execute(
+        select(ArchiveSegment.last_block_id, ArchiveSegment.aggregate_hash)
+        .where(ArchiveSegment.user_id == user_id)
+        .order_by(ArchiveSegment.last_block_id.desc())
+        .limit(1)
+    ).first()
+    after_id, aggregate = (previous.last_block_id, previous.aggregate_hash) if previous else (0, None)
+    unarchived = (Block.user_id == user_id, Block.id > after_id, Block.id <= head_id)
+    pending = db.scalar(select(func.count()).where(*unarchived))
+    if pending < min_blocks:
+        return None
+
+    # Claim the chain first: the snapshot only needs the hashes, and a head that
+    # moved fails the compare-and-swap before any segment bytes are written
+    archived_total = db.scalar(
+        select(func.coalesce(func.sum(ArchiveSegment.block_count), 0)).where(ArchiveSegment.user_id == user_id)
+    ) + pending
+    final_aggregate = aggregate_hash(aggregate, db.scalars(
+        select(Block.block_hash).where(*unarchived).order_by(Block.id.asc()).execution_options(yield_per=segment_blocks)
+    ))
+    try:
+        # Chained onto the head we archive up to; a concurrent append wins and we retry next run
+        snapshot = create_block(
+            db, user_id, head_hash, snapshot_block_data(archived_total, head_hash, final_aggregate), commit=False
+        )
+    except ChainConflictError:
+        return None
+
+    segments = []
+    blocks = transactions = 0
+    while True:
+        rows = db.execute(
+            select(*CHAIN_COLUMNS)
+            .where(Block.user_id == user_id, Block.id > after_id, Block.id <= head_id)
+            .order_by(Block.id.asc())
+            .limit(segment_blocks)
+        ).all()
+        if not rows:
+            break
+        by_block: dict[int, list] = {row.id: [] for row in rows}
+        for tx in db.execute(
+            select(Transaction.id, Transaction.block_id, Transaction.tx_type, Transaction.tx_details, Transaction.timestamp)
+            .where(Transaction.block_id.in_(list(by_block)))
+            .order_by(Transaction.id.asc())
+        ):
+            by_block[tx.block_id].append(tx)
+
+        offset, length = writer.append([block_record(row, by_block[row.id]) for row in rows])
+        aggregate = aggregate_hash(aggregate, (row.block_hash for row in rows))
+        tx_count = sum(len(txs) for txs in by_block.values())
+        segments.append({
+            "user_id": user_id,
+            "first_block_id": rows[0].id,
+            "last_block_id": rows[-1].id,
+            "block_count": len(rows),
+            "transaction_count": tx_count,
+            "path": writer.name,
+            "byte_offset": offset,
+            "byte_length": length,
+            "aggregate_hash": aggregate,
+            "snapshot_block_id": snapshot.id,
+        })
+        blocks += len(rows)
+        transactions += tx_count
+        after_id = rows[-1].id
+
+    db.execute(insert(ArchiveSegment), segments)
+    writer.sync()
+    # Should this commit fail, the records just written stay in the file unreferenced
+    db.commit()
+    return blocks, transactions
+
+
+def purge_archived(db: Session, grace_seconds: float = ARCHIVE_PURGE_GRACE_SECONDS) -> int:
+    """
+    Delete archived rows from the live tables for segments older than the
+    grace period; returns the number of segments purged.
+    """
+    cutoff = _utc_now() - timedelta(seconds=grace_seconds)
+    segments = db.execute(
+        select(ArchiveSegment.id, ArchiveSegment.user_id, ArchiveSegment.first_block_id, ArchiveSegment.last_block_id)
+        .where(ArchiveSegment.purged_at.is_(None), ArchiveSegment.created_at <= cutoff)
+        .order_by(ArchiveSegment.id)
+    ).all()
+    for segment in segments:
+        archived_blocks = select(Block.id).where(
+            Block.user_id == segment.user_id, Block.id.between(segment.first_block_id, segment.last_block_id)
+        )
+        archived_transactions = select(Transaction.id).where(Transaction.block_id.in_(archived_blocks))
+        # Keys that old are past their TTL, but their rows still reference the transactions
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.transaction_id.in_(archived_transactions)))
+        db.execute(delete(Transaction).where(Transaction.block_id.in_(archived_blocks)))
+        db.execute(delete(Block).where(
+            Block.user_id == segment.user_id, Block.id.between(segment.first_block_id, segment.last_block_id)
+        ))
+        db.execute(update(ArchiveSegment).where(ArchiveSegment.id == segment.id).values(purged_at=_utc_now()))
+        db.commit()
+    return len(segments)
+
+
+def run_archive(
+    database_url: str = DATABASE_URL,
+    min_blocks: int = 1000,
+    segment_blocks: int = ARCHIVE_SEGMENT_BLOCKS,
+    grace_seconds: float = ARCHIVE_PURGE_GRACE_SECONDS,
+    purge_only: bool = False,
+    out=sys.stderr,
+) -> ArchiveSummary:
+    engine = create_engine(database_url)
+    session_local = sessionmaker(bind=engine)
+    started = time.perf_counter()
+    users = blocks = transactions = skipped = 0
+
+    with session_local() as db:
+        if not purge_only:
+            writer = SegmentWriter()
+            try:
+                for user_id in candidate_users(db, min_blocks):
+                    archived = archive_user_chain(db, writer, user_id, min_blocks, segment_blocks)
+                    db.rollback()
+                    if archived is None:
+                        skipped += 1
+                        continue
+                    users += 1
+                    blocks += archived[0]
+                    transactions += archived[1]
+            finally:
+                writer.close()
+        purged = purge_archived(db, grace_seconds)
+
+    engine.dispose()
+    elapsed = time.perf_counter() - started
+    print(
+        f"done users={users} blocks={blocks} transactions={transactions} skipped={skipped} "
+        f"purged_segments={purged} seconds={elapsed:.1f}",
+        file=out,
+    )
+    return ArchiveSummary(users, blocks, transactions, skipped, purged, elapsed)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Move old chain blocks into compressed archive segments.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--min-blocks", type=int, default=1000, help="Unarchived blocks a chain needs to be archived")
+    parser.add_argument("--segment-blocks", type=int, default=ARCHIVE_SEGMENT_BLOCKS, help="Blocks per segment record")
+    parser.add_argument("--grace-seconds", type=float, default=ARCHIVE_PURGE_GRACE_SECONDS,
+                        help="Age of a segment before its rows leave the live tables")
+    parser.add_argument("--purge-only", action="store_true", help="Only delete rows of segments past the grace period")
+    args = parser.parse_args(argv)
+
+    run_archive(
+        database_url=args.database_url,
+        min_blocks=args.min_blocks,
+        segment_blocks=args.segment_blocks,
+        grace_seconds=args.grace_seconds,
+        purge_only=args.purge_only,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# scripts/audit_ledger.py
+"""
+Whole-ledger integrity audit.
+
+Walks every user id, splits them across a process pool and re-verifies each
+chain (prev-hash links + block hashes, same checks as validate_user_chain).
+
+    python -m scripts.audit_ledger --workers 8 --cursor-file audit.cursor
+
+The cursor file holds the last user id whose chain (and every chain before it)
+has been audited, so an interrupted run picks up where it stopped.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import CHAIN_SCAN_BATCH_SIZE, DATABASE_URL
+from app.core.blockchain_utils import iter_chain_rows, scan_chain
+from app.models.user import User
+
+# Set in each worker by _init_worker; every process gets its own engine
+_session_local = None
+
+
+class ChainAudit(NamedTuple):
+    user_id: int
+    valid: bool
+    blocks_checked: int
+    bad_block_id: int | None
+
+
+class AuditSummary(NamedTuple):
+    users: int
+    blocks: int
+    broken: list[ChainAudit]
+    last_user_id: int | None
+    elapsed: float
+
+
+def _init_worker(database_url: str) -> None:
+    global _session_local
+    engine = create_engine(database_url, pool_size=1, max_overflow=0)
+    _session_local = sessionmaker(bind=engine)
+
+
+def audit_users(user_ids: list[int], batch_size: int = CHAIN_SCAN_BATCH_SIZE) -> list[ChainAudit]:
+    results = []
+    with _session_local() as db:
+        for user_id in user_ids:
+            scan = scan_chain(iter_chain_rows(db, user_id, batch_size=batch_size))
+            results.append(ChainAudit(user_id, scan.valid, scan.blocks_checked, scan.bad_block_id))
+    return results
+
+
+def _iter_user_id_chunks(session_local, start_after: int | None, chunk_size: int):
+    last_id = start_after
+    while True:
+        stmt = select(User.id).order_by(User.id.asc()).limit(chunk_size)
+        if last_id is not None:
+            stmt = stmt.where(User.id > last_id)
+        with session_local() as db:
+            chunk = list(db.scalars(stmt))
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def _read_cursor(cursor_file: str | None) -> int | None:
+    if not cursor_file or not os.path.exists(cursor_file):
+        return None
+    with open(cursor_file) as f:
+        value = f.read().strip()
+    return int(value) if value else None
+
+
+def _write_cursor(cursor_file: str | None, user_id: int) -> None:
+    if not cursor_file:
+        return
+    tmp_path = f"{cursor_file}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(user_id))
+    os.replace(tmp_path, cursor_file)
+
+
+def run_audit(
+    database_url: str = DATABASE_URL,
+    workers: int | None = None,
+    chunk_size: int = 100,
+    batch_size: int = CHAIN_SCAN_BATCH_SIZE,
+    start_after: int | None = None,
+    cursor_file: str | None = None,
+    out=sys.stdout,
+    progress_every: float = 5.0,
+) -> AuditSummary:
+    workers = workers or os.cpu_count() or 1
+    if start_after is None:
+        start_after = _read_cursor(cursor_file)
+
+    engine = create_engine(database_url, pool_size=1, max_overflow=0)
+    session_local = sessionmaker(bind=engine)
+
+    users = blocks = 0
+    broken: list[ChainAudit] = []
+    last_user_id = start_after
+    started = last_report = time.perf_counter()
+
+    def report(prefix: str) -> None:
+        elapsed = time.perf_counter() - started
+        rate = blocks / elapsed if elapsed else 0.0
+        print(
+            f"{prefix} users={users} blocks={blocks} broken={len(broken)} "
+            f"blocks/sec={rate:,.0f} cursor={last_user_id}",
+            file=sys.stderr,
+        )
+
+    def consume(future) -> None:
+        nonlocal users, blocks, last_user_id
+        for result in future.result():
+            users += 1
+            blocks += result.blocks_checked
+            last_user_id = result.user_id
+            if not result.valid:
+                broken.append(result)
+                print(f"user_id={result.user_id} first_bad_block={result.bad_block_id}", file=out)
+        _write_cursor(cursor_file, last_user_id)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(database_url,)) as pool:
+        # Results are consumed in submission order so the cursor only moves past
+        # user ids whose chains (and all earlier ones) are fully audited
+        in_flight = deque()
+        for chunk in _iter_user_id_chunks(session_local, start_after, chunk_size):
+            in_flight.append(pool.submit(audit_users, chunk, batch_size))
+            if len(in_flight) >= workers * 2:
+                consume(in_flight.popleft())
+            if time.perf_counter() - last_report >= progress_every:
+                report("progress")
+                last_report = time.perf_counter()
+        while in_flight:
+            consume(in_flight.popleft())
+
+    engine.dispose()
+    report("done")
+    return AuditSummary(users, blocks, broken, last_user_id, time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Audit every user chain in parallel.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=100, help="User ids per worker task")
+    parser.add_argument("--batch-size", type=int, default=CHAIN_SCAN_BATCH_SIZE, help="Blocks per fetch")
+    parser.add_argument("--start-after", type=int, default=None, help="Resume after this user id")
+    parser.add_argument("--cursor-file", default=None, help="Read/write the resume cursor here")
+    args = parser.parse_args(argv)
+
+    summary = run_audit(
+        database_url=args.database_url,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        start_after=args.start_after,
+        cursor_file=args.cursor_file,
+    )
+    return 1 if summary.broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# scripts/bench_api.py
+"""
+Latency/throughput baselines for the API's hot endpoints.
+
+Drives the real FastAPI app in-process through httpx's ASGI transport (no
+network, no server) against a throwaway SQLite file or any database URL,
+after seeding users whose chains are 10 / 1k / 100k blocks long. Every
+endpoint gets --requests calls at --concurrency in-flight; results are
+throughput plus p50/p95/p99 latency, printed (or written) as JSON so runs
+can be diffed between releases.
+
+    python -m scripts.bench_api --concurrency 16 --requests 200
+    python -m scripts.bench_api --chains 10,1000 --endpoints signin,validate_chain --out bench.json
+    DB_MODE=async python -m scripts.bench_api --database-url postgresql://...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from itertools import count
+from typing import Callable
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.config import DB_MODE
+from app.core.security import hash_password
+from app.database import Base, build_async_engine, build_engine, get_async_db, get_db
+from app.main import app
+from scripts.generate_ledger import LedgerBatch, LedgerGenerator, load_batch, next_ids, sync_sequences
+
+BENCH_PASSWORD = "BenchPass123"
+ENDPOINTS = ("signup", "signin", "transaction_create", "validate_chain", "user_chain_page")
+
+
+def seed(session_local, chains: list[int], users_per_chain: int = 4) -> dict[int, list[str]]:
+    """
+    Create users_per_chain users for every chain length with the ledger
+    generator; returns {length: [emails]}.
+    """
+    password_hash = hash_password(BENCH_PASSWORD)
+    seeded: dict[int, list[str]] = {}
+    with session_local() as db:
+        generator = LedgerGenerator(
+            time.time_ns(), next_ids(db.connection()), password_hash, email_domain="bench.local", kyc_ratio=0.0
+        )
+        for length in chains:
+            batch = LedgerBatch()
+            seeded[length] = [generator.add_user(batch, chain_length=length)["email"] for _ in range(users_per_chain)]
+            load_batch(db.connection(), batch)
+            db.commit()
+        sync_sequences(db.connection())
+        db.commit()
+    return seeded
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    name: str,
+    make_request: Callable[[int], tuple[str, str, dict]],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    sequence = count()
+
+    async def worker():
+        nonlocal errors
+        while (n := next(sequence)) < requests:
+            method, url, kwargs = make_request(n)
+            started = time.perf_counter()
+            resp = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def _scenarios(seeded: dict[int, list[str]], endpoints: list[str]) -> list[tuple[str, Callable]]:
+    shortest = seeded[min(seeded)]
+    stamp = time.time_ns()
+    scenarios = []
+    if "signup" in endpoints:
+        scenarios.append(("signup", lambda n: (
+            "POST", "/auth/signup", {"json": {"email": f"signup-{stamp}-{n}@bench.local", "password": BENCH_PASSWORD}}
+        )))
+    if "signin" in endpoints:
+        scenarios.append(("signin", lambda n: (
+            "POST", "/auth/signin", {"json": {"email": shortest[n % len(shortest)], "password": BENCH_PASSWORD}}
+        )))
+    if "transaction_create" in endpoints:
+        # Spread over several users so the numbers are not one contended chain head
+        scenarios.append(("transaction_create", lambda n: (
+            "POST", "/transaction/create",
+            {"json": {"email": shortest[n % len(shortest)], "tx_type": "TRANSFER", "tx_details": f"bench {n}"}}
+        )))
+    for length, emails in sorted(seeded.items()):
+        if "validate_chain" in endpoints:
+            # full=true so every call re-verifies the chain instead of hitting the checkpoint
+            scenarios.append((f"validate_chain_{length}", lambda n, emails=emails: (
+                "GET", f"/blockchain/validate-chain/{emails[n % len(emails)]}", {"params": {"full": "true"}}
+            )))
+        if "user_chain_page" in endpoints:
+            scenarios.append((f"user_chain_page_{length}", lambda n, emails=emails: (
+                "GET", f"/blockchain/user-chain/{emails[n % len(emails)]}", {"params": {"limit": 100}}
+            )))
+    return scenarios
+
+
+def _async_url(database_url: str) -> str:
+    if database_url.startswith("sqlite:"):
+        return database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return database_url.replace("postgresql:", "postgresql+asyncpg:", 1)
+
+
+async def run_benchmark(
+    database_url: str,
+    chains: list[int],
+    endpoints: list[str],
+    requests: int,
+    concurrency: int,
+    users_per_chain: int = 4,
+) -> dict:
+    sqlite = database_url.startswith("sqlite")
+    engine = build_engine(
+        database_url,
+        **({"connect_args": {"check_same_thread": False, "timeout": 60}} if sqlite else {})
+    )
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    seed_started = time.perf_counter()
+    seeded = seed(session_local, chains, users_per_chain)
+    seed_seconds = time.perf_counter() - seed_started
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    saved_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    async_engine = None
+    if DB_MODE == "async":
+        async_engine = build_async_engine(_async_url(database_url))
+        async_session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with async_session_local() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, make_request in _scenarios(seeded, endpoints):
+                results.append(await run_endpoint(client, name, make_request, requests, concurrency))
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(saved_overrides)
+        if async_engine is not None:
+            await async_engine.dispose()
+        engine.dispose()
+
+    return {
+        "config": {
+            "db_mode": DB_MODE,
+            "dialect": engine.dialect.name,
+            "chains": chains,
+            "requests": requests,
+            "concurrency": concurrency,
+            "users_per_chain": users_per_chain,
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the API's hot endpoints in-process.")
+    parser.add_argument("--database-url", default=None, help="Default: a throwaway SQLite file")
+    parser.add_argument("--chains", default="10,1000,100000", help="Comma-separated seeded chain lengths")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--users-per-chain", type=int, default=4, help="Seeded users per chain length")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--out", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints.split(",")
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    tmp_dir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    report = asyncio.run(run_benchmark(
+        database_url,
+        [int(c) for c in args.chains.split(",")],
+        endpoints,
+        args.requests,
+        args.concurrency,
+        args.users_per_chain,
+    ))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    return 1 if any(r["errors"] for r in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
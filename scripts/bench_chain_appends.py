@@ -0,0 +1,179 @@
+# scripts/bench_chain_appends.py
+"""
+Chain append throughput under concurrent writers.
+
+Each writer is a thread with its own session doing append_block + commit in a
+loop, like concurrent /transaction/create requests. Two scenarios per writer
+count:
+
+  one-user   every writer appends to the same chain (contended head)
+  many-users every writer appends to its own chain (should scale)
+
+After each run every touched chain is re-verified and checked for forks.
+With --group-commit the writers submit their appends to a GroupCommitter
+instead, like the API with GROUP_COMMIT_ENABLED.
+
+    python -m scripts.bench_chain_appends --writers 1,2,4,8 --appends 200
+    python -m scripts.bench_chain_appends --writers 8 --group-commit
+    python -m scripts.bench_chain_appends --database-url postgresql://... --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import (
+    ChainConflictError,
+    append_block,
+    create_genesis_block,
+    validate_user_chain
+)
+from app.core.group_commit import GroupCommitter
+from app.database import Base
+from app.models.block import Block
+from app.models.user import User
+
+
+def _make_engine(database_url: str, pool_size: int):
+    if database_url.startswith("sqlite"):
+        # SQLite serializes writers; wait for the lock instead of failing
+        return create_engine(database_url, connect_args={"timeout": 60}, pool_size=pool_size)
+    return create_engine(database_url, pool_size=pool_size, max_overflow=0)
+
+
+def _create_users(session_local, prefix: str, count: int) -> list[int]:
+    user_ids = []
+    with session_local() as db:
+        for i in range(count):
+            user = User(email=f"{prefix}-{i}-{time.time_ns()}@bench.local", password_hash="x", bip39_mnemonic="bench")
+            db.add(user)
+            create_genesis_block(db, user, commit=False)
+            db.commit()
+            user_ids.append(user.id)
+    return user_ids
+
+
+def _writer(session_local, user_id: int, appends: int, barrier: threading.Barrier, failures: list) -> None:
+    barrier.wait()
+    if isinstance(session_local, GroupCommitter):
+        for n in range(appends):
+            try:
+                session_local.submit(
+                    lambda db, n=n: append_block(db, db.get(User, user_id), f"bench append {n}", commit=False)
+                )
+            except ChainConflictError:
+                failures.append(user_id)
+        return
+    with session_local() as db:
+        for n in range(appends):
+            user = db.get(User, user_id)
+            try:
+                append_block(db, user, f"bench append {n}")
+            except ChainConflictError:
+                failures.append(user_id)
+
+
+def _forked_chains(session_local, user_ids: list[int]) -> list[int]:
+    forked = []
+    with session_local() as db:
+        for user_id in set(user_ids):
+            duplicate_links = db.execute(
+                select(Block.prev_hash)
+                .where(Block.user_id == user_id)
+                .group_by(Block.prev_hash)
+                .having(func.count() > 1)
+            ).first()
+            if duplicate_links or not validate_user_chain(db, user_id, full=True):
+                forked.append(user_id)
+    return forked
+
+
+def run_scenario(session_local, scenario: str, writers: int, appends: int, group_commit: bool = False) -> dict:
+    if scenario == "one-user":
+        user_ids = _create_users(session_local, scenario, 1) * writers
+    else:
+        user_ids = _create_users(session_local, scenario, writers)
+
+    committer = GroupCommitter(session_local) if group_commit else None
+    barrier = threading.Barrier(writers + 1)
+    failures: list[int] = []
+    threads = [
+        threading.Thread(target=_writer, args=(committer or session_local, user_id, appends, barrier, failures))
+        for user_id in user_ids
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    if committer is not None:
+        committer.stop()
+
+    total = writers * appends - len(failures)
+    return {
+        "scenario": scenario,
+        "writers": writers,
+        "appends": total,
+        "gave_up": len(failures),
+        "seconds": round(elapsed, 4),
+        "appends_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+        "forked_chains": len(_forked_chains(session_local, user_ids)),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chain appends.")
+    parser.add_argument("--database-url", default=None, help="Default: a throwaway SQLite file")
+    parser.add_argument("--writers", default="1,2,4,8", help="Comma-separated writer counts")
+    parser.add_argument("--appends", type=int, default=100, help="Appends per writer")
+    parser.add_argument("--scenario", choices=["one-user", "many-users", "both"], default="both")
+    parser.add_argument("--group-commit", action="store_true", help="Append through a GroupCommitter")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    writer_counts = [int(w) for w in args.writers.split(",")]
+    scenarios = ["one-user", "many-users"] if args.scenario == "both" else [args.scenario]
+
+    tmp_dir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    engine = _make_engine(database_url, pool_size=max(writer_counts) + 1)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+
+    results = []
+    for scenario in scenarios:
+        for writers in writer_counts:
+            result = run_scenario(session_local, scenario, writers, args.appends, args.group_commit)
+            results.append(result)
+            if not args.json:
+                print(
+                    f"{result['scenario']:<11} writers={result['writers']:<3} "
+                    f"appends/sec={result['appends_per_sec']:>10,.1f} "
+                    f"gave_up={result['gave_up']} forked={result['forked_chains']}"
+                )
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    engine.dispose()
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    return 1 if any(r["forked_chains"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
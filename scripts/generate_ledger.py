@@ -0,0 +1,393 @@
+# scripts/generate_ledger.py
+"""
+Deterministic synthetic ledger for scale testing.
+
+Generates users with a heavy-tailed chain length distribution (most chains
+are short, a few are very long), blocks hash-linked exactly like
+create_block/new_genesis_block produce them (transaction blocks carry their
+Merkle root), the Transaction rows behind every block, and KYC rows for a
+share of users, some deliberately sharing an NIK.
+
+Users are generated in shards on a process pool (hashing is the expensive
+part). Each shard numbers its blocks/transactions from zero; the loader
+shifts them onto the next free ids, so every shard loads with COPY
+(Postgres) or a driver-level executemany in one transaction, without round
+trips.
+
+    python -m scripts.generate_ledger --users 1000000 --seed 7 --workers 8
+    python -m scripts.generate_ledger --database-url sqlite:///ledger.db --users 10000 --tamper 25
+
+The same seed and shard size on an empty database produce the same rows.
+Key material is random hex of the right shape, not real secp256k1 keys, and
+every user shares one password (--password). --tamper N corrupts the data of N blocks
+after hashing and prints their (user_id, block_id) as JSON lines, so
+validators and audit_ledger can be checked against a known answer.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from mnemonic import Mnemonic
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Connection
+
+from app.config import DATABASE_URL
+from app.core.blockchain_utils import (
+    block_raw_string,
+    compute_block_hash,
+    genesis_block_hash,
+    merkle_root,
+    transaction_leaf_hash
+)
+from app.core.crypto_utils import derive_wallet_address
+from app.core.identity import identity_hashes
+from app.core.state_tree import apply_heads
+from app.core.security import hash_password
+from app.models.block import Block
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.user_kyc import UserKyc
+from app.routers.transaction import TransactionRequest, batch_block_data, transaction_block_data
+from scripts.import_users import bulk_insert
+
+USER_COLUMNS = (
+    "id", "email", "password_hash", "bip39_mnemonic", "private_key_hex", "public_key_hex", "wallet_address",
+    "head_block_id", "head_block_hash",
+)
+BLOCK_COLUMNS = ("id", "user_id", "block_hash", "prev_hash", "timestamp", "data", "merkle_root")
+TRANSACTION_COLUMNS = ("id", "block_id", "user_id", "tx_type", "tx_details", "timestamp")
+KYC_COLUMNS = ("id", "user_id", "phone", "nik", "npwp", "sex", "marital_status", "birth_info", "nik_hash", "npwp_hash")
+
+TX_TYPES = ("TRANSFER", "TRANSFER", "TRANSFER", "MINT", "BURN", "STAKE")
+CITIES = ("Jakarta", "Bandung", "Surabaya", "Medan", "Semarang", "Makassar", "Denpasar", "Yogyakarta")
+_WORDLIST = Mnemonic("english").wordlist
+
+
+@dataclass
+class LedgerBatch:
+    users: list[dict] = field(default_factory=list)
+    blocks: list[dict] = field(default_factory=list)
+    transactions: list[dict] = field(default_factory=list)
+    kyc: list[dict] = field(default_factory=list)
+    tampered: list[tuple[int, int]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.users) + len(self.blocks) + len(self.transactions) + len(self.kyc)
+
+    def shift(self, block_base: int, transaction_base: int, kyc_base: int) -> None:
+        """
+        Move a shard's zero-based block/transaction/KYC ids onto real ones.
+        """
+        for user in self.users:
+            user["head_block_id"] += block_base
+        for block in self.blocks:
+            block["id"] += block_base
+        for tx in self.transactions:
+            tx["id"] += transaction_base
+            tx["block_id"] += block_base
+        for kyc in self.kyc:
+            kyc["id"] += kyc_base
+        self.tampered = [(user_id, block_id + block_base) for user_id, block_id in self.tampered]
+
+
+@dataclass
+class NextIds:
+    user: int = 1
+    block: int = 1
+    transaction: int = 1
+    kyc: int = 1
+
+
+class LedgerGenerator:
+    """
+    Produces one user at a time (user row, full chain, transactions, KYC) from a
+    seeded RNG. Chain lengths follow a log-normal distribution clipped to
+    [1, max_chain]; the defaults give a median around 7 blocks and a long tail.
+    """
+
+    def __init__(
+        self,
+        seed: int | str = 0,
+        ids: NextIds | None = None,
+        password_hash: str = "",
+        email_domain: str = "ledger.test",
+        max_chain: int = 100_000,
+        chain_mu: float = 2.0,
+        chain_sigma: float = 1.2,
+        batch_tx_ratio: float = 0.1,
+        kyc_ratio: float = 0.6,
+        duplicate_nik_ratio: float = 0.001,
+        base_time: datetime = datetime(2025, 1, 1),
+    ):
+        self.rng = random.Random(seed)
+        self.ids = ids or NextIds()
+        self.password_hash = password_hash
+        self.email_domain = email_domain
+        self.max_chain = max_chain
+        self.chain_mu = chain_mu
+        self.chain_sigma = chain_sigma
+        self.batch_tx_ratio = batch_tx_ratio
+        self.kyc_ratio = kyc_ratio
+        self.duplicate_nik_ratio = duplicate_nik_ratio
+        self.base_time = base_time
+        self._recent_niks: list[str] = []
+
+    def chain_length(self) -> int:
+        return max(1, min(self.max_chain, int(self.rng.lognormvariate(self.chain_mu, self.chain_sigma))))
+
+    def _hex(self, nbytes: int) -> str:
+        return self.rng.getrandbits(nbytes * 8).to_bytes(nbytes, "big").hex()
+
+    def add_user(self, batch: LedgerBatch, chain_length: int | None = None, tamper: bool = False) -> dict:
+        rng = self.rng
+        user_id = self.ids.user
+        self.ids.user += 1
+        length = chain_length or self.chain_length()
+        if tamper:
+            # A tampered chain needs a block past genesis to alter
+            length = max(2, length)
+
+        timestamp = self.base_time + timedelta(seconds=rng.randrange(365 * 86400), microseconds=rng.randrange(10**6))
+        prev_hash = genesis_block_hash(user_id, timestamp)
+        first_block = len(batch.blocks)
+        batch.blocks.append({
+            "id": self.ids.block, "user_id": user_id, "block_hash": prev_hash, "prev_hash": "GENESIS",
+            "timestamp": timestamp, "data": "User genesis block", "merkle_root": None,
+        })
+        self.ids.block += 1
+
+        for _ in range(length - 1):
+            block_id = self.ids.block
+            self.ids.block += 1
+            timestamp += timedelta(seconds=rng.randrange(1, 3600), microseconds=rng.randrange(10**6))
+            tx_count = rng.randint(2, 10) if rng.random() < self.batch_tx_ratio else 1
+            txs = [(rng.choice(TX_TYPES), f"amount={rng.randrange(1, 10**6)};ref={self._hex(4)}") for _ in range(tx_count)]
+            if tx_count == 1:
+                data = transaction_block_data(*txs[0])
+            else:
+                data = batch_block_data([TransactionRequest.model_construct(tx_type=t, tx_details=d) for t, d in txs])
+            root = merkle_root([transaction_leaf_hash(user_id, t, d) for t, d in txs])
+            block_hash = compute_block_hash(block_raw_string(user_id, timestamp, prev_hash, data, root))
+            batch.blocks.append({
+                "id": block_id, "user_id": user_id, "block_hash": block_hash, "prev_hash": prev_hash,
+                "timestamp": timestamp, "data": data, "merkle_root": root,
+            })
+            for tx_type, tx_details in txs:
+                batch.transactions.append({
+                    "id": self.ids.transaction, "block_id": block_id, "user_id": user_id,
+                    "tx_type": tx_type, "tx_details": tx_details, "timestamp": timestamp,
+                })
+                self.ids.transaction += 1
+            prev_hash = block_hash
+
+        if tamper:
+            # Changed after hashing, so the stored hash no longer matches
+            victim = batch.blocks[rng.randrange(first_block + 1, len(batch.blocks))]
+            victim["data"] = f"{victim['data']} (tampered)"
+            batch.tampered.append((user_id, victim["id"]))
+
+        public_key_hex = self._hex(64)
+        user = {
+            "id": user_id,
+            "email": f"user{user_id}@{self.email_domain}",
+            "password_hash": self.password_hash,
+            "bip39_mnemonic": " ".join(rng.choice(_WORDLIST) for _ in range(12)),
+            "private_key_hex": self._hex(32),
+            "public_key_hex": public_key_hex,
+            "wallet_address": derive_wallet_address(public_key_hex),
+            "head_block_id": batch.blocks[-1]["id"],
+            "head_block_hash": prev_hash,
+        }
+        batch.users.append(user)
+
+        if rng.random() < self.kyc_ratio:
+            batch.kyc.append(self._kyc_row(user_id))
+        return user
+
+    def _kyc_row(self, user_id: int) -> dict:
+        rng = self.rng
+        if self._recent_niks and rng.random() < self.duplicate_nik_ratio:
+            nik = rng.choice(self._recent_niks)
+        else:
+            nik = f"{rng.randrange(11, 95)}{rng.randrange(10**13, 10**14)}"
+            self._recent_niks = (self._recent_niks + [nik])[-1000:]
+        digits = f"{rng.randrange(10**14, 10**15)}"
+        npwp = f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}.{digits[8]}-{digits[9:12]}.{digits[12:15]}"
+        row = {
+            "id": self.ids.kyc,
+            "user_id": user_id,
+            "phone": f"08{rng.randrange(10**9, 10**10)}",
+            "nik": nik,
+            "npwp": npwp,
+            "sex": rng.choice(("M", "F")),
+            "marital_status": rng.choice(("single", "married", "divorced")),
+            "birth_info": f"{rng.choice(CITIES)}, {rng.randrange(1960, 2005)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            **identity_hashes(nik, npwp),
+        }
+        self.ids.kyc += 1
+        return row
+
+
+def generate_shard(
+    seed: int,
+    shard: int,
+    first_user_id: int,
+    users: int,
+    tamper: frozenset[int],
+    password_hash: str,
+    options: dict,
+) -> LedgerBatch:
+    """
+    Users first_user_id .. first_user_id + users - 1 with zero-based block,
+    transaction and KYC ids; tamper holds user offsets within the shard.
+    """
+    generator = LedgerGenerator(
+        f"{seed}:{shard}", NextIds(first_user_id, 0, 0, 0), password_hash, **options
+    )
+    batch = LedgerBatch()
+    for n in range(users):
+        generator.add_user(batch, tamper=n in tamper)
+    return batch
+
+
+def next_ids(conn: Connection) -> NextIds:
+    def after_max(column) -> int:
+        return (conn.scalar(select(func.max(column))) or 0) + 1
+
+    return NextIds(after_max(User.id), after_max(Block.id), after_max(Transaction.id), after_max(UserKyc.id))
+
+
+def load_batch(conn: Connection, batch: LedgerBatch) -> None:
+    # Foreign key order
+    bulk_insert(conn, User, USER_COLUMNS, batch.users)
+    if batch.kyc:
+        bulk_insert(conn, UserKyc, KYC_COLUMNS, batch.kyc)
+    bulk_insert(conn, Block, BLOCK_COLUMNS, batch.blocks)
+    if batch.transactions:
+        bulk_insert(conn, Transaction, TRANSACTION_COLUMNS, batch.transactions)
+    apply_heads(conn, {user["id"]: (user["head_block_id"], user["head_block_hash"]) for user in batch.users})
+
+
+def sync_sequences(conn: Connection) -> None:
+    # Explicit ids bypass the serial sequences; move them past the loaded rows
+    if conn.dialect.name != "postgresql":
+        return
+    for table in ("users", "users_kyc", "blocks", "transactions"):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def generate_ledger(
+    database_url: str = DATABASE_URL,
+    users: int = 1000,
+    seed: int = 0,
+    shard_users: int = 2000,
+    workers: int | None = None,
+    tamper: int = 0,
+    password: str = "LedgerPass123",
+    out=sys.stdout,
+    progress_every: float = 5.0,
+    **generator_options,
+) -> dict:
+    workers = workers or os.cpu_count() or 1
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        ids = next_ids(conn)
+    password_hash = hash_password(password)
+    # Which users get a tampered block is part of the seeded output too
+    tamper_at = sorted(random.Random(seed).sample(range(users), min(tamper, users)))
+
+    totals = {"users": 0, "blocks": 0, "transactions": 0, "kyc": 0}
+    started = last_report = time.perf_counter()
+
+    def report(prefix: str) -> None:
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        print(
+            f"{prefix} users={totals['users']} blocks={totals['blocks']} transactions={totals['transactions']} "
+            f"kyc={totals['kyc']} rows/sec={rows / elapsed if elapsed else 0.0:,.0f}",
+            file=sys.stderr,
+        )
+
+    def load(future) -> None:
+        batch = future.result()
+        batch.shift(ids.block, ids.transaction, ids.kyc)
+        with engine.begin() as conn:
+            load_batch(conn, batch)
+        ids.block += len(batch.blocks)
+        ids.transaction += len(batch.transactions)
+        ids.kyc += len(batch.kyc)
+        for key, rows in (("users", batch.users), ("blocks", batch.blocks),
+                          ("transactions", batch.transactions), ("kyc", batch.kyc)):
+            totals[key] += len(rows)
+        for user_id, block_id in batch.tampered:
+            print(json.dumps({"user_id": user_id, "block_id": block_id}), file=out)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Shards load in order, so ids come out the same on every run
+        in_flight = deque()
+        for shard, start in enumerate(range(0, users, shard_users)):
+            count = min(shard_users, users - start)
+            shard_tamper = frozenset(n - start for n in tamper_at if start <= n < start + count)
+            in_flight.append(pool.submit(
+                generate_shard, seed, shard, ids.user + start, count, shard_tamper, password_hash, generator_options
+            ))
+            if len(in_flight) >= workers * 2:
+                load(in_flight.popleft())
+            if time.perf_counter() - last_report >= progress_every:
+                report("progress")
+                last_report = time.perf_counter()
+        while in_flight:
+            load(in_flight.popleft())
+
+    with engine.begin() as conn:
+        sync_sequences(conn)
+    engine.dispose()
+    report("done")
+    return {**totals, "seconds": time.perf_counter() - started}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic ledger.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-users", type=int, default=2000, help="Users per worker task and load transaction")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-chain", type=int, default=100_000, help="Longest chain generated")
+    parser.add_argument("--chain-mu", type=float, default=2.0, help="Log-normal mu of chain length")
+    parser.add_argument("--chain-sigma", type=float, default=1.2, help="Log-normal sigma of chain length")
+    parser.add_argument("--kyc-ratio", type=float, default=0.6, help="Share of users with a KYC row")
+    parser.add_argument("--duplicate-nik-ratio", type=float, default=0.001, help="Share of KYC rows reusing an NIK")
+    parser.add_argument("--tamper", type=int, default=0, help="Blocks to corrupt after hashing")
+    parser.add_argument("--password", default="LedgerPass123", help="Password of every generated user")
+    args = parser.parse_args(argv)
+
+    generate_ledger(
+        database_url=args.database_url,
+        users=args.users,
+        seed=args.seed,
+        shard_users=args.shard_users,
+        workers=args.workers,
+        tamper=args.tamper,
+        password=args.password,
+        max_chain=args.max_chain,
+        chain_mu=args.chain_mu,
+        chain_sigma=args.chain_sigma,
+        kyc_ratio=args.kyc_ratio,
+        duplicate_nik_ratio=args.duplicate_nik_ratio,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
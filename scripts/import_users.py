@@ -0,0 +1,280 @@
+# scripts/import_users.py
+"""
+Bulk user onboarding.
+
+Reads users from CSV (header with email,password columns) or JSONL (one
+{"email": ..., "password": ...} object per line). bcrypt and key generation
+run across a process pool; users and their genesis blocks are bulk-inserted
+one batch per transaction (COPY on Postgres, executemany elsewhere), then the
+chain head pointers are set with a single UPDATE per batch and the batch's
+heads enter the state tree in one update.
+
+    python -m scripts.import_users partners.csv --workers 8 --cursor-file import.cursor
+    python -m scripts.import_users partners.jsonl --batch-size 5000
+
+The cursor file holds how many input rows are committed, so an interrupted
+run picks up where it stopped. Emails that already exist are skipped, so
+re-importing a batch is harmless.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, NamedTuple
+
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.engine import Connection
+
+from app.config import BCRYPT_ROUNDS, DATABASE_URL
+from app.core.blockchain_utils import new_genesis_block
+from app.core.key_pool import generate_key_material
+from app.core.state_tree import apply_heads
+from app.models.block import Block
+from app.models.user import User
+
+# Set in each worker by _init_worker
+_pwd_context = None
+
+USER_COLUMNS = ("email", "password_hash", "bip39_mnemonic", "private_key_hex", "public_key_hex", "wallet_address")
+BLOCK_COLUMNS = ("user_id", "block_hash", "prev_hash", "timestamp", "data")
+
+
+class ImportSummary(NamedTuple):
+    imported: int
+    skipped: int
+    rejected: int
+    rows_done: int
+    elapsed: float
+
+
+def _init_worker(bcrypt_rounds: int) -> None:
+    global _pwd_context
+    _pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=bcrypt_rounds)
+
+
+def prepare_users(rows: list[tuple[str, str]]) -> list[dict]:
+    """
+    The CPU-heavy part of signup for a batch of (email, password) rows.
+    """
+    users = []
+    for email, password in rows:
+        keys = generate_key_material()
+        users.append({
+            "email": email,
+            "password_hash": _pwd_context.hash(password),
+            "bip39_mnemonic": keys.mnemonic,
+            "private_key_hex": keys.private_key_hex,
+            "public_key_hex": keys.public_key_hex,
+            "wallet_address": keys.wallet_address,
+        })
+    return users
+
+
+def read_users(path: str, fmt: str | None = None) -> Iterator[tuple[str, str] | None]:
+    """
+    Yield (email, password) per input row, or None for a row missing either.
+    """
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for record in records:
+            email = (record.get("email") or "").strip()
+            password = record.get("password") or ""
+            yield (email, password) if email and password else None
+
+
+def copy_rows(conn: Connection, table: str, columns: tuple[str, ...], rows: list[dict]) -> None:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row[c] for c in columns])
+    buf.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(conn: Connection, model, columns: tuple[str, ...], rows: list[dict]) -> None:
+    if conn.dialect.name == "postgresql":
+        copy_rows(conn, model.__tablename__, columns, rows)
+        return
+    # Straight to the driver's executemany, skipping Core's per-row parameter
+    # handling; column types still convert their values (DateTime on SQLite)
+    table = model.__table__
+    compiled = insert(table).compile(dialect=conn.dialect, column_keys=list(columns))
+    order = compiled.positiontup or list(columns)
+    processors = [table.c[c].type.bind_processor(conn.dialect) for c in order]
+    params = [
+        tuple(row[c] if proc is None or row[c] is None else proc(row[c]) for c, proc in zip(order, processors))
+        for row in rows
+    ]
+    conn.exec_driver_sql(str(compiled), params)
+
+
+def insert_users(conn: Connection, users: list[dict]) -> tuple[int, int]:
+    """
+    Insert one prepared batch with genesis blocks and chain heads; returns
+    (imported, skipped). Runs inside the caller's transaction.
+    """
+    emails = [u["email"] for u in users]
+    existing = set(conn.scalars(select(User.email).where(User.email.in_(emails))))
+    seen = set(existing)
+    fresh = []
+    for user in users:
+        if user["email"] not in seen:
+            seen.add(user["email"])
+            fresh.append(user)
+    if not fresh:
+        return 0, len(users)
+
+    bulk_insert(conn, User, USER_COLUMNS, fresh)
+    user_ids = list(conn.scalars(select(User.id).where(User.email.in_([u["email"] for u in fresh]))))
+
+    blocks = []
+    for user_id in user_ids:
+        block = new_genesis_block(user_id)
+        blocks.append({c: getattr(block, c) for c in BLOCK_COLUMNS})
+    bulk_insert(conn, Block, BLOCK_COLUMNS, blocks)
+
+    genesis = select(Block.id, Block.block_hash).where(Block.user_id == User.id, Block.prev_hash == "GENESIS")
+    conn.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(
+            head_block_id=genesis.with_only_columns(Block.id).scalar_subquery(),
+            head_block_hash=genesis.with_only_columns(Block.block_hash).scalar_subquery(),
+        )
+    )
+    apply_heads(conn, {
+        row.id: (row.head_block_id, row.head_block_hash)
+        for row in conn.execute(select(User.id, User.head_block_id, User.head_block_hash).where(User.id.in_(user_ids)))
+    })
+    return len(fresh), len(users) - len(fresh)
+
+
+def _read_cursor(cursor_file: str | None) -> int:
+    if not cursor_file or not os.path.exists(cursor_file):
+        return 0
+    with open(cursor_file) as f:
+        value = f.read().strip()
+    return int(value) if value else 0
+
+
+def _write_cursor(cursor_file: str | None, rows_done: int) -> None:
+    if not cursor_file:
+        return
+    tmp_path = f"{cursor_file}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(rows_done))
+    os.replace(tmp_path, cursor_file)
+
+
+def run_import(
+    path: str,
+    database_url: str = DATABASE_URL,
+    fmt: str | None = None,
+    workers: int | None = None,
+    batch_size: int = 1000,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    cursor_file: str | None = None,
+    out=sys.stdout,
+    progress_every: float = 5.0,
+) -> ImportSummary:
+    workers = workers or os.cpu_count() or 1
+    rows_done = start = _read_cursor(cursor_file)
+
+    engine = create_engine(database_url, pool_size=1, max_overflow=0)
+    imported = skipped = rejected = 0
+    started = last_report = time.perf_counter()
+
+    def report(prefix: str) -> None:
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0.0
+        print(
+            f"{prefix} imported={imported} skipped={skipped} rejected={rejected} "
+            f"rows/sec={rate:,.0f} cursor={rows_done}",
+            file=sys.stderr,
+        )
+
+    def consume(batch) -> None:
+        nonlocal imported, skipped, rows_done
+        future, batch_rows = batch
+        users = future.result()
+        if users:
+            with engine.begin() as conn:
+                added, dupes = insert_users(conn, users)
+            imported += added
+            skipped += dupes
+        rows_done += batch_rows
+        _write_cursor(cursor_file, rows_done)
+
+    rows = islice(read_users(path, fmt), start, None)
+    line_no = start
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bcrypt_rounds,)) as pool:
+        # Batches are inserted in submission order so the cursor only moves past
+        # rows that are committed (and every row before them)
+        in_flight = deque()
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            valid = []
+            for row in chunk:
+                line_no += 1
+                if row is None:
+                    rejected += 1
+                    print(f"row={line_no} rejected: missing email or password", file=out)
+                else:
+                    valid.append(row)
+            in_flight.append((pool.submit(prepare_users, valid), len(chunk)))
+            if len(in_flight) >= workers * 2:
+                consume(in_flight.popleft())
+            if time.perf_counter() - last_report >= progress_every:
+                report("progress")
+                last_report = time.perf_counter()
+        while in_flight:
+            consume(in_flight.popleft())
+
+    engine.dispose()
+    report("done")
+    return ImportSummary(imported, skipped, rejected, rows_done, time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import users with genesis blocks.")
+    parser.add_argument("path", help="CSV (email,password header) or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="Default: from the file extension")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Users per insert transaction")
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--cursor-file", default=None, help="Read/write the resume cursor here")
+    args = parser.parse_args(argv)
+
+    summary = run_import(
+        args.path,
+        database_url=args.database_url,
+        fmt=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        bcrypt_rounds=args.bcrypt_rounds,
+        cursor_file=args.cursor_file,
+    )
+    return 1 if summary.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# scripts/purge_idempotency_keys.py
+"""
+Expired Idempotency-Key purge.
+
+Deletes every idempotency_keys row older than IDEMPOTENCY_KEY_TTL_SECONDS,
+oldest first, one batch per transaction, so the table stays the size of one
+TTL window. Run it from cron; appends never delete keys themselves.
+
+    python -m scripts.purge_idempotency_keys --batch-size 5000
+"""
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import DATABASE_URL, IDEMPOTENCY_PURGE_BATCH
+from app.core.idempotency import purge_expired_keys
+
+
+def run_purge(database_url: str = DATABASE_URL, batch_size: int = IDEMPOTENCY_PURGE_BATCH, out=sys.stderr) -> int:
+    engine = create_engine(database_url)
+    started = time.perf_counter()
+    with sessionmaker(bind=engine)() as db:
+        purged = purge_expired_keys(db, batch_size)
+    engine.dispose()
+    print(f"done purged_keys={purged} seconds={time.perf_counter() - started:.1f}", file=out)
+    return purged
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Delete expired Idempotency-Key rows.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--batch-size", type=int, default=IDEMPOTENCY_PURGE_BATCH, help="Keys deleted per transaction")
+    args = parser.parse_args(argv)
+
+    run_purge(database_url=args.database_url, batch_size=args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
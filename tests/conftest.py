@@ -1,8 +1,11 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from app.database import Base
+from app.core.idempotency import idempotency_cache
+from app.core.user_cache import user_cache
+from app.database import Base, get_db
 from app.main import app
 from fastapi.testclient import TestClient
 
@@ -11,12 +14,26 @@ TEST_DATABASE_URL = "sqlite:///:memory:"
 
 @pytest.fixture(scope="session")
 def db_engine():
-    engine = create_engine(TEST_DATABASE_URL, echo=False)
+    # One shared connection so the app's threadpool sees the same in-memory DB
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Base.metadata.create_all(engine)
     yield engine
     engine.dispose()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Tests build several databases; never let an email or key resolve across them
+    user_cache.clear()
+    idempotency_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db_session(db_engine):
     session_local = sessionmaker(bind=db_engine)
@@ -26,6 +43,17 @@ def db_session(db_engine):
 
 
 @pytest.fixture(scope="module")
-def test_client():
+def test_client(db_engine):
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
     client = TestClient(app)
     yield client
+    app.dependency_overrides.clear()
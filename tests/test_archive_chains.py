@@ -0,0 +1,143 @@
+import io
+import os
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import ARCHIVE_DIR
+from app.core import archive
+from app.core.blockchain_utils import (
+    ChainConflictError,
+    append_block,
+    create_genesis_block,
+    iter_chain_rows,
+    validate_user_chain
+)
+from app.database import Base
+from app.models.archive_segment import ArchiveSegment
+from app.models.block import Block
+from app.models.user import User
+from scripts import archive_chains
+from scripts.archive_chains import run_archive
+
+
+def _chains(db, lengths: list[int]) -> list[int]:
+    user_ids = []
+    for n, length in enumerate(lengths):
+        user = User(email=f"archive{n}@example.com", password_hash="x", bip39_mnemonic="x")
+        db.add(user)
+        db.flush()
+        create_genesis_block(db, user)
+        for i in range(length - 1):
+            append_block(db, user, f"Block {i}")
+        user_ids.append(user.id)
+    return user_ids
+
+
+def test_archived_chains_read_and_validate_like_live(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    database_url = f"sqlite:///{tmp_path / 'ledger.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+
+    with session_local() as db:
+        long_id, short_id = _chains(db, [25, 3])
+        # Checkpoints the head, which gets archived
+        assert validate_user_chain(db, long_id)
+        old_head = db.get(User, long_id).head_block_hash
+        before = [tuple(row) for row in iter_chain_rows(db, long_id)]
+        live_before = db.scalar(select(func.count()).select_from(Block))
+
+    # First pass archives the long chain only; its rows stay live for the grace period
+    summary = run_archive(database_url, min_blocks=10, segment_blocks=7, grace_seconds=3600, out=io.StringIO())
+    assert (summary.users, summary.blocks, summary.purged_segments) == (1, 25, 0)
+    with session_local() as db:
+        assert db.scalar(select(func.count()).select_from(Block)) == live_before + 1
+        snapshot = db.scalar(select(Block).where(Block.user_id == long_id).order_by(Block.id.desc()).limit(1))
+        assert snapshot.prev_hash == old_head
+        assert old_head in snapshot.data
+        segments = db.scalars(select(ArchiveSegment).order_by(ArchiveSegment.last_block_id)).all()
+        assert [s.block_count for s in segments] == [7, 7, 7, 4]
+        assert {s.snapshot_block_id for s in segments} == {snapshot.id}
+
+    summary = run_archive(database_url, grace_seconds=0, purge_only=True, out=io.StringIO())
+    assert summary.purged_segments == 4
+    with session_local() as db:
+        assert db.scalar(select(func.count()).select_from(Block)) == live_before + 1 - 25
+        rows = [tuple(row) for row in iter_chain_rows(db, long_id)]
+        assert rows[:-1] == before
+        assert rows[-1][0] == snapshot.id
+        # Keyset pages cross the archive/live boundary without gaps or repeats
+        paged, after_id = [], None
+        while page := [tuple(row) for row in iter_chain_rows(db, long_id, after_id, limit=4)]:
+            paged.extend(page)
+            after_id = page[-1][0]
+        assert paged == rows
+        assert [tuple(row) for row in iter_chain_rows(db, long_id, before[5][0], limit=3)] == before[6:9]
+
+        # The checkpointed block now only exists in the archive
+        assert validate_user_chain(db, long_id)
+        assert validate_user_chain(db, long_id, full=True)
+        assert validate_user_chain(db, short_id, full=True)
+
+        # The chain keeps growing on top of the snapshot
+        append_block(db, db.get(User, long_id), "After archive")
+        assert validate_user_chain(db, long_id, full=True)
+
+    # Nothing new to archive: the snapshot and one append are below min_blocks
+    summary = run_archive(database_url, min_blocks=10, grace_seconds=0, out=io.StringIO())
+    assert (summary.users, summary.blocks) == (0, 0)
+    engine.dispose()
+
+
+def test_moved_head_writes_no_segment_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'moved.db'}")
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        (user_id,) = _chains(db, [12])
+
+    def conflicting_create_block(db, *args, **kwargs):
+        # Another writer appended after the job read the head
+        raise ChainConflictError("head moved")
+
+    monkeypatch.setattr(archive_chains, "create_block", conflicting_create_block)
+    writer = archive.SegmentWriter()
+    with session_local() as db:
+        assert archive_chains.archive_user_chain(db, writer, user_id, min_blocks=10) is None
+        assert db.scalar(select(func.count()).select_from(ArchiveSegment)) == 0
+    writer.close()
+    assert os.path.getsize(os.path.join(archive.ARCHIVE_DIR, writer.name)) == 0
+    engine.dispose()
+
+
+def test_archive_dir_is_absolute():
+    # The API and the archive job must resolve segments to the same files
+    assert os.path.isabs(ARCHIVE_DIR)
+
+
+def test_pages_decode_only_the_frames_they_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(archive, "ARCHIVE_FRAME_BLOCKS", 3)
+    database_url = f"sqlite:///{tmp_path / 'frames.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        (user_id,) = _chains(db, [30])
+        before = [tuple(row) for row in iter_chain_rows(db, user_id)]
+    run_archive(database_url, min_blocks=10, segment_blocks=30, grace_seconds=0, out=io.StringIO())
+
+    decoded = []
+    decode_frame = archive._decode_frame
+    monkeypatch.setattr(archive, "_decode_frame", lambda frame: decoded.append(frame) or decode_frame(frame))
+    with session_local() as db:
+        # One 30-block record of ten frames; blocks 14-17 sit in the fifth and sixth
+        assert [tuple(row) for row in iter_chain_rows(db, user_id, before[12][0], limit=4)] == before[13:17]
+        assert len(decoded) == 2
+        decoded.clear()
+        assert archive.archived_block_hash(db, user_id, before[20][0]) == before[20][-1]
+        assert len(decoded) == 1
+    engine.dispose()
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.blockchain_utils import verify_merkle_proof
+from app.core.state_tree import verify_state_proof
+from app.database import Base, get_async_db
+from app.routers import async_auth, async_blockchain, async_kyc, async_transaction
+
+
+@pytest.fixture(scope="module")
+def async_client(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("async") / "async.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_local() as db:
+            yield db
+
+    app = FastAPI()
+    for module in (async_auth, async_kyc, async_transaction, async_blockchain):
+        app.include_router(module.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+def test_async_signup_signin_and_kyc(async_client):
+    resp = async_client.post("/auth/signup", json={"email": "async@example.com", "password": "AsyncPass"})
+    assert resp.status_code == 200
+    assert len(resp.json()["bip39_mnemonic"].split()) == 12
+    assert async_client.post("/auth/signup", json={"email": "async@example.com", "password": "x"}).status_code == 400
+
+    assert async_client.post("/auth/signin", json={"email": "async@example.com", "password": "AsyncPass"}).status_code == 200
+    assert async_client.post("/auth/signin", json={"email": "async@example.com", "password": "nope"}).status_code == 401
+
+    resp = async_client.post("/kyc/update", json={"email": "async@example.com", "nik": "3201"})
+    assert resp.json()["message"] == "KYC created successfully"
+    resp = async_client.post("/kyc/update", json={"email": "async@example.com", "nik": "3202"})
+    assert resp.json()["message"] == "KYC updated successfully"
+    assert resp.json()["nik"] == "3202"
+
+    resp = async_client.post("/kyc/batch-upsert", json=[
+        {"email": "async@example.com", "nik": "3203"},
+        {"email": "ghost@example.com", "nik": "0"},
+    ])
+    assert (resp.json()["upserted"], resp.json()["not_found"]) == (1, ["ghost@example.com"])
+    resp = async_client.post("/kyc/update", json={"email": "async@example.com", "nik": "3204"})
+    assert resp.json()["message"] == "KYC updated successfully"
+
+
+def test_async_transactions_chain_and_proofs(async_client):
+    async_client.post("/auth/signup", json={"email": "asyncchain@example.com", "password": "AsyncPass"})
+    resp = async_client.post("/transaction/create", json={
+        "email": "asyncchain@example.com", "tx_type": "TRANSFER", "tx_details": "one"
+    }, headers={"Idempotency-Key": "async-1"})
+    assert resp.status_code == 200
+    # A retry with the same key is answered without a second block
+    retry = async_client.post("/transaction/create", json={
+        "email": "asyncchain@example.com", "tx_type": "TRANSFER", "tx_details": "one"
+    }, headers={"Idempotency-Key": "async-1"})
+    assert retry.json() == resp.json()
+
+    resp = async_client.post("/transaction/batch", json=[
+        {"email": "asyncchain@example.com", "tx_type": "TRANSFER", "tx_details": f"batch {i}"} for i in range(3)
+    ])
+    assert resp.status_code == 200
+    proof = async_client.get(f"/blockchain/tx-proof/{resp.json()['transaction_ids'][2]}").json()
+    assert verify_merkle_proof(proof["leaf_hash"], proof["proof"], proof["merkle_root"])
+
+    resp = async_client.get("/blockchain/validate-chain/asyncchain@example.com", params={"full": True})
+    assert resp.json()["chain_valid"] is True
+
+    state = async_client.get("/blockchain/state-proof/asyncchain@example.com").json()
+    assert state["root"] == async_client.get("/blockchain/state-root").json()["root"]
+    assert verify_state_proof(state["user_id"], state["head_block_hash"], state["siblings"], state["root"])
+
+    chain = async_client.get("/blockchain/user-chain/asyncchain@example.com").json()
+    assert len(chain) == 3
+    page = async_client.get("/blockchain/user-chain/asyncchain@example.com", params={"limit": 2})
+    assert page.headers["X-Next-Cursor"] == str(chain[1]["id"])
+    streamed = async_client.get("/blockchain/user-chain/asyncchain@example.com", params={"format": "ndjson"})
+    assert [json.loads(line) for line in streamed.text.splitlines()] == chain
+
+
+def test_async_idempotency_replay_skips_validation(async_client, monkeypatch):
+    async_client.post("/auth/signup", json={"email": "asyncreplay@example.com", "password": "AsyncPass"})
+    body = {"email": "asyncreplay@example.com", "tx_type": "TRANSFER", "tx_details": "once"}
+    resp = async_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "async-replay"})
+    assert resp.status_code == 200
+
+    async def failing_validation(*args, **kwargs):
+        return False
+
+    # Like the sync route, a retry of a request that succeeded is answered from its key
+    monkeypatch.setattr(async_transaction, "validate_new_transaction", failing_validation)
+    retry = async_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "async-replay"})
+    assert retry.json() == resp.json()
+    fresh = async_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "async-fresh"})
+    assert fresh.status_code == 400
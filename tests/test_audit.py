@@ -0,0 +1,50 @@
+import io
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import create_block
+from app.database import Base
+from app.models.block import Block
+from app.models.user import User
+from scripts.audit_ledger import run_audit
+
+
+def _seed_ledger(database_url, chains):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        for i, length in enumerate(chains):
+            user = User(email=f"audit{i}@example.com", password_hash="x", bip39_mnemonic="words")
+            db.add(user)
+            db.commit()
+            prev_hash = "GENESIS"
+            for n in range(length):
+                prev_hash = create_block(db, user.id, prev_hash, f"block {n}").block_hash
+    engine.dispose()
+
+
+def test_audit_reports_first_bad_block_and_resumes(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'ledger.db'}"
+    _seed_ledger(database_url, [3, 4, 2, 5])
+
+    engine = create_engine(database_url)
+    with sessionmaker(bind=engine)() as db:
+        user = db.query(User).filter(User.email == "audit1@example.com").first()
+        blocks = db.query(Block).filter(Block.user_id == user.id).order_by(Block.id.asc()).all()
+        blocks[2].data = "tampered"
+        db.commit()
+        bad_user_id, bad_block_id = user.id, blocks[2].id
+    engine.dispose()
+
+    cursor_file = str(tmp_path / "audit.cursor")
+    out = io.StringIO()
+    summary = run_audit(database_url, workers=2, chunk_size=1, cursor_file=cursor_file, out=out)
+    assert summary.users == 4
+    assert [(b.user_id, b.bad_block_id) for b in summary.broken] == [(bad_user_id, bad_block_id)]
+    assert f"first_bad_block={bad_block_id}" in out.getvalue()
+
+    # Everything is behind the cursor now, so a resumed run has nothing left to do
+    resumed = run_audit(database_url, workers=2, cursor_file=cursor_file, out=io.StringIO())
+    assert resumed.users == 0
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from app.core.security import PasswordHasher, PasswordHasherBusy, pwd_context
+from app.models.user import User
+
+
+def test_signup_and_signin(test_client):
+    resp = test_client.post("/auth/signup", json={"email": "authuser@example.com", "password": "AuthPass"})
+    assert resp.status_code == 200
+    assert len(resp.json()["bip39_mnemonic"].split()) == 12
+
+    resp = test_client.post("/auth/signin", json={"email": "authuser@example.com", "password": "AuthPass"})
+    assert resp.status_code == 200
+    resp = test_client.post("/auth/signin", json={"email": "authuser@example.com", "password": "Wrong"})
+    assert resp.status_code == 401
+
+
+def test_signin_rehashes_outdated_cost(test_client, db_session):
+    test_client.post("/auth/signup", json={"email": "rehash@example.com", "password": "RehashPass"})
+    user = db_session.query(User).filter(User.email == "rehash@example.com").first()
+
+    # Pretend the stored hash was made under an older, cheaper cost factor
+    cheap_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("RehashPass")
+    user.password_hash = cheap_hash
+    db_session.commit()
+
+    resp = test_client.post("/auth/signin", json={"email": "rehash@example.com", "password": "RehashPass"})
+    assert resp.status_code == 200
+
+    db_session.refresh(user)
+    assert user.password_hash != cheap_hash
+    assert not pwd_context.needs_update(user.password_hash)
+    assert pwd_context.verify("RehashPass", user.password_hash)
+
+
+def test_password_hasher_refuses_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+    blocked = hasher._submit(release.wait)
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("anything")
+    finally:
+        release.set()
+        blocked.result()
+    assert hasher.hash("anything")
+    hasher.shutdown()
+
+
+def test_auth_answers_503_when_hasher_is_busy(test_client, monkeypatch):
+    from app.routers import auth
+
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+    blocked = hasher._submit(release.wait)
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+    try:
+        resp = test_client.post("/auth/signup", json={"email": "busy@example.com", "password": "BusyPass"})
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        blocked.result()
+        hasher.shutdown()
+
+
+def test_auth_works_across_app_restarts(test_client):
+    from app.main import app
+
+    # Each `with` runs the lifespan, whose shutdown stops the hasher's pool
+    for n in range(2):
+        with TestClient(app) as client:
+            resp = client.post("/auth/signup", json={"email": f"restart{n}@example.com", "password": "RestartPass"})
+            assert resp.status_code == 200
+            resp = client.post("/auth/signin", json={"email": f"restart{n}@example.com", "password": "RestartPass"})
+            assert resp.status_code == 200
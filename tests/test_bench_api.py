@@ -0,0 +1,25 @@
+import asyncio
+
+from scripts.bench_api import run_benchmark
+
+
+def test_bench_api_reports_percentiles(tmp_path):
+    report = asyncio.run(run_benchmark(
+        f"sqlite:///{tmp_path / 'bench.db'}",
+        chains=[3, 20],
+        endpoints=["transaction_create", "validate_chain", "user_chain_page"],
+        requests=6,
+        concurrency=2,
+        users_per_chain=2,
+    ))
+
+    names = [r["endpoint"] for r in report["results"]]
+    assert names == [
+        "transaction_create",
+        "validate_chain_3", "user_chain_page_3",
+        "validate_chain_20", "user_chain_page_20",
+    ]
+    for result in report["results"]:
+        assert result["errors"] == 0
+        assert result["requests"] == 6
+        assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
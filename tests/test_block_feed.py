@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.core.block_feed import BlockFeedHub, block_feed, fetch_block_events, sse_events
+from app.models.block import Block
+from app.models.user import User
+
+
+def _block(block_id: int, user_id: int = 1) -> dict:
+    return {"id": block_id, "user_id": user_id, "transactions": []}
+
+
+def test_hub_fans_out_per_user_and_drops_slow_subscribers():
+    async def scenario():
+        hub = BlockFeedHub(queue_size=2)
+        everyone = hub.subscribe()
+        only_user_2 = hub.subscribe(user_id=2)
+
+        # Writers publish from request threads, not the loop
+        thread = threading.Thread(target=hub.publish, args=([_block(1), _block(2, user_id=2)],))
+        thread.start()
+        thread.join()
+        assert (await everyone.queue.get())["id"] == 1
+        assert (await everyone.queue.get())["id"] == 2
+        assert (await only_user_2.queue.get())["id"] == 2
+
+        hub.publish([_block(3), _block(4), _block(5)])
+        await asyncio.sleep(0)
+        # Three events do not fit a queue of two: dropped, with an end marker only
+        assert everyone.dropped and await everyone.queue.get() is None
+        assert not only_user_2.dropped
+        assert len(hub) == 1
+
+    asyncio.run(scenario())
+
+
+def test_committed_blocks_reach_the_feed(test_client):
+    async def scenario():
+        subscription = block_feed.subscribe()
+        try:
+            resp = await asyncio.to_thread(test_client.post, "/auth/signup", json={
+                "email": "feeduser@example.com", "password": "FeedPass"
+            })
+            assert resp.status_code == 200
+            await asyncio.to_thread(test_client.post, "/transaction/create", json={
+                "email": "feeduser@example.com", "tx_type": "TRANSFER", "tx_details": "Live"
+            })
+            genesis = await asyncio.wait_for(subscription.queue.get(), 5)
+            block = await asyncio.wait_for(subscription.queue.get(), 5)
+        finally:
+            block_feed.unsubscribe(subscription)
+        assert genesis["prev_hash"] == "GENESIS" and genesis["transactions"] == []
+        assert block["prev_hash"] == genesis["block_hash"]
+        assert [tx["tx_details"] for tx in block["transactions"]] == ["Live"]
+
+    asyncio.run(scenario())
+
+    # Unknown users have no feed
+    assert test_client.get("/blockchain/feed/nobody@example.com").status_code == 404
+
+
+def test_feed_resumes_from_last_event_id(test_client, db_engine):
+    test_client.post("/auth/signup", json={"email": "resume@example.com", "password": "ResumePass"})
+    for i in range(3):
+        test_client.post("/transaction/create", json={
+            "email": "resume@example.com", "tx_type": "TRANSFER", "tx_details": f"tx {i}"
+        })
+    with Session(bind=db_engine) as db:
+        user_id = db.query(User.id).filter(User.email == "resume@example.com").scalar()
+        block_ids = [b.id for b in db.query(Block).filter(Block.user_id == user_id).order_by(Block.id)]
+
+    async def fetch(after: int) -> list[dict]:
+        with Session(bind=db_engine) as db:
+            return fetch_block_events(db, user_id, after, limit=2)
+
+    async def scenario() -> list[str]:
+        hub = BlockFeedHub()
+        stream = sse_events(user_id, block_ids[0], fetch, hub=hub, batch_size=2, keepalive=0.05)
+        messages = [await anext(stream) for _ in range(3)]
+        # A live copy of a replayed block is skipped; a new block comes through
+        hub.publish([_block(block_ids[-1], user_id), _block(block_ids[-1] + 1000, user_id)])
+        messages.append(await anext(stream))
+        messages.append(await anext(stream))
+        await stream.aclose()
+        assert len(hub) == 0
+        return messages
+
+    messages = asyncio.run(scenario())
+    replayed = [json.loads(m.split("data: ", 1)[1]) for m in messages[:3]]
+    assert [b["id"] for b in replayed] == block_ids[1:]
+    assert [b["transactions"][0]["tx_details"] for b in replayed] == ["tx 0", "tx 1", "tx 2"]
+    assert messages[3].startswith(f"id: {block_ids[-1] + 1000}\n")
+    assert messages[4] == ": keepalive\n\n"
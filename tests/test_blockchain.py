@@ -0,0 +1,168 @@
+from app.core.blockchain_utils import (
+    create_block,
+    get_last_block_for_user,
+    iter_chain_rows,
+    validate_user_chain
+)
+from app.models.block import Block
+from app.models.chain_checkpoint import ChainCheckpoint
+from app.models.user import User
+
+
+def _signup_with_blocks(test_client, db_session, email, count):
+    resp = test_client.post("/auth/signup", json={"email": email, "password": "ChainPass"})
+    assert resp.status_code == 200
+    user = db_session.query(User).filter(User.email == email).first()
+    for i in range(count):
+        last_block = get_last_block_for_user(db_session, user.id)
+        create_block(db_session, user.id, last_block.block_hash, f"block {i}")
+    return user
+
+
+def test_validate_chain_moves_checkpoint(test_client, db_session):
+    user = _signup_with_blocks(test_client, db_session, "checkpoint@example.com", 3)
+
+    resp = test_client.get("/blockchain/validate-chain/checkpoint@example.com")
+    assert resp.status_code == 200
+    assert resp.json()["chain_valid"] is True
+
+    head = get_last_block_for_user(db_session, user.id)
+    checkpoint = db_session.get(ChainCheckpoint, user.id)
+    assert checkpoint.block_id == head.id
+    assert checkpoint.block_hash == head.block_hash
+
+    # New blocks after the checkpoint are verified and the checkpoint follows the head
+    create_block(db_session, user.id, head.block_hash, "after checkpoint")
+    resp = test_client.get("/blockchain/validate-chain/checkpoint@example.com")
+    assert resp.json()["chain_valid"] is True
+    db_session.refresh(checkpoint)
+    assert checkpoint.block_id == get_last_block_for_user(db_session, user.id).id
+
+
+def test_full_validation_catches_tampering_behind_checkpoint(test_client, db_session):
+    user = _signup_with_blocks(test_client, db_session, "tamper@example.com", 3)
+    assert test_client.get("/blockchain/validate-chain/tamper@example.com").json()["chain_valid"] is True
+
+    # Tamper with a block that is already behind the checkpoint
+    blocks = db_session.query(Block).filter(Block.user_id == user.id).order_by(Block.id.asc()).all()
+    blocks[1].data = "tampered"
+    db_session.commit()
+
+    assert test_client.get("/blockchain/validate-chain/tamper@example.com").json()["chain_valid"] is True
+    resp = test_client.get("/blockchain/validate-chain/tamper@example.com", params={"full": True})
+    assert resp.json()["chain_valid"] is False
+
+
+def test_streaming_validation_links_across_batches(test_client, db_session):
+    user = _signup_with_blocks(test_client, db_session, "stream@example.com", 6)
+
+    rows = list(iter_chain_rows(db_session, user.id, batch_size=2))
+    assert len(rows) == 7
+    assert not isinstance(rows[0], Block)
+    assert validate_user_chain(db_session, user.id, full=True, batch_size=2) is True
+
+    # Break the link on the first row of the second batch
+    rows_by_position = db_session.query(Block).filter(Block.user_id == user.id).order_by(Block.id.asc()).all()
+    rows_by_position[2].prev_hash = "not-the-previous-hash"
+    db_session.commit()
+    assert validate_user_chain(db_session, user.id, full=True, batch_size=2) is False
+
+
+def test_concurrent_appends_do_not_fork_the_chain(tmp_path):
+    import threading
+    from sqlalchemy import create_engine, func
+    from sqlalchemy.orm import sessionmaker
+    from app.core.blockchain_utils import append_block, create_genesis_block
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        user = User(email="race@example.com", password_hash="x", bip39_mnemonic="words")
+        db.add(user)
+        create_genesis_block(db, user)
+        user_id = user.id
+
+    def writer():
+        with session_local() as db:
+            for n in range(10):
+                append_block(db, db.get(User, user_id), f"append {n}", retries=50)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with session_local() as db:
+        assert db.query(func.count(Block.id)).filter(Block.user_id == user_id).scalar() == 41
+        prev_hashes = [b.prev_hash for b in db.query(Block).filter(Block.user_id == user_id)]
+        assert len(prev_hashes) == len(set(prev_hashes))
+        assert validate_user_chain(db, user_id, full=True) is True
+    engine.dispose()
+
+
+def test_merkle_proofs_for_every_leaf():
+    from app.core.blockchain_utils import (
+        merkle_proof,
+        merkle_root,
+        transaction_leaf_hash,
+        verify_merkle_proof
+    )
+
+    for size in range(1, 10):
+        leaves = [transaction_leaf_hash(1, "TRANSFER", f"tx {i}") for i in range(size)]
+        root = merkle_root(leaves)
+        for index, leaf in enumerate(leaves):
+            proof = merkle_proof(leaves, index)
+            assert len(proof) <= size.bit_length()
+            assert verify_merkle_proof(leaf, proof, root)
+        assert not verify_merkle_proof(transaction_leaf_hash(1, "TRANSFER", "forged"), merkle_proof(leaves, 0), root)
+
+
+def test_transaction_inclusion_proof_endpoint(test_client, db_session):
+    from app.core.blockchain_utils import verify_merkle_proof
+
+    test_client.post("/auth/signup", json={"email": "merkle@example.com", "password": "MerklePass"})
+    resp_batch = test_client.post("/transaction/batch", json=[
+        {"email": "merkle@example.com", "tx_type": "TRANSFER", "tx_details": f"Payout {i}"}
+        for i in range(7)
+    ])
+    transaction_ids = resp_batch.json()["transaction_ids"]
+
+    resp = test_client.get(f"/blockchain/tx-proof/{transaction_ids[4]}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert verify_merkle_proof(body["leaf_hash"], body["proof"], body["merkle_root"])
+
+    # The root is bound into the block hash, so the chain still validates
+    assert test_client.get("/blockchain/validate-chain/merkle@example.com", params={"full": True}).json()["chain_valid"]
+    assert test_client.get("/blockchain/tx-proof/999999").status_code == 404
+
+
+def test_user_chain_keyset_pages_and_ndjson(test_client, db_session):
+    import json
+
+    _signup_with_blocks(test_client, db_session, "pages@example.com", 4)
+    full_chain = test_client.get("/blockchain/user-chain/pages@example.com").json()
+    assert len(full_chain) == 5
+
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["after_id"] = cursor
+        resp = test_client.get("/blockchain/user-chain/pages@example.com", params=params)
+        assert resp.status_code == 200
+        pages.extend(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert [b["id"] for b in pages] == [b["id"] for b in full_chain]
+
+    resp = test_client.get("/blockchain/user-chain/pages@example.com", params={"format": "ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in resp.text.splitlines()]
+    assert streamed == full_chain
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.database import InstrumentedQueuePool, pool_status
+
+
+@pytest.fixture()
+def small_pool_engine(tmp_path):
+    from sqlalchemy import create_engine
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_status_tracks_checkouts_overflow_and_timeouts(small_pool_engine):
+    first = small_pool_engine.connect()
+    second = small_pool_engine.connect()
+    first.execute(text("SELECT 1"))
+
+    status = pool_status(small_pool_engine)
+    assert status["checked_out"] == 2
+    assert status["overflow"] == 1
+    assert status["overflow_events"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        small_pool_engine.connect()
+    first.close()
+    second.close()
+
+    status = pool_status(small_pool_engine)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 3
+    assert status["timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.05
+
+    # Counters survive the pool being recreated
+    small_pool_engine.dispose()
+    assert isinstance(small_pool_engine.pool, QueuePool)
+    assert pool_status(small_pool_engine)["timeouts"] == 1
+
+
+def test_db_pool_health_endpoint(test_client):
+    resp = test_client.get("/health/db-pool")
+    assert resp.status_code == 200
+    assert {"checked_out", "overflow", "wait_seconds_total", "overflow_events"} <= resp.json().keys()
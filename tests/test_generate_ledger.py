@@ -0,0 +1,51 @@
+import io
+import json
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import validate_user_chain
+from app.core.state_tree import rebuild_state_tree, state_root
+from app.database import Base
+from app.models.block import Block
+from app.models.transaction import Transaction
+from app.models.user import User
+from scripts.generate_ledger import generate_ledger
+
+
+def _ledger(tmp_path, name: str, seed: int) -> tuple:
+    database_url = f"sqlite:///{tmp_path / name}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    out = io.StringIO()
+    totals = generate_ledger(
+        database_url, users=40, seed=seed, shard_users=15, workers=2, tamper=3, out=out, max_chain=30
+    )
+    tampered = [json.loads(line) for line in out.getvalue().splitlines()]
+    return engine, totals, tampered
+
+
+def test_generated_ledger_is_valid_and_deterministic(tmp_path):
+    engine, totals, tampered = _ledger(tmp_path, "a.db", seed=7)
+    assert totals["users"] == 40
+    assert len(tampered) == 3
+    bad_users = {t["user_id"] for t in tampered}
+
+    with sessionmaker(bind=engine)() as db:
+        assert db.scalar(select(func.count(Block.id))) == totals["blocks"]
+        assert db.scalar(select(func.count(Transaction.id))) == totals["transactions"]
+        for user in db.scalars(select(User)):
+            assert user.head_block_hash == db.scalar(select(Block.block_hash).where(Block.id == user.head_block_id))
+            assert validate_user_chain(db, user.id, full=True) is (user.id not in bad_users)
+        rows = db.execute(select(Block.id, Block.block_hash).order_by(Block.id)).all()
+        # Shards feed the state tree as they load; a rebuild lands on the same root
+        root = state_root(db)
+        assert rebuild_state_tree(db) == root
+        db.rollback()
+
+    other, other_totals, other_tampered = _ledger(tmp_path, "b.db", seed=7)
+    with sessionmaker(bind=other)() as db:
+        assert db.execute(select(Block.id, Block.block_hash).order_by(Block.id)).all() == rows
+    assert (other_totals["blocks"], other_tampered) == (totals["blocks"], tampered)
+    engine.dispose()
+    other.dispose()
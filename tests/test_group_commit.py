@@ -0,0 +1,215 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import append_block, create_genesis_block, validate_user_chain
+from app.core.group_commit import GroupCommitter
+from app.database import Base, get_async_db
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.routers import async_transaction
+from app.routers.transaction import TransactionRequest, record_transaction, record_transaction_batch
+
+
+@pytest.fixture()
+def file_session_local(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'group.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _create_user(session_local, email):
+    with session_local() as db:
+        user = User(email=email, password_hash="x", bip39_mnemonic="words")
+        db.add(user)
+        create_genesis_block(db, user)
+        return user.id
+
+
+def test_group_commit_batches_concurrent_appends(file_session_local):
+    user_ids = [_create_user(file_session_local, f"group{i}@example.com") for i in range(2)]
+    committer = GroupCommitter(file_session_local, max_batch=32, max_delay=0.05)
+
+    commits = []
+    engine = file_session_local.kw["bind"]
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    results = []
+
+    def submit(user_id, n):
+        results.append(committer.submit(lambda db: record_transaction(db, user_id, "TRANSFER", f"tx {n}")))
+
+    threads = [threading.Thread(target=submit, args=(user_ids[n % 2], n)) for n in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    committer.stop()
+
+    assert len(set(results)) == 20
+    assert len(commits) < 20
+    with file_session_local() as db:
+        assert db.query(Transaction).count() == 20
+        for user_id in user_ids:
+            assert validate_user_chain(db, user_id, full=True) is True
+
+
+def test_group_commit_isolates_failing_work(file_session_local):
+    user_id = _create_user(file_session_local, "groupfail@example.com")
+    committer = GroupCommitter(file_session_local, max_batch=8, max_delay=0.05)
+
+    def failing(db):
+        raise ValueError("bad write")
+
+    outcomes = {}
+
+    def submit(name, work):
+        try:
+            outcomes[name] = committer.submit(work)
+        except ValueError as exc:
+            outcomes[name] = exc
+
+    threads = [
+        threading.Thread(target=submit, args=("ok", lambda db: record_transaction(db, user_id, "TRANSFER", None))),
+        threading.Thread(target=submit, args=("bad", failing)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    committer.stop()
+
+    assert isinstance(outcomes["bad"], ValueError)
+    assert isinstance(outcomes["ok"], int)
+    with file_session_local() as db:
+        assert db.get(Transaction, outcomes["ok"]) is not None
+
+
+def _submit_in_order(committer, works):
+    # Queue the works in this order so they land in one batch
+    outcomes = [None] * len(works)
+
+    def submit(n):
+        try:
+            outcomes[n] = committer.submit(works[n])
+        except Exception as exc:
+            outcomes[n] = exc
+
+    threads = []
+    for n in range(len(works)):
+        threads.append(threading.Thread(target=submit, args=(n,)))
+        threads[-1].start()
+        time.sleep(0.05)
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+def stale_head_work(session_local, stale_user_id, user_id):
+    """
+    Work that loads stale_user_id into the batch session, lets another writer move
+    that chain's head, then records its own transaction: a later item in the same
+    batch appending to stale_user_id hits a chain head conflict.
+    """
+    held = []
+
+    def work(db):
+        # Held, so the session's identity map keeps serving this copy of the row
+        held.append(db.get(User, stale_user_id))
+        with session_local() as other:
+            append_block(other, other.get(User, stale_user_id), "Concurrent append")
+        return record_transaction(db, user_id, "TRANSFER", "before the conflict")
+    return work
+
+
+def test_group_commit_conflict_keeps_earlier_items(file_session_local):
+    user_id = _create_user(file_session_local, "groupfirst@example.com")
+    stale_user_id = _create_user(file_session_local, "groupstale@example.com")
+    committer = GroupCommitter(file_session_local, max_batch=2, max_delay=1.0)
+
+    outcomes = _submit_in_order(committer, [
+        stale_head_work(file_session_local, stale_user_id, user_id),
+        lambda db: record_transaction(db, stale_user_id, "TRANSFER", "after the conflict"),
+    ])
+    committer.stop()
+
+    # Every id handed back is a row that was committed
+    assert len(set(outcomes)) == 2
+    with file_session_local() as db:
+        assert [db.get(Transaction, tx_id).user_id for tx_id in outcomes] == [user_id, stale_user_id]
+        for uid in (user_id, stale_user_id):
+            assert validate_user_chain(db, uid, full=True) is True
+
+
+def test_group_commit_conflict_keeps_mixed_batch_and_single_items(file_session_local):
+    user_id = _create_user(file_session_local, "groupmixed@example.com")
+    stale_user_id = _create_user(file_session_local, "groupmixedstale@example.com")
+    committer = GroupCommitter(file_session_local, max_batch=3, max_delay=1.0)
+    items = [
+        TransactionRequest(email="groupmixed@example.com", tx_type="TRANSFER", tx_details=f"batch {i}")
+        for i in range(3)
+    ]
+
+    first_id, batch, single_id = _submit_in_order(committer, [
+        stale_head_work(file_session_local, stale_user_id, user_id),
+        lambda db: record_transaction_batch(db, user_id, items),
+        lambda db: record_transaction(db, stale_user_id, "TRANSFER", "after the conflict"),
+    ])
+    committer.stop()
+
+    block_id, batch_ids = batch
+    assert len({first_id, single_id, *batch_ids}) == 5
+    with file_session_local() as db:
+        assert {db.get(Transaction, tx_id).block_id for tx_id in batch_ids} == {block_id}
+        assert db.get(Transaction, first_id) is not None
+        assert db.get(Transaction, single_id).user_id == stale_user_id
+        for uid in (user_id, stale_user_id):
+            assert validate_user_chain(db, uid, full=True) is True
+
+
+def test_async_router_group_commit_keeps_earlier_items(file_session_local, monkeypatch):
+    user_id = _create_user(file_session_local, "groupasync@example.com")
+    stale_user_id = _create_user(file_session_local, "groupasyncstale@example.com")
+    committer = GroupCommitter(file_session_local, max_batch=2, max_delay=1.0)
+    monkeypatch.setattr(async_transaction, "GROUP_COMMIT_ENABLED", True)
+    monkeypatch.setattr(async_transaction, "get_group_committer", lambda: committer)
+
+    database_path = file_session_local.kw["bind"].url.database
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_local() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(async_transaction.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    # The route's sync work lands in the same batch, after the stale-head item
+    first = []
+    thread = threading.Thread(
+        target=lambda: first.append(committer.submit(stale_head_work(file_session_local, stale_user_id, user_id)))
+    )
+    thread.start()
+    time.sleep(0.05)
+    with TestClient(app) as client:
+        resp = client.post("/transaction/create", json={
+            "email": "groupasyncstale@example.com", "tx_type": "TRANSFER", "tx_details": "after the conflict"
+        })
+    thread.join()
+    committer.stop()
+
+    assert resp.status_code == 200
+    single_id = resp.json()["transaction_id"]
+    assert first[0] != single_id
+    with file_session_local() as db:
+        assert db.get(Transaction, first[0]).user_id == user_id
+        assert db.get(Transaction, single_id).user_id == stale_user_id
@@ -0,0 +1,53 @@
+import io
+import json
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import validate_user_chain
+from app.core.security import verify_password
+from app.database import Base
+from app.models.user import User
+from scripts.import_users import run_import
+
+
+def test_import_is_restartable(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'import.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+
+    source = tmp_path / "users.csv"
+    source.write_text(
+        "email,password\n"
+        "a@example.com,pw-a\n"
+        "b@example.com,pw-b\n"
+        ",no-email\n"
+        "c@example.com,pw-c\n"
+    )
+    cursor_file = str(tmp_path / "import.cursor")
+    out = io.StringIO()
+    summary = run_import(
+        str(source), database_url, workers=2, batch_size=2, bcrypt_rounds=4, cursor_file=cursor_file, out=out
+    )
+    assert (summary.imported, summary.rejected, summary.rows_done) == (3, 1, 4)
+    assert "row=3 rejected" in out.getvalue()
+
+    with sessionmaker(bind=engine)() as db:
+        users = db.query(User).order_by(User.id).all()
+        assert [u.email for u in users] == ["a@example.com", "b@example.com", "c@example.com"]
+        for user in users:
+            assert user.head_block_hash is not None
+            assert validate_user_chain(db, user.id, full=True)
+        assert verify_password("pw-c", users[2].password_hash)
+
+    # Appended rows are picked up after the cursor; known emails are skipped
+    with open(source, "a") as f:
+        f.write("d@example.com,pw-d\n")
+    resumed = run_import(str(source), database_url, workers=1, bcrypt_rounds=4, cursor_file=cursor_file)
+    assert (resumed.imported, resumed.rows_done) == (1, 5)
+
+    jsonl = tmp_path / "again.jsonl"
+    jsonl.write_text(json.dumps({"email": "a@example.com", "password": "pw-a"}) + "\n")
+    again = run_import(str(jsonl), database_url, workers=1, bcrypt_rounds=4)
+    assert (again.imported, again.skipped) == (0, 1)
+    engine.dispose()
@@ -0,0 +1,41 @@
+import time
+
+from app.core.crypto_utils import derive_wallet_address
+from app.core.key_pool import KeyMaterialPool
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_pool_refills_below_low_water():
+    pool = KeyMaterialPool(size=6, low_water=3)
+    pool.start()
+    try:
+        assert _wait_for(lambda: len(pool) == 6)
+
+        popped = [pool.pop() for _ in range(4)]
+        assert _wait_for(lambda: len(pool) == 6)
+
+        # Every item is handed out once and is internally consistent
+        assert len({keys.private_key_hex for keys in popped}) == 4
+        for keys in popped:
+            assert len(keys.mnemonic.split()) == 12
+            assert keys.wallet_address == derive_wallet_address(keys.public_key_hex)
+    finally:
+        pool.stop()
+
+
+def test_empty_pool_generates_inline():
+    pool = KeyMaterialPool(size=0, low_water=0)
+    try:
+        assert pool.try_pop() is None
+        keys = pool.pop()
+        assert keys.wallet_address == derive_wallet_address(keys.public_key_hex)
+    finally:
+        pool.stop()
@@ -0,0 +1,43 @@
+from app.models.user import User
+from app.models.user_kyc import UserKyc
+
+
+def test_kyc_batch_upsert(test_client, db_session):
+    for name in ("kycbatch1", "kycbatch2"):
+        test_client.post("/auth/signup", json={"email": f"{name}@example.com", "password": "KycPass"})
+    test_client.post("/kyc/update", json={"email": "kycbatch1@example.com", "nik": "old", "phone": "0811"})
+
+    resp = test_client.post("/kyc/batch-upsert", json=[
+        {"email": "kycbatch1@example.com", "nik": "first"},
+        {"email": "kycbatch2@example.com", "npwp": "09.254"},
+        {"email": "missing@example.com", "nik": "x"},
+        # Repeated email in one batch: the last record wins
+        {"email": "kycbatch1@example.com", "nik": "3201", "city_of_growth": "Bandung"},
+    ])
+    assert resp.status_code == 200
+    assert resp.json()["upserted"] == 2
+    assert resp.json()["not_found"] == ["missing@example.com"]
+
+    user = db_session.query(User).filter(User.email == "kycbatch1@example.com").first()
+    rows = db_session.query(UserKyc).filter(UserKyc.user_id == user.id).all()
+    assert len(rows) == 1
+    # Upsert replaces the whole record, like /kyc/update
+    assert (rows[0].nik, rows[0].city_of_growth, rows[0].phone) == ("3201", "Bandung", None)
+
+    assert test_client.post("/kyc/batch-upsert", json=[]).status_code == 400
+
+
+def test_identity_matches_and_duplicate_report(test_client):
+    user_ids = []
+    for i, nik in enumerate(["3201-0101-0001", "3201 0101 0001", "3201010100099"]):
+        test_client.post("/auth/signup", json={"email": f"ident{i}@example.com", "password": "IdentPass"})
+        resp = test_client.post("/kyc/update", json={"email": f"ident{i}@example.com", "nik": nik, "npwp": f"09.254.{i}"})
+        user_ids.append(resp.json()["user_id"])
+
+    # Separators and spacing are normalized away before hashing
+    resp = test_client.post("/kyc/identity-matches", json={"nik": "320101010001", "email": "ident0@example.com"})
+    assert resp.json() == {"nik": [user_ids[1]], "npwp": []}
+
+    report = test_client.get("/kyc/duplicates").json()
+    assert [user_ids[0], user_ids[1]] in report["nik"]
+    assert all(user_ids[2] not in group for group in report["nik"])
@@ -0,0 +1,32 @@
+from app.core.metrics import REQUEST_SQL_STATEMENTS, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, route="/x")
+
+    lines = list(histogram.render())
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/x"} 4' in lines
+
+
+def test_metrics_endpoint(test_client):
+    test_client.post("/auth/signup", json={"email": "metrics@example.com", "password": "MetricsPass"})
+    before = REQUEST_SQL_STATEMENTS.count(method="GET", route="/blockchain/validate-chain/{email}")
+    test_client.get("/blockchain/validate-chain/metrics@example.com")
+    assert REQUEST_SQL_STATEMENTS.count(method="GET", route="/blockchain/validate-chain/{email}") == before + 1
+
+    resp = test_client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    # Path templates, not raw paths, so one series per route
+    assert 'route="/blockchain/validate-chain/{email}",status="200"' in body
+    assert "metrics@example.com" not in body
+    assert 'function_duration_seconds_count{function="hash_password"}' in body
+    assert 'function_duration_seconds_count{function="validate_user_chain"}' in body
+    assert "sql_statements_total" in body
+    assert "db_pool_checkouts" in body
@@ -0,0 +1,64 @@
+"""
+Runs the hot endpoints, captures every SELECT/UPDATE they issue and checks the
+SQLite query plan of each one: a hot path must never fall back to a table scan.
+"""
+import pytest
+from sqlalchemy import event
+
+
+def _capture(db_engine, calls):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        for call in calls:
+            call()
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    return statements
+
+
+def _table_scans(db_engine, statement, parameters):
+    with db_engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in plan if row[-1].startswith("SCAN ")]
+
+
+@pytest.fixture(scope="module")
+def hot_statements(test_client, db_engine):
+    email = "plans@example.com"
+    test_client.post("/auth/signup", json={"email": email, "password": "PlanPass"})
+
+    def create():
+        test_client.post("/transaction/create", json={"email": email, "tx_type": "TRANSFER"})
+
+    def batch():
+        resp = test_client.post("/transaction/batch", json=[{"email": email, "tx_type": "TRANSFER"}] * 3)
+        test_client.get(f"/blockchain/tx-proof/{resp.json()['transaction_ids'][1]}")
+
+    return _capture(db_engine, [
+        lambda: test_client.post("/auth/signin", json={"email": email, "password": "PlanPass"}),
+        create,
+        batch,
+        lambda: test_client.get(f"/blockchain/validate-chain/{email}"),
+        lambda: test_client.get(f"/blockchain/validate-chain/{email}"),
+        lambda: test_client.get(f"/blockchain/user-chain/{email}", params={"limit": 2, "after_id": 1}),
+        lambda: test_client.post("/kyc/update", json={"email": email, "phone": "0800", "nik": "3201"}),
+        lambda: test_client.post("/kyc/identity-matches", json={"nik": "3201", "npwp": "09.254"}),
+        lambda: test_client.get("/kyc/duplicates"),
+    ])
+
+
+def test_hot_paths_were_captured(hot_statements):
+    tables = " ".join(statement for statement, _ in hot_statements)
+    for table in ("blocks", "transactions", "users_kyc", "chain_checkpoints", "users"):
+        assert f"FROM {table}" in tables or f"UPDATE {table}" in tables
+
+
+def test_hot_paths_use_indexes(hot_statements, db_engine):
+    for statement, parameters in hot_statements:
+        assert _table_scans(db_engine, statement, parameters) == [], statement
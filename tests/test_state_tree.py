@@ -0,0 +1,140 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.blockchain_utils import create_genesis_block
+from app.core.group_commit import GroupCommitter
+from app.core.state_tree import (
+    EMPTY_HASHES,
+    StateTreeUpdater,
+    apply_pending_heads,
+    pending_head_count,
+    rebuild_state_tree,
+    state_proof,
+    state_root,
+    update_state_tree,
+    verify_state_proof
+)
+from app.database import Base
+from app.models.state_tree_leaf import StateTreeLeaf
+from app.models.user import User
+from app.routers.transaction import record_transaction
+
+
+def _apply(db_engine):
+    with db_engine.begin() as conn:
+        while apply_pending_heads(conn):
+            pass
+
+
+def test_state_proofs_follow_appends(test_client, db_engine):
+    email = "stateuser@example.com"
+    test_client.post("/auth/signup", json={"email": email, "password": "StatePass"})
+    test_client.post("/auth/signup", json={"email": "neighbour@example.com", "password": "StatePass"})
+    _apply(db_engine)
+
+    proof = test_client.get(f"/blockchain/state-proof/{email}").json()
+    state = test_client.get("/blockchain/state-root").json()
+    root = state["root"]
+    assert state["pending_heads"] == 0
+    assert proof["root"] == root
+    assert verify_state_proof(proof["user_id"], proof["head_block_hash"], proof["siblings"], root)
+
+    test_client.post("/transaction/create", json={"email": email, "tx_type": "TRANSFER", "tx_details": "Move"})
+    # The append only queued its head: the root and the proof still cover the old one
+    state = test_client.get("/blockchain/state-root").json()
+    assert (state["root"], state["pending_heads"]) == (root, 1)
+    assert test_client.get(f"/blockchain/state-proof/{email}").json() == proof
+
+    _apply(db_engine)
+    new_root = test_client.get("/blockchain/state-root").json()["root"]
+    assert new_root != root
+    # The old head no longer proves against the new root; the new one does
+    assert not verify_state_proof(proof["user_id"], proof["head_block_hash"], proof["siblings"], new_root)
+    new_proof = test_client.get(f"/blockchain/state-proof/{email}").json()
+    assert new_proof["head_block_id"] > proof["head_block_id"]
+    assert verify_state_proof(new_proof["user_id"], new_proof["head_block_hash"], new_proof["siblings"], new_root)
+
+    # Applied updates agree with a rebuild from users.head_block_*
+    with db_engine.connect() as conn:
+        with conn.begin() as tx:
+            assert rebuild_state_tree(conn, batch_size=2) == new_root
+            tx.rollback()
+
+    assert test_client.get("/blockchain/state-proof/nobody@example.com").status_code == 404
+
+
+def test_batch_update_matches_one_at_a_time(tmp_path):
+    heads = {user_id: f"{user_id:064x}" for user_id in (1, 2, 3, 8, 1000, 2**31 - 1)}
+    roots = []
+    for name, batches in (("one.db", [{k: v} for k, v in heads.items()]), ("batch.db", [heads])):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            assert state_root(conn) == EMPTY_HASHES[-1]
+            for batch in batches:
+                update_state_tree(conn, batch)
+            roots.append(state_root(conn))
+            # A user without a head proves an empty leaf
+            absent = state_proof(conn, 5)
+            assert absent.head_block_hash is None
+            assert verify_state_proof(5, None, absent.siblings, roots[-1])
+        engine.dispose()
+    assert roots[0] == roots[1]
+
+
+def test_appends_only_queue_heads_for_the_updater(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        # The root row exists before any update, so the updater's lock has a row to take
+        assert db.scalar(select(StateTreeLeaf.user_id)) is None
+        assert state_root(db) == EMPTY_HASHES[-1]
+        user = User(email="queued@example.com", password_hash="x", bip39_mnemonic="words")
+        db.add(user)
+        create_genesis_block(db, user)
+        user_id = user.id
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    committer = GroupCommitter(session_local, max_batch=4, max_delay=1.0)
+    threads = [
+        threading.Thread(target=committer.submit, args=(lambda db: record_transaction(db, user_id, "TRANSFER", None),))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    committer.stop()
+    event.remove(engine, "before_cursor_execute", record)
+    # Writers never read or lock the tree
+    assert not any("state_tree_nodes" in statement for statement in statements)
+
+    with session_local() as db:
+        # Genesis, then one row for the whole batch: a session queues a user's newest head
+        assert pending_head_count(db) == 2
+        head_id, head_hash = db.execute(select(User.head_block_id, User.head_block_hash).where(User.id == user_id)).one()
+
+    updater = StateTreeUpdater(session_local, interval=0.01, batch_size=2)
+    updater.start()
+    deadline = time.monotonic() + 5
+    with session_local() as db:
+        while pending_head_count(db) and time.monotonic() < deadline:
+            db.rollback()
+            time.sleep(0.01)
+        updater.stop()
+        # Several queued heads of one user end on the newest
+        proof = state_proof(db, user_id)
+        assert (proof.head_block_id, proof.head_block_hash) == (head_id, head_hash)
+        root = state_root(db)
+        assert rebuild_state_tree(db) == root
+        db.rollback()
+    engine.dispose()
@@ -49,3 +49,167 @@ def test_transaction_validation_fail(test_client, db_session):
     # In your real scenario, you'd see a 400 if your validation is triggered by a broken chain
     # But by default, it might still pass because we haven't actually broken anything
     assert resp_tx.status_code in [200, 400]
+
+
+def test_create_transaction_moves_chain_head_without_block_lookups(test_client, db_session, db_engine):
+    from sqlalchemy import event
+    from app.models.block import Block
+    from app.models.user import User
+
+    resp_signup = test_client.post("/auth/signup", json={
+        "email": "headuser@example.com",
+        "password": "HeadPass"
+    })
+    assert resp_signup.status_code == 200
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        resp_tx = test_client.post("/transaction/create", json={
+            "email": "headuser@example.com",
+            "tx_type": "TRANSFER",
+            "tx_details": "Head pointer"
+        })
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    assert resp_tx.status_code == 200
+
+    # One user lookup carries the head; blocks are only ever inserted, and the
+    # state tree only gets the head queued
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    assert not any("state_tree_nodes" in s for s in statements)
+    assert not any("FROM blocks" in s for s in selects)
+
+    user = db_session.query(User).filter(User.email == "headuser@example.com").first()
+    head = db_session.query(Block).filter(Block.user_id == user.id).order_by(Block.id.desc()).first()
+    assert (user.head_block_id, user.head_block_hash) == (head.id, head.block_hash)
+
+
+def test_create_transaction_batch_single_block(test_client, db_session):
+    from app.models.transaction import Transaction
+
+    resp_signup = test_client.post("/auth/signup", json={
+        "email": "batchuser@example.com",
+        "password": "BatchPass"
+    })
+    assert resp_signup.status_code == 200
+
+    resp_batch = test_client.post("/transaction/batch", json=[
+        {"email": "batchuser@example.com", "tx_type": "TRANSFER", "tx_details": f"Payout {i}"}
+        for i in range(5)
+    ])
+    assert resp_batch.status_code == 200
+    data = resp_batch.json()
+    assert len(data["transaction_ids"]) == 5
+
+    txs = db_session.query(Transaction).filter(Transaction.id.in_(data["transaction_ids"])).all()
+    assert {tx.block_id for tx in txs} == {data["block_id"]}
+    assert [tx.tx_details for tx in sorted(txs, key=lambda tx: data["transaction_ids"].index(tx.id))] == [
+        f"Payout {i}" for i in range(5)
+    ]
+
+    resp_chain = test_client.get("/blockchain/validate-chain/batchuser@example.com")
+    assert resp_chain.json()["chain_valid"] is True
+
+
+def test_create_transaction_batch_rejects_mixed_users(test_client, db_session):
+    resp_batch = test_client.post("/transaction/batch", json=[
+        {"email": "batchuser@example.com", "tx_type": "TRANSFER"},
+        {"email": "someoneelse@example.com", "tx_type": "TRANSFER"},
+    ])
+    assert resp_batch.status_code == 400
+
+
+def test_create_transaction_idempotency_key_replays(test_client, db_session):
+    from app.core.idempotency import idempotency_cache
+    from app.models.block import Block
+    from app.models.user import User
+
+    resp_signup = test_client.post("/auth/signup", json={
+        "email": "retryuser@example.com",
+        "password": "RetryPass"
+    })
+    assert resp_signup.status_code == 200
+    body = {"email": "retryuser@example.com", "tx_type": "TRANSFER", "tx_details": "Sending 5 tokens"}
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = test_client.post("/transaction/create", json=body, headers=headers)
+    assert first.status_code == 200
+    again = test_client.post("/transaction/create", json=body, headers=headers)
+    assert again.json() == first.json()
+
+    # Same answer from the table once the in-process cache is gone
+    idempotency_cache.clear()
+    from_db = test_client.post("/transaction/create", json=body, headers=headers)
+    assert from_db.json() == first.json()
+
+    user = db_session.query(User).filter(User.email == "retryuser@example.com").first()
+    assert db_session.query(Block).filter(Block.user_id == user.id).count() == 2
+
+    reused = test_client.post("/transaction/create", json={**body, "tx_details": "Other"}, headers=headers)
+    assert reused.status_code == 422
+    fresh = test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "retry-2"})
+    assert fresh.json()["transaction_id"] != first.json()["transaction_id"]
+
+
+def test_idempotency_key_race_rolls_back_the_duplicate(test_client, db_session):
+    from unittest.mock import patch
+    from app.core.idempotency import find_outcome, idempotency_cache
+    from app.models.block import Block
+    from app.models.user import User
+
+    test_client.post("/auth/signup", json={"email": "raceuser@example.com", "password": "RacePass"})
+    body = {"email": "raceuser@example.com", "tx_type": "TRANSFER", "tx_details": "Race"}
+    first = test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "race"})
+    user = db_session.query(User).filter(User.email == "raceuser@example.com").first()
+    blocks = db_session.query(Block).filter(Block.user_id == user.id).count()
+
+    # The first lookup misses, as for a retry checked before the original committed
+    idempotency_cache.clear()
+    lookups = iter([lambda *args: None])
+    with patch(
+        "app.routers.transaction.find_outcome",
+        side_effect=lambda *args: next(lookups, find_outcome)(*args),
+    ):
+        resp = test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "race"})
+    assert resp.json() == first.json()
+    assert db_session.query(Block).filter(Block.user_id == user.id).count() == blocks
+
+
+def test_expired_keys_are_purged_and_reusable(test_client, db_session):
+    from datetime import datetime, timedelta, timezone
+    from app.config import IDEMPOTENCY_KEY_TTL_SECONDS
+    from app.core.idempotency import idempotency_cache, purge_expired_keys
+    from app.models.idempotency_key import IdempotencyKey
+    from app.models.user import User
+
+    test_client.post("/auth/signup", json={"email": "expireuser@example.com", "password": "ExpirePass"})
+    body = {"email": "expireuser@example.com", "tx_type": "TRANSFER", "tx_details": "Expiring"}
+    user_id = db_session.query(User.id).filter(User.email == "expireuser@example.com").scalar()
+    keys = db_session.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id)
+
+    def expire(*names):
+        keys.filter(IdempotencyKey.key.in_(names)).update(
+            {IdempotencyKey.created_at: datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS + 1)},
+            synchronize_session=False,
+        )
+        db_session.commit()
+        idempotency_cache.clear()
+
+    first = test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "expire-1"}).json()
+    expire("expire-1")
+    # Reused before the purge got to it: a new transaction, not a replay
+    again = test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": "expire-1"})
+    assert again.status_code == 200
+    assert again.json()["transaction_id"] != first["transaction_id"]
+
+    for n in range(2, 6):
+        test_client.post("/transaction/create", json=body, headers={"Idempotency-Key": f"expire-{n}"})
+    expire("expire-2", "expire-3", "expire-4")
+    assert purge_expired_keys(db_session, batch_size=2) == 3
+    assert sorted(row.key for row in keys) == ["expire-1", "expire-5"]
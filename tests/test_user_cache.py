@@ -0,0 +1,45 @@
+import time
+
+from sqlalchemy import event
+
+from app.core.cache import LRUCache
+from app.core.user_cache import resolve_user, user_cache
+from app.models.user import User
+
+
+def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_email_resolution_is_cached_and_invalidated(test_client, db_session, db_engine):
+    test_client.post("/auth/signup", json={"email": "cached@example.com", "password": "CachePass"})
+    user = db_session.query(User).filter(User.email == "cached@example.com").first()
+    assert user_cache.get("cached@example.com") == (user.id, user.wallet_address)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        test_client.get("/blockchain/validate-chain/cached@example.com")
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    assert not any("FROM users" in statement for statement in statements)
+
+    # Renaming through the ORM drops the old email at once
+    user.email = "renamed@example.com"
+    db_session.commit()
+    assert user_cache.get("cached@example.com") is None
+    assert resolve_user(db_session, "cached@example.com") is None
+    assert resolve_user(db_session, "renamed@example.com").id == user.id